@@ -1,65 +1,231 @@
+import time
+_import_start = time.perf_counter()
+
 import os
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+import json
+import asyncio
+import threading
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, Response
 from src.pipeline.full_pipeline import upload_service
+from src.pipeline.task_queue import TaskQueue
+from src.pipeline.admission import AdmissionRejected, get_admission_controller
+from src.components.result_cache import get_result_cache
+from src.components.chunk_cache import get_chunk_cache
+from src.components.model_manager import get_model_manager, INDIC, WHISPER
+from src.components.model_tiering import get_tier_policy
+from src.components.inference_batcher import get_inference_batcher
+from src.components.srt_generator import SRTGenerator, CAPTION_FORMATS, SRT_ARTIFACT_NAME
+from src.components.artifact_store import get_artifact_store
+from src.components.scratch_space import get_scratch_space
+from src.pipeline.caption_stream import get_caption_hub
+from src.pipeline.task_store import get_task_store
+from src.utils.metrics import get_metrics
+from src.utils.io_utils import SendfileResponse, StreamedUpload, UploadSizeLimit, accepts_gzip, etag_matches
 from src.logger import logging
-from transformers import AutoModel
-import whisper
-from src.constants import INDIC_MODEL_NAME, WHISPER_MODEL_NAME
 from src.entity.config_entity import ConfigEntity# Added import for ConfigEntity
-import src.components.language_detector as lang_mod
-import src.components.transcriber as trans_mod
 app = FastAPI(
     title="Auto Caption Generator API",
     description="Video to Caption generation using IndicConformer + Whisper fallback for English",
     version="3.1.0"
 )
 
+# Oversized uploads are refused while they stream in
+_upload_config = ConfigEntity()
+app.add_middleware(UploadSizeLimit, paths=["/upload-video/"],
+                   max_bytes=_upload_config.max_file_size_mb * 1024 * 1024 + _upload_config.upload_form_overhead_bytes)
+
 # Ensure artifacts folder exists
 os.makedirs("artifacts", exist_ok=True)
 
-# In-memory storage
-task_data = {}
+# Task state (in-memory or SQLite, see TASK_STORE_BACKEND)
+task_store = get_task_store()
+
+# Background workers
+task_queue = None
+compactor_stop = threading.Event()
 
-# Global models
-indic_model = None
-whisper_model = None
+# Startup breakdown in seconds, reported by /readyz; torch and the models are not imported until preload
+startup_timings = {"imports": round(time.perf_counter() - _import_start, 3)}
+
+def _preload_models():
+    manager = get_model_manager()
+    manager.preload()
+    startup_timings["models"] = {key: round(record["load_time_sec"] + record["warmup_time_sec"], 3)
+                                 for key, record in manager.stats()["loaded"].items()}
+    if not manager.missing_preloads():
+        startup_timings["ready"] = round(time.perf_counter() - _import_start, 3)
+    logging.info(f"Startup timings (s): {startup_timings}")
 
 @app.on_event("startup")
 async def startup_event():
-    global indic_model, whisper_model
-    try:
-        logging.info("Loading IndicConformer...")
-        indic_model = AutoModel.from_pretrained(INDIC_MODEL_NAME, trust_remote_code=True)
-        logging.info("Loading Whisper...")
-        whisper_model = whisper.load_model(WHISPER_MODEL_NAME)
-        # inject
-        lang_mod.indic_model = indic_model
-        lang_mod.whisper_model = whisper_model
-        trans_mod.indic_model = indic_model
-        trans_mod.whisper_model = whisper_model
-        logging.info("Models loaded and injected into components")
-    except Exception as e:
-        logging.error(f"Model loading failed: {str(e)}")
+    global task_queue
+    start = time.perf_counter()
+    # Upload and audio files of tasks that died with a previous process
+    get_scratch_space().sweep_orphans()
+    startup_timings["scratch_sweep"] = round(time.perf_counter() - start, 3)
+    start = time.perf_counter()
+    task_queue = TaskQueue()
+    startup_timings["task_queue"] = round(time.perf_counter() - start, 3)
+    # Models load lazily on first use; preloading in the background just moves that cost off the first request
+    threading.Thread(target=_preload_models, name="model-preload", daemon=True).start()
+    threading.Thread(target=get_artifact_store().run_compactor, args=(compactor_stop,), name="artifact-compactor",
+                     daemon=True).start()
 
-@app.post("/upload-video/")
-async def upload_video(file: UploadFile = File(...)):
-    global indic_model, whisper_model
-    if not indic_model or not whisper_model:
-        raise HTTPException(status_code=503, detail="Models not loaded yet")
+@app.on_event("shutdown")
+async def shutdown_event():
+    compactor_stop.set()
+    if task_queue:
+        task_queue.shutdown(wait=False)
+
+# The body is read by StreamedUpload rather than FastAPI's form parsing, so the schema is declared here
+_UPLOAD_BODY = {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["file"], "properties": {"file": {"type": "string", "format": "binary"}}}}}}
+
+@app.post("/upload-video/", openapi_extra={"requestBody": _UPLOAD_BODY})
+async def upload_video(request: Request, whisper_model: Optional[str] = None):
+    # whisper_model pins the Whisper tier for this request; "auto" or unset lets the load decide
+    if not get_tier_policy().is_valid(whisper_model):
+        raise HTTPException(status_code=400, detail=f"whisper_model must be one of {get_tier_policy().tiers} or auto")
+    client = get_admission_controller().client_key(request.headers, request.client.host if request.client else None)
     try:
-        result = await upload_service(file, task_data)
-        return JSONResponse(content=result, status_code=200)
+        result = await upload_service(StreamedUpload(request), task_store, task_queue, whisper_model, client)
+        return JSONResponse(content=result, status_code=202)
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        return JSONResponse(status_code=429, headers={"Retry-After": str(e.retry_after)},
+                            content={"error": e.detail, "reason": e.reason, "retry_after": e.retry_after})
     except Exception as e:
         logging.error(f"Video upload error: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    task = task_store.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    # video_path and workspace are server-side scratch locations, not part of the public result
+    return {"task_id": task_id, **{k: v for k, v in task.items() if k not in ("video_path", "workspace")}}
+
+def _artifact_response(request: Request, artifact, filename: str):
+    # Strong ETag from the content hash; gzip is a separate representation with its own tag
+    use_gzip = bool(artifact.gzip_path) and accepts_gzip(request.headers.get("accept-encoding"))
+    etag = f'"{artifact.sha256}-gz"' if use_gzip else f'"{artifact.sha256}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+    return SendfileResponse(artifact.gzip_path if use_gzip else artifact.file_path, media_type=artifact.media_type,
+                            filename=filename, headers=headers, method=request.method)
+
+@app.api_route("/tasks/{task_id}/srt", methods=["GET", "HEAD"])
+async def get_task_srt(task_id: str, request: Request):
+    task = task_store.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Task is {task['status']}")
+    artifact = get_artifact_store().get(task_id, SRT_ARTIFACT_NAME)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="SRT file not found")
+    filename = SRTGenerator().filename(task.get("language"), task.get("video_name") or task_id)
+    return _artifact_response(request, artifact, filename)
+
+@app.get("/tasks/{task_id}/artifacts")
+async def list_task_artifacts(task_id: str):
+    artifacts = get_artifact_store().list(task_id)
+    if not artifacts:
+        raise HTTPException(status_code=404, detail="No artifacts for this task")
+    return {
+        name: {"sha256": entry["sha256"], "size_bytes": entry["size_bytes"], "media_type": entry["media_type"],
+               "url": f"/tasks/{task_id}/artifacts/{name}"}
+        for name, entry in artifacts.items()
+    }
+
+@app.api_route("/tasks/{task_id}/artifacts/{name}", methods=["GET", "HEAD"])
+async def get_task_artifact(task_id: str, name: str, request: Request):
+    # Served straight from the store, so artifacts outlive the task record
+    artifact = get_artifact_store().get(task_id, name)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return _artifact_response(request, artifact, name)
+
+@app.get("/tasks/{task_id}/stream")
+async def stream_task_captions(task_id: str, format: str = "srt"):
+    if format not in CAPTION_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    hub = get_caption_hub()
+    if hub.read(task_id, 0) is None:
+        raise HTTPException(status_code=404, detail="Caption stream not found")
+    generator = SRTGenerator()
+    poll_sec = ConfigEntity().caption_stream_poll_sec
+
+    async def events():
+        # Server-Sent Events: replay cues so far, then push new ones until the task finishes
+        if format == "vtt":
+            yield "event: header\ndata: WEBVTT\n\n"
+        position = 0
+        while True:
+            state = hub.read(task_id, position)
+            if state is None:
+                break
+            cues, closed, error = state
+            for cue in cues:
+                data = "\n".join(f"data: {line}" for line in generator.format_cue(cue, format).splitlines())
+                yield f"event: cue\nid: {cue.index}\n{data}\n\n"
+            position += len(cues)
+            if closed:
+                yield f"event: end\ndata: {json.dumps({'error': error})}\n\n"
+                break
+            await asyncio.sleep(poll_sec)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/queue")
+async def queue_stats():
+    return {**(task_queue.stats() if task_queue else {}), "admission": get_admission_controller().stats(),
+            "scratch": get_scratch_space().stats()}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {**get_result_cache().stats(), "artifacts": get_artifact_store().stats(), "chunks": get_chunk_cache().stats()}
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/models")
+async def models():
+    return {**get_model_manager().stats(), "batching": get_inference_batcher().stats(), "tiering": get_tier_policy().stats()}
+
+@app.get("/healthz")
+async def healthz():
+    # Liveness: the process is up and serving; never depends on models
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    # Readiness: workers started and every preloaded model resident
+    manager = get_model_manager()
+    waiting_for = manager.missing_preloads() + ([] if task_queue else ["task_queue"])
+    if waiting_for:
+        return JSONResponse(status_code=503, content={"status": "starting", "waiting_for": waiting_for,
+                                                      "errors": manager.stats()["errors"], "timings": startup_timings})
+    return {"status": "ready", "timings": startup_timings}
+
 @app.get("/")
 async def root():
+    config = ConfigEntity()
+    manager = get_model_manager()
     return {
         "message": "Auto Caption Generator API is running!",
-        "models_loaded": bool(indic_model and whisper_model),
-        "supported_languages": [f"{name} ({code})" for code, name in ConfigEntity().indic_languages.items()] + ["English (en)"]
+        "models_loaded": manager.is_loaded(INDIC, config.indic_model_name) and manager.is_loaded(WHISPER, config.whisper_model_name),
+        "queue": task_queue.stats() if task_queue else None,
+        "tasks": task_store.stats(),
+        "supported_languages": [f"{name} ({code})" for code, name in config.indic_languages.items()] + ["English (en)"]
     }
 
 
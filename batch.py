@@ -0,0 +1,19 @@
+import sys
+import json
+import argparse
+from src.pipeline.batch_pipeline import BatchRunner
+
+def main():
+    parser = argparse.ArgumentParser(description="Caption every video in a directory or path list")
+    parser.add_argument("source", help="Directory to scan recursively, or a text file with one video path per line")
+    parser.add_argument("--manifest", default=None, help="Progress manifest (default: OUTPUT_DIR/batch_manifest.jsonl)")
+    parser.add_argument("--retry-failed", action="store_true", help="Process files that failed in an earlier run again")
+    parser.add_argument("--limit", type=int, default=None, help="Process at most this many files")
+    args = parser.parse_args()
+
+    summary = BatchRunner(manifest_path=args.manifest).run(args.source, retry_failed=args.retry_failed, limit=args.limit)
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
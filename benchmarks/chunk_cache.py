@@ -0,0 +1,118 @@
+"""Chunk cache reuse on re-edited uploads, with stub models and synthetic speech-like audio.
+
+An original clip is transcribed once, then variants of it: re-encoded to another codec, trimmed at
+the start, and with a new intro. For each variant it reports how much speech came from the chunk
+cache, how many words land where the original put them (after the edit's shift), and the
+transcription time against the original. An unrelated clip must reuse nothing. Exits non-zero
+when the re-encoded copy reuses less than --min-reuse of its speech or the unrelated clip reuses any.
+
+Usage:
+    python -m benchmarks.chunk_cache
+    python -m benchmarks.chunk_cache --duration 600 --scenarios english
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.run_benchmarks import install_stub_models
+from benchmarks.synthetic_media import speech_like_pcm, encode_pcm
+
+SAMPLE_RATE = 16000
+
+def _aligned_words(words, reference, shift_sec: float, tolerance_sec: float = 0.05) -> int:
+    # Words of this transcript found in the reference at the same place once the edit's shift is undone
+    starts = {}
+    for word in reference:
+        starts.setdefault(word["word"], []).append(word["start"])
+    return sum(1 for word in words
+               if any(abs(start - (word["start"] - shift_sec)) < tolerance_sec for start in starts.get(word["word"], [])))
+
+def run_scenario(media_dir: str, duration: float, english: bool) -> list:
+    from src.components.audio_extractor import AudioExtractor
+    from src.components.vad_chunker import VADChunker
+    from src.components.transcriber import Transcriber
+    from src.components.chunk_cache import ChunkCache
+
+    install_stub_models(english)
+    language = "en" if english else "hi"
+    transcriber = Transcriber()
+    transcriber.chunk_cache = ChunkCache(os.path.join(media_dir, f"chunks_{language}.db"))
+
+    pcm = speech_like_pcm(duration, seed=1)
+    trim_sec, intro_sec = 7.0, 12.0
+    variants = [
+        ("original", pcm, 0.0, ("-c:a", "aac", "-b:a", "96k")),
+        ("reencoded", pcm, 0.0, ("-c:a", "libmp3lame", "-b:a", "48k")),
+        ("trimmed", pcm[int(trim_sec * SAMPLE_RATE):], -trim_sec, ("-c:a", "aac", "-b:a", "96k")),
+        ("new_intro", np.concatenate([speech_like_pcm(intro_sec, seed=2), pcm]), intro_sec, ("-c:a", "aac", "-b:a", "96k")),
+        ("unrelated", speech_like_pcm(duration, seed=3), None, ("-c:a", "aac", "-b:a", "96k")),
+    ]
+
+    rows, reference, reference_sec = [], None, None
+    for name, samples, shift_sec, codec_args in variants:
+        ext = ".mkv" if "libmp3lame" in codec_args else ".mp4"
+        path = encode_pcm(os.path.join(media_dir, f"{language}_{name}{ext}"), samples, SAMPLE_RATE, codec_args)
+        audio = AudioExtractor().extract(path)
+        chunks = VADChunker().chunk(audio)
+        start = time.perf_counter()
+        transcript = transcriber.transcribe(audio, language, chunks)
+        elapsed = time.perf_counter() - start
+        audio.release()
+        if transcript.error:
+            raise RuntimeError(f"{name}: {transcript.error}")
+        words = transcript.word_timestamps
+        if reference is None:
+            reference, reference_sec = words, elapsed
+        rows.append({
+            "scenario": language, "variant": name, "chunks": len(chunks.chunks), "reused_chunks": transcript.reused_chunks,
+            "reused_ratio": transcript.reused_sec / chunks.speech_sec if chunks.speech_sec else 0.0,
+            "aligned_words": f"{_aligned_words(words, reference, shift_sec)}/{len(words)}" if shift_sec is not None else "-",
+            "transcribe_sec": elapsed, "speedup": reference_sec / elapsed if elapsed else 0.0
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk cache reuse on trimmed, re-encoded and re-introed uploads")
+    parser.add_argument("--duration", type=float, default=180)
+    parser.add_argument("--scenarios", nargs="+", choices=["indic", "english"], default=["indic", "english"])
+    parser.add_argument("--min-reuse", type=float, default=0.8)
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        sys.exit("ffmpeg is required to generate synthetic media")
+
+    workdir = tempfile.mkdtemp(prefix="caption_chunk_cache_")
+    # Run inside a scratch directory so artifacts, caches and logs don't touch the checkout
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        rows = []
+        for scenario in args.scenarios:
+            rows.extend(run_scenario(os.path.join(workdir, "media"), args.duration, scenario == "english"))
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    failures = []
+    print(f"{'lang':4} {'variant':10} {'chunks':>6} {'reused':>6} {'speech':>7} {'aligned words':>14} {'transcribe_s':>12} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['scenario']:4} {row['variant']:10} {row['chunks']:>6} {row['reused_chunks']:>6} "
+              f"{row['reused_ratio']:>6.0%} {row['aligned_words']:>14} {row['transcribe_sec']:>12.2f} {row['speedup']:>7.2f}x")
+        if row["variant"] == "reencoded" and row["reused_ratio"] < args.min_reuse:
+            failures.append(f"{row['scenario']}: re-encoded copy reused {row['reused_ratio']:.0%} of its speech")
+        if row["variant"] == "unrelated" and row["reused_chunks"]:
+            failures.append(f"{row['scenario']}: unrelated audio reused {row['reused_chunks']} chunks")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
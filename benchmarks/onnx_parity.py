@@ -0,0 +1,136 @@
+"""Transcript parity and latency of the ONNX Runtime int8 backend against eager torch.
+
+Each backend runs in its own interpreter with INFERENCE_BACKEND overridden, on the same inputs,
+through the real AudioExtractor / LanguageDetector / VADChunker / Transcriber call sites.
+Exits non-zero when the word error rate between the two transcripts exceeds --max-wer or the
+detected languages differ.
+
+Usage:
+    python -m benchmarks.onnx_parity --inputs lecture_hi.mp4 interview_en.mp4
+    # Offline, Whisper path only, with any local checkpoint
+    python -m benchmarks.onnx_parity --language en --whisper-checkpoint ~/.cache/whisper/small.pt
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BACKENDS = ["torch", "onnx"]
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = reference.split(), hypothesis.split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+def run_backend(backend: str, inputs: List[str], language: str, whisper_checkpoint: str, output: str):
+    # Config constants are read when components are constructed, so this must happen first
+    from src.entity import config_entity
+    config_entity.INFERENCE_BACKEND = backend
+    config_entity.MODEL_WARMUP = False
+    # Both backends share artifacts/; chunks cached by the first run would be reused by the second
+    config_entity.CHUNK_CACHE = False
+    if whisper_checkpoint:
+        config_entity.WHISPER_MODEL_NAME = whisper_checkpoint
+    from src.components.audio_extractor import AudioExtractor
+    from src.components.language_detector import LanguageDetector
+    from src.components.vad_chunker import VADChunker
+    from src.components.transcriber import Transcriber
+    from src.components.model_manager import get_model_manager, INDIC, WHISPER
+
+    manager = get_model_manager()
+    loads = {}
+    families = [WHISPER] if language == "en" else [INDIC, WHISPER]
+    for family in families:
+        start = time.perf_counter()
+        manager.get(family, manager.config.indic_model_name if family == INDIC else manager.config.whisper_model_name)
+        loads[family] = round(time.perf_counter() - start, 3)
+
+    results = []
+    for path in inputs:
+        audio = AudioExtractor().extract(path)
+        start = time.perf_counter()
+        detected = language or LanguageDetector().detect(audio).detected_language
+        detect_sec = time.perf_counter() - start
+        chunks = VADChunker().chunk(audio)
+        start = time.perf_counter()
+        transcript = Transcriber().transcribe(audio, detected, chunks)
+        transcribe_sec = time.perf_counter() - start
+        if transcript.error:
+            raise RuntimeError(f"{backend} transcription failed for {path}: {transcript.error}")
+        results.append({"input": path, "audio_sec": round(audio.duration_sec, 2), "language": detected,
+                        "detect_sec": round(detect_sec, 3), "transcribe_sec": round(transcribe_sec, 3),
+                        "transcription": transcript.transcription})
+        audio.release()
+    with open(output, "w") as f:
+        json.dump({"backend": backend, "load_sec": loads, "results": results}, f)
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX Runtime int8 vs torch parity and latency")
+    parser.add_argument("--inputs", nargs="+", help="audio/video files; defaults to synthetic clips")
+    parser.add_argument("--language", default=None, help="skip detection and force this language (en avoids the Indic model)")
+    parser.add_argument("--whisper-checkpoint", default=None, help="Whisper model name or local .pt checkpoint")
+    parser.add_argument("--max-wer", type=float, default=0.1)
+    parser.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args.backend, args.inputs, args.language, args.whisper_checkpoint, args.child_output)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="caption_onnx_parity_")
+    inputs = [os.path.abspath(path) for path in args.inputs or []]
+    if not inputs:
+        from benchmarks.synthetic_media import generate_video
+        inputs = [generate_video(os.path.join(workdir, f"synthetic_{sec}s.mp4"), sec, seed=sec) for sec in (30, 120)]
+
+    reports = {}
+    for backend in BACKENDS:
+        output = os.path.join(workdir, f"{backend}.json")
+        cmd = [sys.executable, "-m", "benchmarks.onnx_parity", "--backend", backend, "--child-output", output,
+               "--inputs", *inputs]
+        if args.language:
+            cmd += ["--language", args.language]
+        if args.whisper_checkpoint:
+            cmd += ["--whisper-checkpoint", os.path.abspath(os.path.expanduser(args.whisper_checkpoint))
+                    if os.path.exists(os.path.expanduser(args.whisper_checkpoint)) else args.whisper_checkpoint]
+        # Run from the repo root so both backends share artifacts/ (weight and ONNX caches)
+        subprocess.run(cmd, cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT}, check=True)
+        with open(output) as f:
+            reports[backend] = json.load(f)
+
+    failures = []
+    print(f"model load (s): " + ", ".join(f"{b}={reports[b]['load_sec']}" for b in BACKENDS))
+    print(f"{'input':32} {'audio_s':>7} {'lang':>9} {'detect t/o':>13} {'transcribe t/o':>17} {'speedup':>8} {'wer':>6}")
+    for ref, hyp in zip(reports["torch"]["results"], reports["onnx"]["results"]):
+        wer = word_error_rate(ref["transcription"], hyp["transcription"])
+        speedup = ref["transcribe_sec"] / hyp["transcribe_sec"] if hyp["transcribe_sec"] else 0.0
+        lang = ref["language"] if ref["language"] == hyp["language"] else f"{ref['language']}/{hyp['language']}"
+        print(f"{os.path.basename(ref['input'])[:32]:32} {ref['audio_sec']:>7.0f} {lang:>9} "
+              f"{ref['detect_sec']:>6.2f}/{hyp['detect_sec']:<6.2f} {ref['transcribe_sec']:>8.2f}/{hyp['transcribe_sec']:<8.2f} "
+              f"{speedup:>7.2f}x {wer:>6.3f}")
+        if ref["language"] != hyp["language"]:
+            failures.append(f"{ref['input']}: language {ref['language']} vs {hyp['language']}")
+        if wer > args.max_wer:
+            failures.append(f"{ref['input']}: WER {wer:.3f} above {args.max_wer}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Offline pipeline benchmarks with stub models and synthetic media.
+
+Usage:
+    python -m benchmarks.run_benchmarks --durations 30 120 600 --repeat 3
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import itertools
+import tempfile
+import threading
+import statistics
+import subprocess
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_models import StubIndicModel, StubWhisperModel
+from benchmarks.synthetic_media import generate_video
+
+# Unique across the whole run: identical synthetic audio would hit the result cache
+_media_seeds = itertools.count(100)
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+class PeakRSSSampler:
+    # Samples resident memory in the background; ru_maxrss can't be reset between stages
+    def __init__(self, interval_sec: float = 0.005):
+        self.interval_sec = interval_sec
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self.baseline = _rss_bytes()
+        self.peak = self.baseline
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_bytes())
+            time.sleep(self.interval_sec)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+def measure(fn: Callable, repeat: int, audio_sec: float) -> Dict[str, float]:
+    durations, peaks, result = [], [], None
+    for _ in range(repeat):
+        with PeakRSSSampler() as sampler:
+            start = time.perf_counter()
+            result = fn()
+            durations.append(time.perf_counter() - start)
+        peaks.append((sampler.peak - sampler.baseline) / 2**20)
+    median = statistics.median(durations)
+    return {
+        "repeat": repeat,
+        "mean_sec": round(statistics.mean(durations), 4),
+        "median_sec": round(median, 4),
+        "min_sec": round(min(durations), 4),
+        "max_sec": round(max(durations), 4),
+        "throughput_audio_sec_per_sec": round(audio_sec / median, 2) if median > 0 else None,
+        "peak_rss_delta_mb": round(max(peaks), 1),
+    }, result
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def install_stub_models(english: bool):
+    from src.components.model_manager import get_model_manager, INDIC, WHISPER
+    from src.entity.config_entity import ConfigEntity
+    config = ConfigEntity()
+    manager = get_model_manager()
+    manager.register(INDIC, config.indic_model_name, StubIndicModel(spoken_language=None if english else "hi"))
+    manager.register(WHISPER, config.whisper_model_name, StubWhisperModel(english=english))
+
+def run_scenario(media_dir: str, duration: float, english: bool, repeat: int) -> List[dict]:
+    from src.components.audio_extractor import AudioExtractor
+    from src.components.language_detector import LanguageDetector
+    from src.components.vad_chunker import VADChunker
+    from src.components.transcriber import Transcriber
+    from src.components.srt_generator import SRTGenerator
+    from src.pipeline.full_pipeline import process_task
+    from src.pipeline.task_store import InMemoryTaskStore
+    from src.entity.config_entity import ConfigEntity
+
+    install_stub_models(english)
+    scenario = "english" if english else "indic"
+    video_path = generate_video(os.path.join(media_dir, f"{scenario}_{duration:g}s.mp4"), duration, seed=1)
+    results = []
+
+    def record(stage: str, fn: Callable):
+        stats, value = measure(fn, repeat, duration)
+        results.append({"scenario": scenario, "audio_sec": duration, "stage": stage, **stats})
+        return value
+
+    audio = record("audio_extraction", lambda: AudioExtractor().extract(video_path))
+    lang = record("language_detection", lambda: LanguageDetector().detect(audio))
+    chunks = record("vad_chunking", lambda: VADChunker().chunk(audio))
+    trans = record("transcription", lambda: Transcriber().transcribe(audio, lang.detected_language, chunks))
+    record("srt_generation", lambda: SRTGenerator().generate(trans.word_timestamps, "bench", lang.detected_language, "bench"))
+
+    # End to end on fresh media each repeat so the result cache never short-circuits it
+    stages = ConfigEntity().pipeline_stages
+
+    def end_to_end():
+        index = next(_media_seeds)
+        path = generate_video(os.path.join(media_dir, f"e2e_{scenario}_{index}.mp4"), duration, seed=100 + index)
+        task_id = f"bench-{scenario}-{index}"
+        store = InMemoryTaskStore()
+        store.create(task_id, {"status": "queued", "stage": None, "progress": 0.0,
+                               "stages": {stage: "pending" for stage in stages}, "video_path": path,
+                               "file_sha256": None})
+        start = time.perf_counter()
+        process_task(task_id, store, task_id)
+        return time.perf_counter() - start, store.get(task_id)
+
+    durations, peaks = [], []
+    for _ in range(repeat):
+        with PeakRSSSampler() as sampler:
+            elapsed, task = end_to_end()
+        if task["status"] != "completed":
+            raise RuntimeError(f"End-to-end run failed: {task.get('error')}")
+        if task.get("cache_hit"):
+            raise RuntimeError("End-to-end run was served from the result cache")
+        durations.append(elapsed)
+        peaks.append((sampler.peak - sampler.baseline) / 2**20)
+    median = statistics.median(durations)
+    results.append({
+        "scenario": scenario, "audio_sec": duration, "stage": "end_to_end", "repeat": repeat,
+        "mean_sec": round(statistics.mean(durations), 4), "median_sec": round(median, 4),
+        "min_sec": round(min(durations), 4), "max_sec": round(max(durations), 4),
+        "throughput_audio_sec_per_sec": round(duration / median, 2),
+        "peak_rss_delta_mb": round(max(peaks), 1),
+    })
+    return results
+
+def compare(old_path: str, new_path: str):
+    with open(old_path) as f:
+        old = {(r["scenario"], r["audio_sec"], r["stage"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    print(f"{'scenario':8} {'audio_s':>8} {'stage':20} {'old_s':>9} {'new_s':>9} {'change':>8}")
+    for r in new:
+        before = old.get((r["scenario"], r["audio_sec"], r["stage"]))
+        if not before:
+            continue
+        change = (r["median_sec"] - before["median_sec"]) / before["median_sec"] * 100 if before["median_sec"] else 0.0
+        print(f"{r['scenario']:8} {r['audio_sec']:>8g} {r['stage']:20} {before['median_sec']:>9.4f} "
+              f"{r['median_sec']:>9.4f} {change:>+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the caption pipeline")
+    parser.add_argument("--durations", type=float, nargs="+", default=[30, 120, 600])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenarios", nargs="+", choices=["indic", "english"], default=["indic", "english"])
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if not shutil.which("ffmpeg"):
+        sys.exit("ffmpeg is required to generate synthetic media")
+
+    commit = _git_commit()
+    workdir = tempfile.mkdtemp(prefix="caption_bench_")
+    # Run inside a scratch directory so artifacts, caches and logs don't touch the checkout
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import torch
+        # Repeats transcribe the same audio, which the chunk cache would turn into lookups
+        from src.entity import config_entity
+        config_entity.CHUNK_CACHE = False
+        results = []
+        for english in [s == "english" for s in args.scenarios]:
+            for duration in args.durations:
+                results.extend(run_scenario(os.path.join(workdir, "media"), duration, english, args.repeat))
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"benchmark_{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Cold-start checks: how long `import app` takes, and Whisper weight loading with and without the cache.
+
+Exits non-zero if importing the app pulls in torch, whisper or transformers, or takes longer than
+--max-import-sec, so it can gate CI.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --max-import-sec 2 --skip-weights
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["torch", "whisper", "transformers"]
+
+IMPORT_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import app
+print(json.dumps({"import_sec": time.perf_counter() - start,
+                  "heavy_imported": [m for m in %r if m in sys.modules]}))
+""" % HEAVY_MODULES
+
+CHECKPOINT_SCRIPT = """
+import sys, torch
+from whisper.model import Whisper, ModelDimensions
+from src.utils.weight_cache import save_whisper
+dims = ModelDimensions(n_mels=80, n_audio_ctx=1500, n_audio_state=768, n_audio_head=12, n_audio_layer=12,
+                       n_vocab=51865, n_text_ctx=448, n_text_state=768, n_text_head=12, n_text_layer=12)
+model = Whisper(dims).eval()
+torch.save({"dims": dims.__dict__, "model_state_dict": model.state_dict()}, sys.argv[1])
+save_whisper(model, sys.argv[2])
+"""
+
+# torch and whisper are imported before the clock starts: only the weight loading is compared
+LOAD_PROBE = """
+import sys, time, json, torch, whisper
+from src.utils.weight_cache import load_whisper
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096
+mode, path = sys.argv[1], sys.argv[2]
+before = rss()
+start = time.perf_counter()
+model = whisper.load_model(path, device="cpu") if mode == "torch.load" else load_whisper(path)
+print(json.dumps({"load_sec": time.perf_counter() - start, "rss_delta_mb": (rss() - before) / 2**20}))
+"""
+
+def _run(script: str, *args, cwd: str) -> dict:
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    result = subprocess.run([sys.executable, "-c", script, *args], cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1]) if result.stdout.strip() else {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start timing for the caption API")
+    parser.add_argument("--max-import-sec", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-weights", action="store_true")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="caption_startup_") as workdir:
+        # Fresh interpreters each time; the scratch cwd keeps artifacts/ and logs/ out of the checkout
+        imports = [_run(IMPORT_PROBE, cwd=workdir) for _ in range(args.repeat)]
+        import_sec = min(r["import_sec"] for r in imports)
+        heavy = sorted({m for r in imports for m in r["heavy_imported"]})
+        print(f"import app: {import_sec:.3f}s (best of {args.repeat}), heavy modules imported: {heavy or 'none'}")
+        if heavy:
+            failures.append(f"import app pulled in {', '.join(heavy)}")
+        if import_sec > args.max_import_sec:
+            failures.append(f"import app took {import_sec:.2f}s (limit {args.max_import_sec}s)")
+
+        if not args.skip_weights:
+            checkpoint = os.path.join(workdir, "whisper-small-random.pt")
+            cached = os.path.join(workdir, "whisper-small-random.safetensors")
+            _run(CHECKPOINT_SCRIPT, checkpoint, cached, cwd=workdir)
+            for mode, path in (("torch.load", checkpoint), ("mmap cache", cached)):
+                runs = [_run(LOAD_PROBE, mode, path, cwd=workdir) for _ in range(args.repeat)]
+                best = min(runs, key=lambda r: r["load_sec"])
+                print(f"whisper small weights via {mode:10}: {best['load_sec']:.3f}s, RSS +{best['rss_delta_mb']:.0f} MB")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
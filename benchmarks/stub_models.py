@@ -0,0 +1,78 @@
+import zlib
+import numpy as np
+import torch
+
+# Deterministic stand-ins for IndicConformer and Whisper with the same call signatures the
+# components use. Output depends only on the input length/language, and each call does a
+# fixed amount of matmul work per second of audio so timings scale like real inference.
+
+SAMPLE_RATE = 16000
+WORDS = ["namaste", "duniya", "samay", "pani", "ghar", "kaam", "shabd", "awaaz", "desh", "pyaar"]
+
+def _burn(seconds_of_audio: float, work_per_second: int):
+    iterations = max(1, int(seconds_of_audio * work_per_second))
+    a = torch.full((128, 128), 0.5)
+    for _ in range(iterations):
+        a = torch.tanh(a @ a)
+    return a
+
+def _words(seed: str, count: int):
+    start = zlib.crc32(seed.encode("utf-8"))
+    return [WORDS[(start + i) % len(WORDS)] for i in range(count)]
+
+class StubIndicModel:
+    def __init__(self, spoken_language: str = "hi", words_per_second: float = 2.5, work_per_second: int = 20):
+        self.spoken_language = spoken_language
+        self.words_per_second = words_per_second
+        self.work_per_second = work_per_second
+        self.calls = 0
+
+    def __call__(self, wav, lang: str, mode: str = "ctc") -> str:
+        self.calls += 1
+        seconds = wav.shape[-1] / SAMPLE_RATE
+        _burn(seconds, self.work_per_second)
+        if lang != self.spoken_language:
+            # Wrong languages decode to short garbage, like the real model on mismatched audio
+            return "aa" if seconds > 1 else ""
+        count = max(1, int(seconds * self.words_per_second))
+        return " ".join(_words(f"{lang}:{wav.shape[-1]}", count))
+
+class _Dims:
+    n_mels = 80
+
+class StubWhisperModel:
+    def __init__(self, english: bool = False, words_per_second: float = 2.5, work_per_second: int = 20):
+        self.english = english
+        self.words_per_second = words_per_second
+        self.work_per_second = work_per_second
+        self.dims = _Dims()
+        self.device = "cpu"
+        self.calls = 0
+
+    def detect_language(self, mel):
+        self.calls += 1
+        _burn(30, self.work_per_second // 10 or 1)
+        en = 0.92 if self.english else 0.03
+        probs = {"en": en, "hi": (1 - en) * 0.7, "ta": (1 - en) * 0.2, "te": (1 - en) * 0.1}
+        return torch.tensor([0]), probs
+
+    def transcribe(self, audio, language=None, word_timestamps=False, clip_timestamps=None,
+                   initial_prompt=None, verbose=False, **kwargs):
+        self.calls += 1
+        audio = np.asarray(audio)
+        duration = len(audio) / SAMPLE_RATE
+        clips = clip_timestamps or [0.0, duration]
+        segments, texts = [], []
+        for start, end in zip(clips[0::2], clips[1::2]):
+            seconds = max(0.0, end - start)
+            _burn(seconds, self.work_per_second)
+            count = max(1, int(seconds * self.words_per_second))
+            step = seconds / count
+            words = [
+                {"word": f" {word}", "start": round(start + i * step, 3), "end": round(start + (i + 1) * step, 3)}
+                for i, word in enumerate(_words(f"en:{start:.2f}", count))
+            ]
+            text = "".join(w["word"] for w in words)
+            texts.append(text)
+            segments.append({"start": start, "end": end, "text": text, "words": words if word_timestamps else []})
+        return {"text": "".join(texts), "segments": segments, "language": language or ("en" if self.english else "hi")}
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import numpy as np
+
+def _speech_like_expression(seed: int) -> str:
+    # A voiced-sounding tone with syllable-rate modulation, gated into ~3 s phrases and ~1 s pauses
+    pitch = 140 + (seed * 37) % 120
+    return (
+        f"0.3*sin(2*PI*{pitch}*t)*(0.6+0.4*sin(2*PI*4*t))"
+        f"*gt(mod(t+{seed % 3},4),1)"
+        f"+0.002*(random(0)-0.5)"
+    )
+
+def generate_video(path: str, duration_sec: float, seed: int = 0, with_video: bool = True) -> str:
+    """Render a synthetic clip locally with ffmpeg's lavfi sources; no network or real media needed."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+           "-f", "lavfi", "-i", f"aevalsrc='{_speech_like_expression(seed)}':s=44100:d={duration_sec}"]
+    if with_video:
+        cmd += ["-f", "lavfi", "-i", f"color=c=black:s=320x240:r=10:d={duration_sec}",
+                "-c:v", "libx264", "-preset", "ultrafast", "-tune", "stillimage"]
+    cmd += ["-c:a", "aac", "-b:a", "64k", "-shortest", path]
+    subprocess.run(cmd, check=True)
+    return path
+
+def speech_like_pcm(duration_sec: float, seed: int = 0, sample_rate: int = 16000) -> np.ndarray:
+    """Float32 mono audio of random voiced/unvoiced syllables and pauses; unlike the lavfi tone, no two
+    stretches of it sound alike, so audio fingerprints can tell them apart."""
+    rng = np.random.default_rng(seed)
+    pcm = np.zeros(int(duration_sec * sample_rate), dtype=np.float32)
+    position = rng.uniform(0.0, 0.5)
+    while position < duration_sec:
+        syllable_sec = rng.uniform(0.12, 0.35)
+        t = np.arange(int(syllable_sec * sample_rate)) / sample_rate
+        if rng.random() < 0.3:
+            signal = rng.standard_normal(len(t)) * 0.5
+        else:
+            pitch = rng.uniform(90, 260) * (1 + rng.uniform(-0.2, 0.2) * t / syllable_sec)
+            phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+            signal = sum(rng.uniform(0, 1) / k * np.sin(k * phase) for k in range(1, 20))
+        start = int(position * sample_rate)
+        segment = (signal * np.sin(np.pi * t / syllable_sec) * 0.1).astype(np.float32)[:len(pcm) - start]
+        pcm[start:start + len(segment)] += segment
+        # Mostly continuous syllables, with a pause every few words
+        position += syllable_sec + (rng.uniform(0.6, 1.2) if rng.random() < 0.08 else rng.uniform(0.0, 0.05))
+    return pcm
+
+def encode_pcm(path: str, pcm: np.ndarray, sample_rate: int = 16000, codec_args=("-c:a", "aac", "-b:a", "64k")) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    raw = (np.clip(pcm, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-f", "s16le", "-ar", str(sample_rate), "-ac", "1",
+                    "-i", "-", "-ar", "44100", *codec_args, path], input=raw, check=True)
+    return path
@@ -0,0 +1,196 @@
+import os
+import sys
+import gzip
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+from typing import Dict, Optional, Set
+from src.entity.artifacts import StoredArtifact
+from src.entity.config_entity import ArtifactStoreConfig, ConfigEntity
+from src.logger import logging
+from src.exceptions import CustomException
+
+class ArtifactStore:
+    # Unreferenced blobs younger than this may belong to a put() that hasn't written its index yet
+    ORPHAN_GRACE_SEC = 300
+
+    def __init__(self):
+        self.config = ArtifactStoreConfig(config=ConfigEntity())
+        self.blob_dir = os.path.join(self.config.root_dir, "blobs")
+        self.index_dir = os.path.join(self.config.root_dir, "tasks")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "deduplicated": 0, "expired_tasks": 0, "removed_blobs": 0, "compactions": 0}
+        logging.info(f"ArtifactStore initialized at {self.config.root_dir}")
+
+    def _blob_path(self, sha256: str, ext: str) -> str:
+        # Two levels of sharding keep directories small with millions of files
+        return os.path.join(self.blob_dir, sha256[:2], sha256[2:4], f"{sha256}{ext}")
+
+    def _index_path(self, task_id: str) -> str:
+        return os.path.join(self.index_dir, task_id[:2], f"{task_id}.json")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read_index(self, task_id: str) -> dict:
+        try:
+            with open(self._index_path(task_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"artifacts": {}}
+
+    def put(self, task_id: str, name: str, content, media_type: str) -> StoredArtifact:
+        try:
+            data = content.encode("utf-8") if isinstance(content, str) else content
+            sha256 = hashlib.sha256(data).hexdigest()
+            ext = os.path.splitext(name)[1]
+            blob_path = self._blob_path(sha256, ext)
+            gzip_path = f"{blob_path}.gz" if len(data) >= self.config.gzip_min_bytes else None
+
+            if os.path.exists(blob_path):
+                # Same content already stored for another task; refresh it so the compactor keeps it
+                os.utime(blob_path)
+                deduplicated = True
+            else:
+                self._write_atomic(blob_path, data)
+                deduplicated = False
+            if gzip_path and not os.path.exists(gzip_path):
+                # Precompressed once here so downloads can still be served with sendfile
+                self._write_atomic(gzip_path, gzip.compress(data, compresslevel=9, mtime=0))
+
+            now = time.time()
+            with self._lock:
+                index = self._read_index(task_id)
+                index.setdefault("created_at", now)
+                index["artifacts"][name] = {"sha256": sha256, "ext": ext, "size_bytes": len(data),
+                                            "media_type": media_type, "created_at": now, "gzip": bool(gzip_path)}
+                self._write_atomic(self._index_path(task_id), json.dumps(index).encode("utf-8"))
+                self._stats["puts"] += 1
+                self._stats["deduplicated"] += int(deduplicated)
+
+            return StoredArtifact(task_id=task_id, name=name, sha256=sha256, size_bytes=len(data), media_type=media_type,
+                                  created_at=now, file_path=blob_path, gzip_path=gzip_path)
+
+        except Exception as e:
+            logging.error(f"Artifact store write failed for {task_id}/{name}: {str(e)}")
+            raise CustomException(e, sys)
+
+    def get(self, task_id: str, name: str) -> Optional[StoredArtifact]:
+        entry = self._read_index(task_id)["artifacts"].get(name)
+        if entry is None:
+            return None
+        blob_path = self._blob_path(entry["sha256"], entry["ext"])
+        if not os.path.exists(blob_path):
+            return None
+        gzip_path = f"{blob_path}.gz" if entry.get("gzip") and os.path.exists(f"{blob_path}.gz") else None
+        return StoredArtifact(task_id=task_id, name=name, sha256=entry["sha256"], size_bytes=entry["size_bytes"],
+                              media_type=entry["media_type"], created_at=entry["created_at"], file_path=blob_path,
+                              gzip_path=gzip_path)
+
+    def list(self, task_id: str) -> Dict[str, dict]:
+        return self._read_index(task_id)["artifacts"]
+
+    def compact(self) -> dict:
+        # Expire task indexes by age, then by total size (oldest first), then drop blobs nobody references
+        now = time.time()
+        indexes = []
+        for shard in os.scandir(self.index_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    task_id = entry.name[:-len(".json")]
+                    indexes.append((self._read_index(task_id).get("created_at", entry.stat().st_mtime), task_id))
+
+        expired = 0
+        live = []
+        for created_at, task_id in sorted(indexes):
+            if now - created_at > self.config.ttl_sec:
+                self._remove(self._index_path(task_id))
+                expired += 1
+            else:
+                live.append((created_at, task_id))
+
+        blobs = self._scan_blobs()
+        refs = {task_id: self._task_blobs(task_id) for _, task_id in live}
+        counts = Counter(path for paths in refs.values() for path in paths)
+        budget = self.config.max_disk_mb * 1024 * 1024
+        total = sum(blobs[path][0] for path in counts if path in blobs)
+        while live and total > budget:
+            _, task_id = live.pop(0)
+            self._remove(self._index_path(task_id))
+            expired += 1
+            for path in refs.pop(task_id):
+                counts[path] -= 1
+                if counts[path] == 0 and path in blobs:
+                    total -= blobs[path][0]
+
+        removed = 0
+        for path, (size, mtime) in blobs.items():
+            if counts[path] <= 0 and now - mtime > self.ORPHAN_GRACE_SEC:
+                self._remove(path)
+                removed += 1
+
+        with self._lock:
+            self._stats["expired_tasks"] += expired
+            self._stats["removed_blobs"] += removed
+            self._stats["compactions"] += 1
+        if expired or removed:
+            logging.info(f"Artifact store compacted: {expired} tasks expired, {removed} blobs removed")
+        return {"expired_tasks": expired, "removed_blobs": removed}
+
+    def _scan_blobs(self) -> Dict[str, tuple]:
+        blobs = {}
+        for root, _, files in os.walk(self.blob_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                blobs[path] = (stat.st_size, stat.st_mtime)
+        return blobs
+
+    def _task_blobs(self, task_id: str) -> Set[str]:
+        paths = set()
+        for entry in self._read_index(task_id)["artifacts"].values():
+            blob_path = self._blob_path(entry["sha256"], entry["ext"])
+            paths.update((blob_path, f"{blob_path}.gz"))
+        return paths
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def run_compactor(self, stop_event: threading.Event):
+        while not stop_event.wait(self.config.compact_interval_sec):
+            try:
+                self.compact()
+            except Exception as e:
+                logging.error(f"Artifact compaction failed: {str(e)}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+_artifact_store = None
+_artifact_store_lock = threading.Lock()
+
+def get_artifact_store() -> ArtifactStore:
+    global _artifact_store
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            _artifact_store = ArtifactStore()
+        return _artifact_store
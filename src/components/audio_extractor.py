@@ -1,9 +1,14 @@
 import os
-import subprocess
+import re
 import sys
-import tempfile
+import uuid
+import threading
+import subprocess
+from typing import Callable, Optional
+import numpy as np
 from src.entity.artifacts import AudioExtractionArtifact
 from src.entity.config_entity import AudioExtractorConfig, ConfigEntity
+from src.components.scratch_space import TaskWorkspace, owner_token
 from src.logger import logging
 from src.exceptions import CustomException
 
@@ -12,26 +17,93 @@ class AudioExtractor:
         self.config = AudioExtractorConfig(config=ConfigEntity()) 
         logging.info("AudioExtractor initialized")
 
-    def extract(self, video_path: str) -> AudioExtractionArtifact:
+    def extract(self, video_path: str,
+                on_leading: Optional[Callable[[AudioExtractionArtifact], None]] = None,
+                workspace: Optional[TaskWorkspace] = None, duration_sec: Optional[float] = None) -> AudioExtractionArtifact:
+        # on_leading gets the first leading_segment_sec of audio as soon as ffmpeg has decoded it (or all
+        # of it, for shorter files), while the rest of the file is still being decoded.
+        # With a workspace, the PCM is a scratch file of the task, sized from duration_sec for the quota.
+        pcm_path = None
         try:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-                audio_path = temp_audio.name
+            if workspace:
+                expected_bytes = int(duration_sec * self.config.target_sample_rate) * 2 if duration_sec else None
+                pcm_path = workspace.path("audio.pcm", expected_bytes)
+            else:
+                os.makedirs(self.config.audio_dir, exist_ok=True)
+                pcm_path = os.path.join(self.config.audio_dir, f"{owner_token()}-{uuid.uuid4().hex}.pcm")
 
+            # Decode straight to raw 16-bit mono PCM on stdout, no intermediate WAV
             cmd = [
-                "ffmpeg", "-y", "-i", video_path,
-                "-ac", "1", "-ar", str(self.config.target_sample_rate),
-                "-acodec", "pcm_s16le", audio_path
+                "ffmpeg", "-nostdin", "-loglevel", "error", "-i", video_path,
+                "-vn", "-ac", "1", "-ar", str(self.config.target_sample_rate),
+                "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1"
             ]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            # Drained on a thread so a chatty ffmpeg can't block on a full stderr pipe
+            stderr = []
+            stderr_thread = threading.Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True)
+            stderr_thread.start()
 
-            if result.returncode != 0:
-                raise CustomException(f"FFmpeg error: {result.stderr}", sys)
+            # PCM goes to disk as it arrives; only the leading segment is also kept in memory
+            leading_bytes = int(self.config.leading_segment_sec * self.config.target_sample_rate) * 2
+            leading = bytearray()
+            size = 0
+            try:
+                with open(pcm_path, "wb") as out:
+                    while True:
+                        block = process.stdout.read(self.config.extract_read_size)
+                        if not block:
+                            break
+                        out.write(block)
+                        size += len(block)
+                        if on_leading:
+                            leading += block[:leading_bytes - len(leading)]
+                            if len(leading) >= leading_bytes:
+                                on_leading(self._leading_artifact(leading))
+                                on_leading = None
+            finally:
+                process.stdout.close()
+                returncode = process.wait()
+                stderr_thread.join()
 
-            logging.info(f"Audio extracted successfully to {audio_path}")
-            return AudioExtractionArtifact(audio_path=audio_path)
+            if returncode != 0:
+                raise CustomException(f"FFmpeg error: {b''.join(stderr).decode(errors='replace')}", sys)
+            if size < 2:
+                raise CustomException("No audio stream found in video", sys)
+
+            pcm = np.memmap(pcm_path, dtype=np.int16, mode="r", shape=(size // 2,))
+            audio_artifact = AudioExtractionArtifact(pcm=pcm, sample_rate=self.config.target_sample_rate,
+                                                     pcm_path=pcm_path)
+            if on_leading:
+                on_leading(self._leading_artifact(leading))
+            logging.info(f"Audio extracted successfully ({audio_artifact.duration_sec:.2f}s at {self.config.target_sample_rate} Hz)")
+            return audio_artifact
 
         except Exception as e:
+            if pcm_path and os.path.exists(pcm_path):
+                os.unlink(pcm_path)
             logging.error(f"Error in audio extraction: {str(e)}")
             raise CustomException(e, sys)
 
+    def probe_duration(self, video_path: str) -> Optional[float]:
+        # Container duration from the headers; None when it can't be told (the decode will report why)
+        cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+               "-of", "default=noprint_wrappers=1:nokey=1", video_path]
+        try:
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.config.probe_timeout_sec, check=True)
+                duration = float(result.stdout.strip())
+            except FileNotFoundError:
+                # Builds without ffprobe: ffmpeg prints the same header before complaining about the missing output
+                result = subprocess.run(["ffmpeg", "-nostdin", "-hide_banner", "-i", video_path], capture_output=True,
+                                        text=True, timeout=self.config.probe_timeout_sec)
+                match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+                duration = int(match[1]) * 3600 + int(match[2]) * 60 + float(match[3]) if match else 0.0
+            return duration if duration > 0 else None
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            logging.warning(f"Could not probe duration of {video_path}: {str(e)}")
+            return None
 
+    def _leading_artifact(self, pcm_bytes: bytearray) -> AudioExtractionArtifact:
+        pcm = np.frombuffer(bytes(pcm_bytes[:len(pcm_bytes) // 2 * 2]), dtype=np.int16)
+        return AudioExtractionArtifact(pcm=pcm, sample_rate=self.config.target_sample_rate)
@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.entity.artifacts import AudioChunk
+from src.entity.config_entity import ChunkCacheConfig, ConfigEntity
+from src.utils.metrics import get_metrics
+from src.logger import logging
+from src.exceptions import CustomException
+
+@dataclass
+class ChunkFingerprint:
+    # frames: one uint32 per hop, for alignment and the final bit-error check
+    # signature: 32 bits of the chunk's average spectrum, stable enough to find candidates with
+    frames: np.ndarray
+    signature: int
+
+class ChunkCache:
+    """Transcriptions of individual speech chunks, keyed by an audio fingerprint that survives
+    re-encoding and small shifts, so a trimmed or re-edited re-upload only transcribes new audio."""
+
+    # 128 ms frames every 16 ms; 32 bits per frame from 33 log-spaced bands between 300 and 3000 Hz
+    # (sign of the band-energy difference across frequency and time)
+    FINGERPRINT_VERSION = 1
+    FRAME = 2048
+    HOP = 256
+    BANDS = np.geomspace(300, 3000, 34)
+    MAX_SIGNATURE_DISTANCE = 6  # re-encoded copies differ by up to ~4 bits, unrelated chunks by ~16
+    MAX_CANDIDATES = 3
+    PURGE_INTERVAL = 500  # puts
+
+    def __init__(self, path: Optional[str] = None):
+        self.config = ChunkCacheConfig(config=ConfigEntity())
+        self.path = path or self.config.sqlite_path
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "puts": 0, "reused_sec": 0.0}
+        self._puts_since_purge = 0
+        self.metrics = get_metrics()
+        self._band_index = None
+        try:
+            conn = self._conn()
+            conn.execute("""CREATE TABLE IF NOT EXISTS chunks (
+                chunk_id INTEGER PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                duration REAL NOT NULL,
+                signature INTEGER NOT NULL,
+                fingerprint BLOB NOT NULL,
+                transcription TEXT NOT NULL,
+                words TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_duration ON chunks (namespace, duration)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_last_used ON chunks (last_used)")
+        except sqlite3.Error as e:
+            raise CustomException(e, sys)
+        logging.info(f"ChunkCache initialized at {self.path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and per process; a connection must never cross a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def namespace(self, model: str, language: str, timing: str) -> str:
+        # Cached text is only valid for the model, language and word-timing method that produced it
+        return f"v{self.FINGERPRINT_VERSION}:{model}:{language}:{timing}"
+
+    @staticmethod
+    def _pack(bits: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(np.packbits(bits, axis=-1, bitorder="little")).view("<u4").astype(np.uint32)
+
+    def fingerprint(self, samples: np.ndarray, sample_rate: int) -> Optional[ChunkFingerprint]:
+        """None for audio shorter than two frames. A time shift of the audio is just a shift of the frames."""
+        if len(samples) < self.FRAME + self.HOP:
+            return None
+        if self._band_index is None:
+            self._window = np.hanning(self.FRAME).astype(np.float32)
+            self._band_index = np.searchsorted(np.fft.rfftfreq(self.FRAME, 1.0 / sample_rate), self.BANDS)
+        n_frames = 1 + (len(samples) - self.FRAME) // self.HOP
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.FRAME)[::self.HOP][:n_frames]
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2
+        # Band energies via cumulative sums over the FFT bins, per frame and averaged over the chunk
+        power = np.concatenate([power, power.mean(axis=0, keepdims=True)])
+        cumulative = np.concatenate([np.zeros((len(power), 1)), np.cumsum(power, axis=1)], axis=1)
+        energy = np.log(cumulative[:, self._band_index[1:]] - cumulative[:, self._band_index[:-1]] + 1e-9)
+        diff = energy[:, :-1] - energy[:, 1:]
+        frame_bits = (diff[1:-1] - diff[:-2]) > 0
+        return ChunkFingerprint(frames=self._pack(frame_bits).ravel(), signature=int(self._pack(diff[-1] > 0)[0]))
+
+    @staticmethod
+    def _bit_error_rate(a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.unpackbits((a ^ b).view(np.uint8)).mean())
+
+    def _align(self, query: np.ndarray, stored: np.ndarray, max_lag: int) -> Tuple[float, int]:
+        # Lowest bit error rate over the allowed shifts; query frame i lines up with stored frame i + lag
+        best = (1.0, 0)
+        for lag in range(-max_lag, max_lag + 1):
+            start, end = max(0, -lag), min(len(query), len(stored) - lag)
+            if end - start < len(query) // 2:
+                continue
+            best = min(best, (self._bit_error_rate(query[start:end], stored[start + lag:end + lag]), lag))
+        return best
+
+    def lookup(self, namespace: str, fingerprint: Optional[ChunkFingerprint],
+               chunk: AudioChunk) -> Optional[Tuple[str, List[Dict]]]:
+        """Transcription and words (shifted to this chunk's absolute time) of a stored chunk with the same audio."""
+        if fingerprint is None:
+            return None
+        try:
+            conn = self._conn()
+            edge = self.config.max_edge_sec
+            rows = conn.execute("SELECT chunk_id, signature FROM chunks WHERE namespace = ? AND duration BETWEEN ? AND ?",
+                                (namespace, chunk.duration_sec - 2 * edge, chunk.duration_sec + 2 * edge)).fetchall()
+            candidates = sorted((bin(signature ^ fingerprint.signature).count("1"), chunk_id) for chunk_id, signature in rows)
+            hop_sec = self.HOP / chunk.sample_rate
+            for distance, chunk_id in candidates[:self.MAX_CANDIDATES]:
+                if distance > self.MAX_SIGNATURE_DISTANCE:
+                    break
+                row = conn.execute("SELECT duration, fingerprint, transcription, words FROM chunks WHERE chunk_id = ?",
+                                   (chunk_id,)).fetchone()
+                if row is None:
+                    continue
+                duration, blob, transcription, words = row
+                ber, lag = self._align(fingerprint.frames, np.frombuffer(blob, dtype=np.uint32), int(edge / hop_sec))
+                # The new chunk's span in the stored chunk's time; both edges must line up within tolerance
+                shift = lag * hop_sec
+                if ber > self.config.max_ber or abs(shift + chunk.duration_sec - duration) > edge:
+                    continue
+                conn.execute("UPDATE chunks SET last_used = ? WHERE chunk_id = ?", (time.time(), chunk_id))
+                words = [{**word, "start": max(chunk.start_sec, chunk.start_sec + word["start"] - shift),
+                          "end": min(chunk.end_sec, chunk.start_sec + word["end"] - shift)}
+                         for word in json.loads(words)]
+                self._count("hits", chunk.duration_sec)
+                return transcription, words
+        except sqlite3.Error as e:
+            logging.warning(f"Chunk cache lookup failed: {str(e)}")
+        self._count("misses")
+        return None
+
+    def put(self, namespace: str, fingerprint: Optional[ChunkFingerprint], chunk: AudioChunk, transcription: str,
+            words: List[Dict]):
+        if fingerprint is None:
+            return
+        # Word times are stored relative to the chunk start
+        relative = [{**word, "start": word["start"] - chunk.start_sec, "end": word["end"] - chunk.start_sec}
+                    for word in words]
+        now = time.time()
+        try:
+            self._conn().execute(
+                "INSERT INTO chunks (namespace, duration, signature, fingerprint, transcription, words, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (namespace, chunk.duration_sec, fingerprint.signature, fingerprint.frames.tobytes(), transcription,
+                 json.dumps(relative, ensure_ascii=False, default=float), now, now)
+            )
+        except sqlite3.Error as e:
+            logging.warning(f"Chunk cache write failed: {str(e)}")
+            return
+        with self._lock:
+            self._stats["puts"] += 1
+            self._puts_since_purge += 1
+            purge = self._puts_since_purge >= self.PURGE_INTERVAL
+            if purge:
+                self._puts_since_purge = 0
+        if purge:
+            self.purge()
+
+    def purge(self):
+        # Least recently used chunks go first once expired or over the cap
+        try:
+            conn = self._conn()
+            total = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+            expired = conn.execute("DELETE FROM chunks WHERE last_used < ?",
+                                   (time.time() - self.config.ttl_sec,)).rowcount
+            over_cap = conn.execute(
+                "DELETE FROM chunks WHERE chunk_id IN (SELECT chunk_id FROM chunks ORDER BY last_used LIMIT ?)",
+                (max(0, total - expired - self.config.max_entries),)
+            ).rowcount
+            if expired or over_cap:
+                logging.info(f"Chunk cache purged {expired} expired and {over_cap} excess chunks")
+        except sqlite3.Error as e:
+            logging.warning(f"Chunk cache purge failed: {str(e)}")
+
+    def _count(self, result: str, seconds: float = 0.0):
+        with self._lock:
+            self._stats[result] += 1
+            self._stats["reused_sec"] += seconds
+        self.metrics.inc("caption_chunk_cache_total", result=result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["reused_sec"] = round(stats["reused_sec"], 1)
+        try:
+            stats["entries"] = self._conn().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        except sqlite3.Error:
+            pass
+        return stats
+
+_chunk_cache = None
+_chunk_cache_lock = threading.Lock()
+
+def get_chunk_cache() -> ChunkCache:
+    global _chunk_cache
+    with _chunk_cache_lock:
+        if _chunk_cache is None:
+            _chunk_cache = ChunkCache()
+        return _chunk_cache
@@ -0,0 +1,111 @@
+import numpy as np
+from typing import Dict, List, Optional
+from src.utils import model_utils
+from src.logger import logging
+
+class CTCAligner:
+    def __init__(self, model):
+        self.model = model
+        self._token_maps: Dict[str, Dict[str, int]] = {}
+
+    def align(self, logprobs, text: str, language: str, offset_sec: float, duration_sec: float) -> Optional[List[Dict[str, any]]]:
+        """Force-align the transcript onto CTC frame log-probs; returns absolute word times, or None if it can't."""
+        words = text.split()
+        if logprobs is None or not words:
+            return None
+        word_tokens = [self._tokenize(word, language) for word in words]
+        if any(tokens is None for tokens in word_tokens):
+            return None
+
+        tokens = [token for tokens_ in word_tokens for token in tokens_]
+        lp = logprobs.detach().cpu().numpy() if hasattr(logprobs, "detach") else np.asarray(logprobs)
+        path = self._viterbi(lp, tokens, model_utils.blank_id(self.model, language))
+        if path is None:
+            return None
+
+        # Odd states are tokens; first/last frame of each token along the best path
+        num_frames = lp.shape[0]
+        token_of_frame = np.where(path % 2 == 1, (path - 1) // 2, -1)
+        frames = np.arange(num_frames)
+        token_start = np.full(len(tokens), num_frames)
+        token_end = np.full(len(tokens), -1)
+        emitted = token_of_frame >= 0
+        np.minimum.at(token_start, token_of_frame[emitted], frames[emitted])
+        np.maximum.at(token_end, token_of_frame[emitted], frames[emitted])
+
+        frame_sec = duration_sec / num_frames
+        word_timestamps = []
+        first = 0
+        for word, tokens_ in zip(words, word_tokens):
+            last = first + len(tokens_) - 1
+            start = offset_sec + token_start[first] * frame_sec
+            end = offset_sec + (token_end[last] + 1) * frame_sec
+            word_timestamps.append({"word": word, "start": round(float(start), 3), "end": round(float(end), 3)})
+            first = last + 1
+        return word_timestamps
+
+    def _tokenize(self, word: str, language: str) -> Optional[List[int]]:
+        # Greedy longest match against the SentencePiece vocab; words start with the "▁" marker
+        token_map = self._token_map(language)
+        max_len = max((len(piece) for piece in token_map), default=0)
+        piece_text = "▁" + word
+        tokens, i = [], 0
+        while i < len(piece_text):
+            for size in range(min(max_len, len(piece_text) - i), 0, -1):
+                token = token_map.get(piece_text[i:i + size])
+                if token is not None:
+                    tokens.append(token)
+                    i += size
+                    break
+            else:
+                return None
+        return tokens
+
+    def _token_map(self, language: str) -> Dict[str, int]:
+        if language not in self._token_maps:
+            blank = model_utils.blank_id(self.model, language)
+            self._token_maps[language] = {
+                piece: index for index, piece in enumerate(self.model.vocab[language]) if index != blank and piece
+            }
+        return self._token_maps[language]
+
+    @staticmethod
+    def _viterbi(lp: np.ndarray, tokens: List[int], blank: int) -> Optional[np.ndarray]:
+        # Standard CTC topology: blank, t1, blank, t2, ..., blank; vectorized over states per frame
+        num_frames = lp.shape[0]
+        ext = np.full(2 * len(tokens) + 1, blank, dtype=np.int64)
+        ext[1::2] = tokens
+        num_states = len(ext)
+        emit = lp[:, ext]
+
+        can_skip = np.zeros(num_states, dtype=bool)
+        can_skip[2:] = (ext[2:] != blank) & (ext[2:] != ext[:-2])
+
+        neg_inf = -np.inf
+        score = np.full(num_states, neg_inf)
+        score[0] = emit[0, 0]
+        if num_states > 1:
+            score[1] = emit[0, 1]
+        back = np.zeros((num_frames, num_states), dtype=np.int8)
+        states = np.arange(num_states)
+
+        for t in range(1, num_frames):
+            step = np.concatenate(([neg_inf], score[:-1]))
+            skip = np.concatenate(([neg_inf, neg_inf], score[:-2]))
+            skip[~can_skip] = neg_inf
+            candidates = np.stack([score, step, skip])
+            best = candidates.argmax(axis=0)
+            score = candidates[best, states] + emit[t]
+            back[t] = best
+
+        ends = [num_states - 1] + ([num_states - 2] if num_states > 1 else [])
+        state = max(ends, key=lambda s: score[s])
+        if not np.isfinite(score[state]):
+            logging.warning("CTC alignment infeasible: transcript longer than the available frames")
+            return None
+
+        path = np.empty(num_frames, dtype=np.int64)
+        for t in range(num_frames - 1, -1, -1):
+            path[t] = state
+            state -= back[t, state]
+        return path
@@ -0,0 +1,138 @@
+import os
+import sys
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+from src.entity.config_entity import InferenceBatcherConfig, ConfigEntity
+from src.utils import model_utils
+from src.utils.metrics import get_metrics
+from src.logger import logging
+from src.exceptions import CustomException
+
+@dataclass
+class _InferenceRequest:
+    model: Any
+    wav: Any
+    language: str
+    mode: str
+    future: Future = field(default_factory=Future)
+
+class InferenceBatcher:
+    def __init__(self):
+        self.config = InferenceBatcherConfig(config=ConfigEntity())
+        self._queue: "queue.Queue[_InferenceRequest]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._stats = {"requests": 0, "batches": 0, "batched_items": 0, "max_batch": 0}
+        self.metrics = get_metrics()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._loop, name="inference-batcher", daemon=True)
+        self._thread.start()
+        logging.info(f"InferenceBatcher initialized (max batch {self.config.max_batch_size}, "
+                     f"max wait {self.config.max_wait_ms} ms)")
+
+    def infer(self, model, wav, language: str, mode: str = "rnnt"):
+        if not self.config.enabled:
+            with self.metrics.model_call("indic", mode, language):
+                return model_utils.run(model, wav, language, mode)
+        request = _InferenceRequest(model=model, wav=wav, language=language, mode=mode)
+        with self._lock:
+            self._inflight += 1
+            self._stats["requests"] += 1
+        try:
+            self._queue.put(request)
+            return request.future.result()
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def _collect(self) -> List[_InferenceRequest]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.config.max_wait_ms / 1000
+        while len(batch) < self.config.max_batch_size:
+            with self._lock:
+                # Nobody else is waiting: don't hold a lone request back
+                if self._inflight <= len(batch) and self._queue.empty():
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            groups: Dict[Tuple[int, str, str], List[_InferenceRequest]] = {}
+            for request in batch:
+                groups.setdefault((id(request.model), request.language, request.mode), []).append(request)
+            for group in groups.values():
+                for sub_batch in self._split_by_length(group):
+                    self._run(sub_batch)
+
+    def _split_by_length(self, group: List[_InferenceRequest]) -> List[List[_InferenceRequest]]:
+        # Keep padding waste bounded by only batching similar lengths together
+        group = sorted(group, key=lambda r: r.wav.shape[-1])
+        batches, current = [], []
+        for request in group:
+            if current and request.wav.shape[-1] > current[0].wav.shape[-1] * self.config.max_pad_ratio:
+                batches.append(current)
+                current = []
+            current.append(request)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _run(self, batch: List[_InferenceRequest]):
+        model, language, mode = batch[0].model, batch[0].language, batch[0].mode
+        try:
+            with self.metrics.model_call("indic", mode, language, count=len(batch)):
+                if len(batch) > 1 and model_utils.supports_batched_encoding(model, mode):
+                    encoded = model_utils.encode_batch(model, [r.wav for r in batch])
+                    results = [model_utils.decode(model, enc, language, mode) for enc in encoded]
+                else:
+                    results = [model_utils.run(model, r.wav, language, mode) for r in batch]
+        except Exception as e:
+            # Fall back to one call per item so one bad input doesn't fail the whole batch
+            logging.warning(f"Batched inference failed, retrying individually: {str(e)}")
+            results = []
+            for r in batch:
+                try:
+                    results.append(model_utils.run(model, r.wav, language, mode))
+                except Exception as item_error:
+                    results.append(item_error)
+
+        for request, result in zip(batch, results):
+            if isinstance(result, Exception):
+                request.future.set_exception(CustomException(result, sys))
+            else:
+                request.future.set_result(result)
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["batched_items"] += len(batch)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["mean_batch"] = round(stats["batched_items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+_inference_batcher = None
+_inference_batcher_lock = threading.Lock()
+
+def get_inference_batcher() -> InferenceBatcher:
+    global _inference_batcher
+    with _inference_batcher_lock:
+        # A forked child inherits the object but not its serving thread: start a fresh one there
+        if _inference_batcher is None or _inference_batcher._pid != os.getpid() \
+                or not _inference_batcher._thread.is_alive():
+            _inference_batcher = InferenceBatcher()
+        return _inference_batcher
@@ -1,74 +1,46 @@
-import torch
-import torchaudio
-import whisper
 import sys
-from src.entity.artifacts import LanguageDetectionArtifact
+from typing import Dict, Optional
+from src.entity.artifacts import AudioExtractionArtifact, LanguageDetectionArtifact
 from src.entity.config_entity import LanguageDetectorConfig, ConfigEntity
+from src.components.language_scorer import IndicLanguageScorer
+from src.components.model_manager import get_model_manager
+from src.utils.metrics import get_metrics
 from src.logger import logging
 from src.exceptions import CustomException
-from transformers import AutoModel
+from src.utils.lazy_import import lazy_import
 
-# Global models (loaded in app.py)
-indic_model = None
-whisper_model = None
+torch = lazy_import("torch")
+whisper = lazy_import("whisper")
 
 class LanguageDetector:
     def __init__(self):
         self.config = LanguageDetectorConfig(config=ConfigEntity()) 
+        self.scorer = IndicLanguageScorer(self.config)
+        self.models = get_model_manager()
+        self.metrics = get_metrics()
         logging.info("LanguageDetector initialized")
 
-    def detect(self, audio_path: str) -> LanguageDetectionArtifact:
-        global indic_model, whisper_model
+    def detect(self, audio_artifact: AudioExtractionArtifact, whisper_model: Optional[str] = None) -> LanguageDetectionArtifact:
         try:
-            if not indic_model or not whisper_model:
-                raise CustomException("Models not loaded", sys)
+            # Audio is already decoded to mono at the target sample rate; only the leading segment is read
+            segment_length = min(self.config.segment_length_sec * self.config.target_sample_rate, audio_artifact.num_samples)
+            test_wav = torch.from_numpy(audio_artifact.window(0, segment_length)).unsqueeze(0)
 
-            # Load audio
-            wav, sr = torchaudio.load(audio_path)
-            if wav.shape[0] > 1:
-                wav = torch.mean(wav, dim=0, keepdim=True)
-            if sr != self.config.target_sample_rate:
-                resampler = torchaudio.transforms.Resample(sr, self.config.target_sample_rate)
-                wav = resampler(wav)
-
-            segment_length = min(self.config.segment_length_sec * self.config.target_sample_rate, wav.shape[1])
-            test_wav = wav[:, :segment_length]
-
-            # Test Indian languages
-            language_scores = {}
-            for lang in self.config.test_languages:
-                try:
-                    transcription = indic_model(test_wav, lang, "rnnt") or indic_model(test_wav, lang, "ctc")
-                    if transcription and len(transcription.strip()) > 3:
-                        text = transcription.strip()
-                        char_count = len(text)
-                        word_count = len(text.split())
-                        unique_chars = len(set(text.replace(' ', '')))
-                        if word_count >= 2 and char_count >= 8:
-                            score = (word_count * 15) + (unique_chars * 8) + min(char_count * 2, 100)
-                            language_scores[lang] = score
-                        else:
-                            language_scores[lang] = 0
-                    else:
-                        language_scores[lang] = 0
-                except:
-                    language_scores[lang] = 0
+            # Score Indian languages on a shared encoder pass
+            language_scores = self.scorer.score(self.models.get_indic_model(), test_wav)
 
             best_indian_lang = max(language_scores, key=language_scores.get) if language_scores else None
             best_indian_score = language_scores.get(best_indian_lang, 0)
 
-            # Test English if needed
+            # Test English if needed, using Whisper's language-ID head only
             english_prob = 0.0
+            language_probs = None
             if best_indian_score < 80:
-                result = whisper_model.transcribe(audio_path, language=None, verbose=False)
-                detected_lang = result.get('language', 'unknown')
-                text = result.get('text', '').strip()
-                if detected_lang == 'en' and len(text) > 10:
-                    english_prob = 0.8
-                elif detected_lang == 'en':
-                    english_prob = 0.3
-                else:
-                    english_prob = 0.2
+                all_probs = self._whisper_language_probs(self.models.get_whisper_model(whisper_model), audio_artifact)
+                english_prob = all_probs.get("en", 0.0)
+                top = sorted(all_probs.items(), key=lambda item: item[1], reverse=True)[:self.config.language_probs_top_k]
+                language_probs = dict(top)
+                logging.info(f"Whisper language probabilities: {', '.join(f'{lang}={p:.3f}' for lang, p in top)}")
 
             # Decision logic
             if best_indian_score >= self.config.strong_indian_threshold:
@@ -88,10 +60,18 @@ class LanguageDetector:
                 confidence = 0.3
 
             logging.info(f"Language detected: {detected} with confidence {confidence}")
-            return LanguageDetectionArtifact(detected_language=detected, confidence=confidence)
+            return LanguageDetectionArtifact(detected_language=detected, confidence=confidence, language_probs=language_probs)
 
         except Exception as e:
             logging.error(f"Error in language detection: {str(e)}")
             return LanguageDetectionArtifact(detected_language="hi", confidence=0.0, error=str(e))
 
+    def _whisper_language_probs(self, whisper_model, audio_artifact: AudioExtractionArtifact) -> Dict[str, float]:
+        # Encoder pass plus a single decoder step over the first 30 s log-mel window
+        audio = whisper.pad_or_trim(audio_artifact.window(0, whisper.audio.N_SAMPLES))
+        mel = whisper.log_mel_spectrogram(audio, n_mels=whisper_model.dims.n_mels).to(whisper_model.device)
+        with self.metrics.model_call("whisper", "detect_language"):
+            _, probs = whisper_model.detect_language(mel)
+        return {lang: float(p) for lang, p in probs.items()}
+
 
@@ -0,0 +1,95 @@
+from typing import Dict, List
+from src.entity.config_entity import LanguageDetectorConfig
+from src.components.inference_batcher import get_inference_batcher
+from src.utils import model_utils
+from src.utils.lazy_import import lazy_import
+from src.utils.metrics import get_metrics
+from src.logger import logging
+
+torch = lazy_import("torch")
+
+def score_text(text: str) -> float:
+    if not text or len(text.strip()) <= 3:
+        return 0
+    text = text.strip()
+    char_count = len(text)
+    word_count = len(text.split())
+    unique_chars = len(set(text.replace(' ', '')))
+    if word_count >= 2 and char_count >= 8:
+        return (word_count * 15) + (unique_chars * 8) + min(char_count * 2, 100)
+    return 0
+
+class IndicLanguageScorer:
+    def __init__(self, config: LanguageDetectorConfig):
+        self.config = config
+        self.batcher = get_inference_batcher()
+        self.metrics = get_metrics()
+
+    def score(self, model, wav) -> Dict[str, float]:
+        if model_utils.supports_ctc_head(model):
+            return self._score_shared(model, wav)
+        return self._score_sequential(model, wav)
+
+    def _is_clear_winner(self, lang: str, scores: Dict[str, float]) -> bool:
+        score = scores[lang]
+        if score >= self.config.early_stop_score:
+            return True
+        runner_up = max((s for l, s in scores.items() if l != lang), default=0)
+        return score >= self.config.strong_indian_threshold and score - runner_up >= self.config.early_stop_margin
+
+    def _score_shared(self, model, wav) -> Dict[str, float]:
+        languages = self.config.test_languages
+        # One encoder pass and one CTC head pass serve every candidate language
+        with self.metrics.model_call("indic", "encode"):
+            encoded = model_utils.encode(model, wav)
+        with self.metrics.model_call("indic", "ctc_head", count=len(languages)):
+            logits = model_utils.ctc_head_logits(model, encoded)
+        texts = self._batched_ctc_texts(model, logits, languages)
+        scores = {lang: score_text(texts[lang]) for lang in languages}
+
+        # Refine only the strongest CTC candidates with RNNT on the shared encoder output
+        ranked = sorted(languages, key=scores.get, reverse=True)[:self.config.rescore_top_k]
+        rnnt_calls = 0
+        for lang in ranked:
+            if scores[lang] <= 0:
+                break
+            try:
+                with self.metrics.model_call("indic", "rnnt_decode", lang):
+                    text = model_utils.decode(model, encoded, lang, "rnnt")
+                rnnt_calls += 1
+            except Exception as e:
+                logging.warning(f"RNNT rescoring failed for {lang}: {str(e)}")
+                continue
+            if text:
+                scores[lang] = score_text(text)
+            if self._is_clear_winner(lang, scores):
+                break
+
+        logging.info(f"Scored {len(languages)} languages with 1 encoder pass and {rnnt_calls} RNNT decodes")
+        return scores
+
+    def _batched_ctc_texts(self, model, logits: "torch.Tensor", languages: List[str]) -> Dict[str, str]:
+        index_sets = [model_utils.language_indices(model, lang) for lang in languages]
+        if len({len(idx) for idx in index_sets}) != 1:
+            return {
+                lang: model_utils.ctc_greedy_text(model, model_utils.ctc_language_logprobs(model, logits, lang), lang)
+                for lang in languages
+            }
+
+        # Gather every language's slice at once: (frames, languages, lang_vocab)
+        stacked = logits[0][:, torch.stack(index_sets)]
+        best = stacked.argmax(dim=-1).T  # (languages, frames)
+        return {lang: model_utils.ctc_indices_to_text(model, indices, lang) for lang, indices in zip(languages, best)}
+
+    def _score_sequential(self, model, wav) -> Dict[str, float]:
+        scores = {}
+        for lang in self.config.test_languages:
+            try:
+                transcription = self.batcher.infer(model, wav, lang, "rnnt") or self.batcher.infer(model, wav, lang, "ctc")
+                scores[lang] = score_text(transcription)
+            except Exception:
+                scores[lang] = 0
+            if scores[lang] >= self.config.early_stop_score:
+                logging.info(f"Early stop on {lang} after {len(scores)} languages")
+                break
+        return scores
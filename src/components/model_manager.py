@@ -0,0 +1,246 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import numpy as np
+from src.entity.config_entity import ModelManagerConfig, ConfigEntity
+from src.logger import logging
+from src.exceptions import CustomException
+from src.utils.lazy_import import lazy_import
+from src.utils.weight_cache import whisper_cache_path, save_whisper, load_whisper
+
+# Deferred so importing the app doesn't pay for torch, whisper and transformers up front
+torch = lazy_import("torch")
+whisper = lazy_import("whisper")
+transformers = lazy_import("transformers")
+
+INDIC = "indic"
+WHISPER = "whisper"
+
+@dataclass
+class LoadedModel:
+    key: str
+    model: Any
+    load_time_sec: float
+    warmup_time_sec: float
+    resident_bytes: int
+    loaded_at: float
+    last_used: float
+    uses: int = 0
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _tensor_bytes(model) -> int:
+    if not isinstance(model, torch.nn.Module):
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+class ModelManager:
+    def __init__(self):
+        self.config = ModelManagerConfig(config=ConfigEntity())
+        self._models: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._errors: Dict[str, str] = {}
+        logging.info(f"ModelManager initialized with a {self.config.model_memory_budget_mb} MB budget")
+
+    @staticmethod
+    def key(family: str, name: str) -> str:
+        return f"{family}:{name}"
+
+    def get_indic_model(self):
+        return self.get(INDIC, self.config.indic_model_name)
+
+    def get_whisper_model(self, name: Optional[str] = None):
+        return self.get(WHISPER, name or self.config.whisper_model_name)
+
+    def get(self, family: str, name: str):
+        key = self.key(family, name)
+        with self._lock:
+            record = self._touch(key)
+            if record is not None:
+                return record.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # One loader per model; concurrent callers wait for it instead of loading twice
+        with load_lock:
+            with self._lock:
+                record = self._touch(key)
+                if record is not None:
+                    return record.model
+            record = self._load(family, name)
+            with self._lock:
+                self._models[key] = record
+                self._enforce_budget(keep=key)
+            return record.model
+
+    def _touch(self, key: str) -> Optional[LoadedModel]:
+        record = self._models.get(key)
+        if record is not None:
+            self._models.move_to_end(key)
+            record.last_used = time.time()
+            record.uses += 1
+        return record
+
+    def _load(self, family: str, name: str) -> LoadedModel:
+        key = self.key(family, name)
+        try:
+            logging.info(f"Loading model {key}...")
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            if family == INDIC:
+                model = self._load_indic(name)
+            elif family == WHISPER:
+                model = self._load_whisper(name)
+            else:
+                raise CustomException(f"Unknown model family: {family}", sys)
+            if hasattr(model, "eval"):
+                model.eval()
+            if self.config.inference_backend == "onnx":
+                # Imported here: the backend module needs torch at import time
+                from src.components.onnx_backend import get_onnx_backend
+                backend = get_onnx_backend()
+                model = backend.optimize_indic(model) if family == INDIC else backend.optimize_whisper(model, name)
+            elif self.config.inference_backend != "torch":
+                raise CustomException(f"Unknown inference backend: {self.config.inference_backend}", sys)
+            load_time = time.perf_counter() - start
+
+            warmup_time = self._warm_up(family, model) if self.config.model_warmup else 0.0
+            resident = _tensor_bytes(model) or max(0, _rss_bytes() - rss_before)
+            self._errors.pop(key, None)
+
+            logging.info(f"Loaded {key} in {load_time:.1f}s (warm-up {warmup_time:.2f}s, ~{resident / 2**20:.0f} MB)")
+            now = time.time()
+            return LoadedModel(key=key, model=model, load_time_sec=load_time, warmup_time_sec=warmup_time,
+                               resident_bytes=resident, loaded_at=now, last_used=now, uses=1)
+        except Exception as e:
+            # Not cached: the next request retries the load
+            self._errors[key] = str(e)
+            logging.error(f"Model loading failed for {key}: {str(e)}")
+            raise CustomException(e, sys)
+
+    def _load_indic(self, name: str):
+        if self.config.fast_start:
+            # Skips the Hub round trips when the snapshot is already in the local cache
+            try:
+                return transformers.AutoModel.from_pretrained(name, trust_remote_code=True, local_files_only=True)
+            except OSError:
+                logging.info(f"{name} is not in the local Hugging Face cache, downloading")
+        return transformers.AutoModel.from_pretrained(name, trust_remote_code=True)
+
+    def _load_whisper(self, name: str):
+        device = self.config.model_device
+        if not self.config.fast_start:
+            return whisper.load_model(name, device=device)
+        path = whisper_cache_path(self.config.weight_cache_dir, name)
+        if os.path.exists(path):
+            try:
+                return load_whisper(path, device=device)
+            except Exception as e:
+                logging.warning(f"Ignoring unreadable weight cache {path}: {str(e)}")
+        model = whisper.load_model(name, device=device)
+        try:
+            save_whisper(model, path)
+        except Exception as e:
+            logging.warning(f"Could not write weight cache {path}: {str(e)}")
+        return model
+
+    def _warm_up(self, family: str, model) -> float:
+        # One tiny inference so the first real request doesn't pay one-off allocation costs
+        start = time.perf_counter()
+        try:
+            sr = self.config.target_sample_rate
+            noise = (np.random.default_rng(0).standard_normal(sr) * 1e-3).astype(np.float32)
+            with torch.inference_mode():
+                if family == INDIC:
+                    model(torch.from_numpy(noise).unsqueeze(0), self.config.warmup_language, "rnnt")
+                else:
+                    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(noise), n_mels=model.dims.n_mels)
+                    model.detect_language(mel.to(model.device))
+        except Exception as e:
+            logging.warning(f"Warm-up failed: {str(e)}")
+        return time.perf_counter() - start
+
+    def _enforce_budget(self, keep: str):
+        # Least recently used models go first; callers still holding a reference keep it alive until done
+        budget = self.config.model_memory_budget_mb * 1024 * 1024
+        total = sum(r.resident_bytes for r in self._models.values())
+        for key in list(self._models):
+            if total <= budget:
+                break
+            if key == keep:
+                continue
+            record = self._models.pop(key)
+            total -= record.resident_bytes
+            logging.info(f"Evicted model {key} to stay within memory budget")
+        if total > budget:
+            logging.warning(f"Loaded models use {total / 2**20:.0f} MB, above the {self.config.model_memory_budget_mb} MB budget")
+
+    def register(self, family: str, name: str, model):
+        # Install an already-built model (e.g. a benchmark stub) under a registry key
+        key = self.key(family, name)
+        now = time.time()
+        with self._lock:
+            self._models[key] = LoadedModel(key=key, model=model, load_time_sec=0.0, warmup_time_sec=0.0,
+                                            resident_bytes=_tensor_bytes(model), loaded_at=now, last_used=now)
+            self._enforce_budget(keep=key)
+
+    def _preload_targets(self, keys: Optional[List[str]] = None) -> List[tuple]:
+        targets = []
+        for key in keys or self.config.preload_models:
+            family, _, name = key.partition(":")
+            targets.append((family, name or (self.config.indic_model_name if family == INDIC else self.config.whisper_model_name)))
+        return targets
+
+    def preload(self, keys: Optional[List[str]] = None):
+        for family, name in self._preload_targets(keys):
+            try:
+                self.get(family, name)
+            except Exception:
+                pass  # already logged; loading is retried lazily
+
+    def is_loaded(self, family: str, name: str) -> bool:
+        with self._lock:
+            return self.key(family, name) in self._models
+
+    def missing_preloads(self) -> List[str]:
+        return [self.key(family, name) for family, name in self._preload_targets() if not self.is_loaded(family, name)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            loaded = {
+                key: {
+                    "load_time_sec": round(r.load_time_sec, 3),
+                    "warmup_time_sec": round(r.warmup_time_sec, 3),
+                    "resident_mb": round(r.resident_bytes / 2**20, 1),
+                    "uses": r.uses,
+                    "idle_sec": round(time.time() - r.last_used, 1)
+                }
+                for key, r in self._models.items()
+            }
+            total = sum(r.resident_bytes for r in self._models.values())
+        return {
+            "loaded": loaded,
+            "resident_mb": round(total / 2**20, 1),
+            "budget_mb": self.config.model_memory_budget_mb,
+            "errors": dict(self._errors)
+        }
+
+_model_manager = None
+_model_manager_lock = threading.Lock()
+
+def get_model_manager() -> ModelManager:
+    global _model_manager
+    with _model_manager_lock:
+        if _model_manager is None:
+            _model_manager = ModelManager()
+        return _model_manager
@@ -0,0 +1,101 @@
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from src.entity.config_entity import WhisperTierConfig, ConfigEntity
+from src.utils.metrics import get_metrics
+from src.logger import logging
+
+AUTO = "auto"
+
+class WhisperTierPolicy:
+    """Picks the Whisper model per task: the configured model when the server keeps up, smaller
+    tiers while the queue is deep or the configured model runs slower than its RTF targets."""
+
+    def __init__(self):
+        self.config = WhisperTierConfig(config=ConfigEntity())
+        self.tiers: List[str] = [self.config.whisper_model_name] + \
+            [name for name in self.config.tier_models if name != self.config.whisper_model_name]
+        self._lock = threading.Lock()
+        self._level = 0
+        self._changed_at = 0.0
+        self._queue_depth: Optional[Callable[[], int]] = None
+        self._rtf: Dict[str, deque] = {}
+        self.metrics = get_metrics()
+        logging.info(f"WhisperTierPolicy initialized with tiers {self.tiers} (adaptive: {self.config.enabled})")
+
+    def set_queue_depth_source(self, source: Optional[Callable[[], int]]):
+        # Queued (not yet running) tasks, read on every selection; wired up by whoever owns the queue
+        self._queue_depth = source
+
+    def is_valid(self, name: Optional[str]) -> bool:
+        return not name or name == AUTO or name in self.tiers
+
+    def observe_rtf(self, name: str, rtf: float):
+        with self._lock:
+            self._rtf.setdefault(name, deque()).append((time.monotonic(), float(rtf)))
+
+    def _recent_rtf(self, name: str, now: float) -> Optional[float]:
+        samples = self._rtf.get(name)
+        if not samples:
+            return None
+        while samples and now - samples[0][0] > self.config.rtf_window_sec:
+            samples.popleft()
+        return sum(rtf for _, rtf in samples) / len(samples) if samples else None
+
+    def _load_level(self, depth: float, rtf: Optional[float], ratio: float = 1.0) -> int:
+        level = 0
+        for i, (max_depth, max_rtf) in enumerate(zip(self.config.queue_depth_thresholds, self.config.rtf_thresholds), 1):
+            if i < len(self.tiers) and (depth >= max_depth * ratio or (rtf is not None and rtf >= max_rtf * ratio)):
+                level = i
+        return level
+
+    def select(self, override: Optional[str] = None) -> dict:
+        now = time.monotonic()
+        depth = self._queue_depth() if self._queue_depth else 0
+        with self._lock:
+            # Only the configured model's speed says whether it keeps up; while a smaller tier is in
+            # use its samples age out, and the next task on it measures again
+            rtf = self._recent_rtf(self.tiers[0], now)
+            if self.config.enabled:
+                per_worker = depth / max(1, self.config.num_workers)
+                target = self._load_level(per_worker, rtf)
+                if target > self._level:
+                    self._level = target
+                    self._changed_at = now
+                elif self._level and now - self._changed_at >= self.config.hold_sec \
+                        and self._load_level(per_worker, rtf, self.config.recovery_ratio) < self._level:
+                    # Back up one tier at a time, and only once load is clearly below the threshold
+                    self._level -= 1
+                    self._changed_at = now
+            level = self._level
+
+        if override and override != AUTO:
+            name, reason = override, "override"
+        else:
+            name, reason = self.tiers[level], "load" if level else "default"
+        self.metrics.inc("caption_whisper_tier_total", model=name, reason=reason)
+        return {"whisper_model": name, "reason": reason, "requested": override, "queue_depth": depth,
+                "recent_rtf": round(rtf, 3) if rtf is not None else None}
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "enabled": self.config.enabled,
+                "tiers": self.tiers,
+                "current": self.tiers[self._level],
+                "queue_depth": self._queue_depth() if self._queue_depth else 0,
+                "recent_rtf": {name: round(rtf, 3) for name in self._rtf
+                               if (rtf := self._recent_rtf(name, now)) is not None}
+            }
+
+_tier_policy = None
+_tier_policy_lock = threading.Lock()
+
+def get_tier_policy() -> WhisperTierPolicy:
+    global _tier_policy
+    with _tier_policy_lock:
+        if _tier_policy is None:
+            _tier_policy = WhisperTierPolicy()
+        return _tier_policy
@@ -0,0 +1,176 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from src.entity.config_entity import OnnxBackendConfig, ConfigEntity
+from src.logger import logging
+from src.utils.lazy_import import lazy_import
+
+torch = lazy_import("torch")
+whisper = lazy_import("whisper")
+ort = lazy_import("onnxruntime")
+
+class OnnxSession:
+    """InferenceSession created on first use in each process, so sessions never cross a fork and
+    pick up the thread count the worker set for itself."""
+
+    def __init__(self, path: str, options_factory):
+        self.path = path
+        self._options_factory = options_factory
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session = ort.InferenceSession(self.path, self._options_factory(),
+                                                         providers=["CPUExecutionProvider"])
+                    self._pid = os.getpid()
+        return self._session
+
+    def run(self, output_names, input_feed, run_options=None):
+        return self._get().run(output_names, input_feed, run_options)
+
+    def __getattr__(self, name):
+        # get_inputs(), get_outputs() and the rest of the InferenceSession API
+        return getattr(self._get(), name)
+
+class _WhisperEncoder(torch.nn.Module):
+    # Stands in for model.encoder: (batch, n_mels, frames) log-mel in, audio features out
+    def __init__(self, session: OnnxSession):
+        super().__init__()
+        self.session = session
+
+    def forward(self, mel):
+        features = self.session.run(["audio_features"], {"mel": mel.float().cpu().numpy()})[0]
+        return torch.from_numpy(features)
+
+class OnnxBackend:
+    def __init__(self):
+        self.config = OnnxBackendConfig(config=ConfigEntity())
+        os.makedirs(self.config.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        logging.info(f"OnnxBackend initialized (int8: {self.config.quantize}, cache: {self.config.cache_dir})")
+
+    def session_options(self):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = self.config.intra_op_threads or torch.get_num_threads()
+        options.inter_op_num_threads = 1
+        options.add_session_config_entry("session.intra_op.allow_spinning", "1" if self.config.allow_spinning else "0")
+        return options
+
+    def session(self, path: str) -> OnnxSession:
+        return OnnxSession(path, self.session_options)
+
+    def _cache_path(self, source_path: str, suffix: str) -> str:
+        # Keyed on the source file's identity so a model update produces a fresh graph
+        stat = os.stat(source_path)
+        key = hashlib.sha256(f"{os.path.abspath(source_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(self.config.cache_dir, f"{stem}-{key}{suffix}")
+
+    def quantize(self, source_path: str, target_path: Optional[str] = None) -> str:
+        """Dynamic int8 quantization of an ONNX graph (weights int8, activations quantized per call); cached on disk."""
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        target_path = target_path or self._cache_path(source_path, ".int8.onnx")
+        with self._lock:
+            if not os.path.exists(target_path):
+                with self._staging(target_path) as tmp_path:
+                    # External data keeps graphs over protobuf's 2 GB limit (the Conformer encoder) loadable
+                    quantize_dynamic(source_path, tmp_path, weight_type=QuantType.QInt8,
+                                     op_types_to_quantize=self.config.quantize_op_types, use_external_data_format=True)
+                logging.info(f"Quantized {source_path} -> {target_path}")
+        return target_path
+
+    @contextmanager
+    def _staging(self, target_path: str):
+        # Graphs are written with their external-data files into a scratch directory, then moved
+        # next to target_path with the graph itself last, so a half-written graph is never loaded
+        staging_dir = tempfile.mkdtemp(prefix="staging-", dir=self.config.cache_dir)
+        try:
+            name = os.path.basename(target_path)
+            yield os.path.join(staging_dir, name)
+            for entry in sorted(os.listdir(staging_dir), key=lambda entry: entry == name):
+                os.replace(os.path.join(staging_dir, entry), os.path.join(os.path.dirname(target_path), entry))
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def optimize_indic(self, model):
+        # The IndicConformer remote code already runs its encoder and decoders as ONNX Runtime sessions;
+        # swap each one for the int8 graph with tuned session options
+        sessions = getattr(model, "models", None)
+        if not isinstance(sessions, dict):
+            logging.warning("IndicConformer has no ONNX sessions to optimize; keeping it as loaded")
+            return model
+        for name, session in list(sessions.items()):
+            source_path = getattr(session, "_model_path", None)
+            if not hasattr(session, "run") or not source_path:
+                continue
+            path = source_path
+            if self.config.quantize:
+                try:
+                    path = self.quantize(source_path)
+                except Exception as e:
+                    logging.warning(f"Keeping fp32 graph for IndicConformer {name}: {str(e)}")
+            sessions[name] = self.session(path)
+        return model
+
+    @staticmethod
+    def _weights_key(module) -> str:
+        # Identifies the weights wherever they were loaded from (checkpoint, weight cache): names, shapes
+        # and an evenly spaced sample of every tensor, which a retrained or replaced checkpoint changes
+        hasher = hashlib.sha256()
+        for name, tensor in module.state_dict().items():
+            flat = tensor.detach().reshape(-1)
+            hasher.update(f"{name}:{tuple(tensor.shape)}:{tensor.dtype}".encode())
+            hasher.update(flat[::max(1, flat.numel() // 4096)].float().cpu().numpy().tobytes())
+        return hasher.hexdigest()[:16]
+
+    def export_whisper_encoder(self, model, name: str) -> str:
+        # Keyed on the encoder weights, so an updated checkpoint under the same name gets a fresh graph
+        key = self._weights_key(model.encoder)
+        path = os.path.join(self.config.cache_dir, f"whisper-{os.path.basename(name)}-{key}-encoder.onnx")
+        with self._lock:
+            if not os.path.exists(path):
+                mel = torch.zeros(1, model.dims.n_mels, whisper.audio.N_FRAMES)
+                # Explicit attention matmuls instead of SDPA, so they are quantizable MatMul nodes
+                with self._staging(path) as tmp_path, torch.no_grad(), whisper.model.disable_sdpa():
+                    torch.onnx.export(model.encoder, (mel,), tmp_path, input_names=["mel"],
+                                      output_names=["audio_features"],
+                                      dynamic_axes={"mel": {0: "batch"}, "audio_features": {0: "batch"}},
+                                      opset_version=self.config.opset, dynamo=False)
+                logging.info(f"Exported Whisper {name} encoder to {path}")
+        return path
+
+    def optimize_whisper(self, model, name: str):
+        # Encoder: exported once to ONNX and run by ONNX Runtime. Decoder: stays in torch, since
+        # decoding relies on its kv-cache and cross-attention hooks, with dynamic int8 Linear layers.
+        path = self.export_whisper_encoder(model, name)
+        if self.config.quantize:
+            path = self.quantize(path, f"{os.path.splitext(path)[0]}.int8.onnx")
+        model.encoder = _WhisperEncoder(self.session(path))
+        if self.config.quantize:
+            decoder = model.decoder
+            for module in decoder.modules():
+                # whisper.model.Linear only adds a dtype cast; plain nn.Linear is what quantize_dynamic maps
+                if type(module) is whisper.model.Linear:
+                    module.__class__ = torch.nn.Linear
+            model.decoder = torch.ao.quantization.quantize_dynamic(decoder, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+
+_onnx_backend = None
+_onnx_backend_lock = threading.Lock()
+
+def get_onnx_backend() -> OnnxBackend:
+    global _onnx_backend
+    with _onnx_backend_lock:
+        if _onnx_backend is None:
+            _onnx_backend = OnnxBackend()
+        return _onnx_backend
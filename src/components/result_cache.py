@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from src.entity.config_entity import ResultCacheConfig, ConfigEntity
+from src.logger import logging
+from src.exceptions import CustomException
+
+class ResultCache:
+    EVICT_INTERVAL = 100  # puts between disk scans
+
+    def __init__(self):
+        self.config = ResultCacheConfig(config=ConfigEntity())
+        self.cache_dir = os.path.join(self.config.output_dir, self.config.result_cache_dirname)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._memory = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+        self._puts_since_evict = 0
+        logging.info(f"ResultCache initialized at {self.cache_dir}")
+
+    def make_key(self, content_hash: str, level: str) -> str:
+        # Results depend on the models, chunking, word timing and SRT layout as much as on the input
+        parts = {
+            "version": self.config.result_cache_version,
+            "level": level,
+            "content": content_hash,
+            "indic_model": self.config.indic_model_name,
+            "whisper_model": self.config.whisper_model_name,
+            "inference_backend": self.config.inference_backend,
+            "vad": self.config.vad_params,
+            "max_chunk_sec": self.config.max_chunk_sec,
+            "english_window_sec": self.config.english_window_sec,
+            "ctc_alignment": self.config.ctc_alignment,
+            "max_chars_per_line": self.config.max_chars_per_line,
+            "max_duration_sec": self.config.max_duration_sec,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self.config.result_cache_ttl_sec
+
+    def get(self, key: Optional[str]) -> Optional[dict]:
+        if not key:
+            return None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._expired(stored_at):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                self._stats["misses"] += 1
+                return None
+
+            if self._expired(record["stored_at"]):
+                self._stats["evictions"] += self._remove_file(path)
+                self._stats["misses"] += 1
+                return None
+
+            self._remember(key, record["stored_at"], record["value"])
+            self._stats["disk_hits"] += 1
+            return record["value"]
+
+    def put(self, key: Optional[str], value: dict):
+        if not key:
+            return
+        try:
+            stored_at = time.time()
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._remember(key, stored_at, value)
+                self._stats["puts"] += 1
+                self._puts_since_evict += 1
+                evict = self._puts_since_evict >= self.EVICT_INTERVAL
+                if evict:
+                    self._puts_since_evict = 0
+            if evict:
+                self._evict_disk()
+        except Exception as e:
+            # A cache write failure must never fail the task
+            logging.error(f"Result cache write failed: {str(e)}")
+
+    def _remember(self, key: str, stored_at: float, value: dict):
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.result_cache_memory_entries:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _remove_file(path: str) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except OSError:
+            return False
+
+    def _evict_disk(self):
+        # Scans the directory without the lock, so lookups carry on meanwhile
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        # Expired entries first, then oldest until under the size budget
+        now = time.time()
+        live, removed = [], []
+        for mtime, size, path in entries:
+            if now - mtime > self.config.result_cache_ttl_sec:
+                removed.append(path)
+            else:
+                live.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in live)
+        budget = self.config.result_cache_max_disk_mb * 1024 * 1024
+        for mtime, size, path in sorted(live):
+            if total <= budget:
+                break
+            removed.append(path)
+            total -= size
+
+        evicted = sum(self._remove_file(path) for path in removed)
+        with self._lock:
+            for path in removed:
+                self._memory.pop(os.path.basename(path)[:-len(".json")], None)
+            self._stats["evictions"] += evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            try:
+                _result_cache = ResultCache()
+            except Exception as e:
+                raise CustomException(e, sys)
+        return _result_cache
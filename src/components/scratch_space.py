@@ -0,0 +1,246 @@
+import os
+import re
+import sys
+import time
+import fcntl
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Optional, Set
+from src.entity.config_entity import ScratchSpaceConfig, ConfigEntity
+from src.logger import logging
+from src.exceptions import CustomException
+
+RESERVATION_FILE = ".reserved"
+LOCK_FILE = ".lock"
+OWNED_NAME = re.compile(r"^\d+(_\d+)?-")
+
+def _process_token(pid: int) -> Optional[str]:
+    # pid plus the process start time (clock ticks since boot), so a recycled pid (e.g. pid 1 in a
+    # restarted container) isn't mistaken for the owner
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f"{pid}_{f.read().rsplit(')', 1)[1].split()[19]}"
+    except (OSError, IndexError):
+        return None
+
+def owner_token() -> str:
+    return _process_token(os.getpid()) or str(os.getpid())
+
+def _owner_alive(name: str) -> bool:
+    # Scratch entries are named "<owner token>-<...>" after the process that created them
+    token = name.split("-", 1)[0]
+    pid = token.split("_", 1)[0]
+    if not pid.isdigit() or not 0 < int(pid) < 2**22:
+        return False
+    if "_" in token:
+        return _process_token(int(pid)) == token
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class TaskWorkspace:
+    """Scratch files of one task: a directory on disk, plus one on tmpfs for small files when configured.
+    cleanup() removes both and every tracked file, whichever way the task ended."""
+
+    def __init__(self, space: "ScratchSpace", name: str):
+        self.space = space
+        self.name = name
+        self.disk_dir = os.path.join(space.config.root_dir, name)
+        self.tmpfs_dir = os.path.join(space.config.tmpfs_dir, name) if space.config.tmpfs_dir else None
+        self.files: Set[str] = set()
+        self.wait_sec = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, nbytes: int, wait: bool = True) -> bool:
+        # Blocks until the disk quota has room; with wait=False, returns False at once when it has none
+        waited = self.space.reserve(self.disk_dir, nbytes, wait=wait)
+        if waited is None:
+            return False
+        self.wait_sec += waited
+        return True
+
+    def path(self, filename: str, expected_bytes: Optional[int] = None) -> str:
+        # Files of known, small size go to tmpfs while it has room; everything else to disk
+        directory = self.disk_dir
+        if expected_bytes and self.tmpfs_dir and expected_bytes <= self.space.config.tmpfs_max_file_mb * 1024 * 1024 \
+                and self.space.reserve(self.tmpfs_dir, expected_bytes, wait=False) is not None:
+            directory = self.tmpfs_dir
+        elif expected_bytes:
+            self.reserve(expected_bytes)
+        os.makedirs(directory, exist_ok=True)
+        return self.track(os.path.join(directory, filename))
+
+    def track(self, path: str) -> str:
+        with self._lock:
+            self.files.add(path)
+        return path
+
+    def cleanup(self):
+        with self._lock:
+            files, self.files = self.files, set()
+        for path in files:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Could not remove scratch file {path}: {str(e)}")
+        for directory in (self.disk_dir, self.tmpfs_dir):
+            if directory:
+                shutil.rmtree(directory, ignore_errors=True)
+
+class ScratchSpace:
+    """Per-task scratch directories under a global quota. Reservations are recorded next to the files
+    and checked under a file lock, so the quota holds across worker processes and API processes."""
+
+    def __init__(self):
+        self.config = ScratchSpaceConfig(config=ConfigEntity())
+        for root in (self.config.root_dir, self.config.tmpfs_dir):
+            if root:
+                os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {"waits": 0, "wait_sec": 0.0, "timeouts": 0, "swept": 0, "waiting": 0}
+        logging.info(f"ScratchSpace initialized at {self.config.root_dir} (quota {self.config.quota_mb} MB, "
+                     f"tmpfs: {self.config.tmpfs_dir})")
+
+    def workspace(self, task_id: str) -> TaskWorkspace:
+        return TaskWorkspace(self, f"{owner_token()}-{task_id}")
+
+    def open(self, name: str) -> TaskWorkspace:
+        # The same workspace from another thread or process (e.g. a worker picking up an upload)
+        return TaskWorkspace(self, name)
+
+    @contextmanager
+    def _root_lock(self, root: str):
+        with open(os.path.join(root, LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _size(directory: str) -> int:
+        total = 0
+        for current, _, files in os.walk(directory):
+            for name in files:
+                if name != RESERVATION_FILE:
+                    try:
+                        total += os.stat(os.path.join(current, name)).st_size
+                    except FileNotFoundError:
+                        pass
+        return total
+
+    @staticmethod
+    def _reserved(directory: str) -> int:
+        try:
+            with open(os.path.join(directory, RESERVATION_FILE)) as f:
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _usage(self, directory: str) -> int:
+        # A file being written counts from the start at its reserved size
+        return max(self._size(directory), self._reserved(directory))
+
+    def _root_usage(self, root: str) -> int:
+        return sum(self._usage(entry.path) for entry in os.scandir(root) if entry.is_dir())
+
+    def reserve(self, directory: str, nbytes: int, wait: bool = True) -> Optional[float]:
+        """Adds nbytes to the directory's reservation once the quota has room; returns the seconds waited.
+        With wait=False, returns None instead of waiting. A task alone is never held back by the quota."""
+        root = os.path.dirname(directory)
+        tmpfs = root == self.config.tmpfs_dir
+        quota = (self.config.tmpfs_quota_mb if tmpfs else self.config.quota_mb) * 1024 * 1024
+        start = time.monotonic()
+        waiting = False
+        try:
+            while True:
+                with self._root_lock(root):
+                    os.makedirs(directory, exist_ok=True)
+                    reserved = self._reserved(directory)
+                    own = self._usage(directory)
+                    others = self._root_usage(root) - own
+                    grown = max(own, reserved + nbytes) - own
+                    fits = others + own + grown <= quota and \
+                        shutil.disk_usage(root).free - grown >= self.config.min_free_mb * 1024 * 1024
+                    if fits or (wait and not others):
+                        with open(os.path.join(directory, RESERVATION_FILE), "w") as f:
+                            f.write(str(reserved + nbytes))
+                        break
+                if not wait:
+                    return None
+                if not waiting:
+                    waiting = True
+                    self._count("waiting", 1)
+                    logging.info(f"Waiting for {nbytes / 2**20:.0f} MB of scratch space in {root} "
+                                 f"({others / 2**20:.0f} MB in use by other tasks)")
+                if time.monotonic() - start >= self.config.wait_sec:
+                    self._count("timeouts", 1)
+                    raise CustomException(f"No scratch space for {nbytes / 2**20:.0f} MB after {self.config.wait_sec}s", sys)
+                time.sleep(self.config.poll_sec)
+        finally:
+            if waiting:
+                self._count("waiting", -1)
+        waited = time.monotonic() - start if waiting else 0.0
+        if waiting:
+            self._count("waits", 1)
+            self._count("wait_sec", waited)
+        return waited
+
+    def sweep_orphans(self) -> int:
+        """Removes workspaces and extracted audio left behind by processes that are gone (crashes, kills, restarts)."""
+        removed = 0
+        for root in (self.config.root_dir, self.config.tmpfs_dir, self.config.audio_dir):
+            if not root or not os.path.isdir(root):
+                continue
+            for entry in os.scandir(root):
+                # Only entries named by a workspace owner, plus any PCM in the audio directory (older
+                # versions named it by uuid alone); a shared tmpfs root may hold other programs' files
+                owned = OWNED_NAME.match(entry.name)
+                if not (owned or (root == self.config.audio_dir and entry.name.endswith(".pcm"))):
+                    continue
+                if owned and _owner_alive(entry.name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                    removed += 1
+                except OSError as e:
+                    logging.warning(f"Could not remove orphaned scratch entry {entry.path}: {str(e)}")
+        self._count("swept", removed)
+        if removed:
+            logging.info(f"Removed {removed} orphaned scratch entries")
+        return removed
+
+    def _count(self, key: str, value: float):
+        with self._lock:
+            self._stats[key] += value
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["wait_sec"] = round(stats["wait_sec"], 1)
+        stats["quota_mb"] = self.config.quota_mb
+        for key, root in (("used_mb", self.config.root_dir), ("tmpfs_used_mb", self.config.tmpfs_dir)):
+            if root:
+                stats[key] = round(self._root_usage(root) / 2**20, 1)
+        stats["workspaces"] = sum(1 for entry in os.scandir(self.config.root_dir) if entry.is_dir())
+        return stats
+
+_scratch_space = None
+_scratch_space_lock = threading.Lock()
+
+def get_scratch_space() -> ScratchSpace:
+    global _scratch_space
+    with _scratch_space_lock:
+        if _scratch_space is None:
+            _scratch_space = ScratchSpace()
+        return _scratch_space
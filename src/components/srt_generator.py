@@ -1,77 +1,124 @@
 import os
 import sys
-from typing import List, Dict
-from src.entity.artifacts import SRTGenerationArtifact
+import json
+from typing import List, Dict, Optional
+from src.entity.artifacts import CaptionCue, SRTGenerationArtifact
 from src.entity.config_entity import SRTGeneratorConfig, ConfigEntity
+from src.components.artifact_store import get_artifact_store
 from src.logger import logging
 from src.exceptions import CustomException
 
+CAPTION_FORMATS = ("srt", "vtt", "json")
+SRT_ARTIFACT_NAME = "captions.srt"
+SRT_MEDIA_TYPE = "application/x-subrip"
+
+class CueBuilder:
+    def __init__(self, config: SRTGeneratorConfig):
+        self.config = config
+        self.current_subtitle = []
+        self.current_chars = 0
+        self.next_index = 1
+
+    def add_words(self, word_timestamps: List[Dict[str, any]]) -> List[CaptionCue]:
+        # Returns the cues completed by this batch of words; the open cue waits for more words or flush()
+        cues = []
+        for word_info in word_timestamps:
+            word = word_info.get("word", "").strip()
+            start = word_info.get("start", 0.0)
+            end = word_info.get("end", 0.0)
+            if not word:
+                continue
+
+            self.current_subtitle.append({"word": word, "start": start, "end": end})
+            self.current_chars += len(word) + 1
+
+            should_break = (
+                self.current_chars >= self.config.max_chars_per_line or
+                end - self.current_subtitle[0]["start"] >= self.config.max_duration_sec
+            )
+            if should_break:
+                cues.append(self._close_cue())
+        return cues
+
+    def flush(self) -> List[CaptionCue]:
+        return [self._close_cue()] if self.current_subtitle else []
+
+    def _close_cue(self) -> CaptionCue:
+        cue = CaptionCue(
+            index=self.next_index,
+            start=self.current_subtitle[0]["start"],
+            end=self.current_subtitle[-1]["end"],
+            text=" ".join(w["word"] for w in self.current_subtitle).strip()
+        )
+        self.next_index += 1
+        self.current_subtitle = []
+        self.current_chars = 0
+        return cue
+
 class SRTGenerator:
     def __init__(self):
         self.config = SRTGeneratorConfig(config=ConfigEntity())
          
         logging.info("SRTGenerator initialized")
 
-    def generate(self, word_timestamps: List[Dict[str, any]], task_id: str, language: str, video_name: str) -> SRTGenerationArtifact:
+    def cue_builder(self) -> CueBuilder:
+        return CueBuilder(self.config)
+
+    def generate(self, word_timestamps: List[Dict[str, any]], task_id: Optional[str], language: str, video_name: str) -> SRTGenerationArtifact:
         try:
-            if not word_timestamps:
+            if word_timestamps is None:
                 raise CustomException("No word timestamps provided", sys)
+            if not word_timestamps:
+                # No speech (silent or music-only video): an empty caption file, not a failure
+                logging.info(f"No words to caption for {video_name}, writing an empty SRT")
+                return self.save("", language, video_name, [], task_id=task_id)
+
+            builder = self.cue_builder()
+            cues = builder.add_words(word_timestamps) + builder.flush()
+            srt_content = "\n".join(self.format_cue(cue, "srt") for cue in cues)
+            return self.save(srt_content, language, video_name, cues, task_id=task_id)
 
-            subtitles = []
-            current_subtitle = []
-            current_chars = 0
-            subtitle_index = 1
-
-            for i, word_info in enumerate(word_timestamps):
-                word = word_info.get("word", "").strip()
-                start = word_info.get("start", 0.0)
-                end = word_info.get("end", 0.0)
-                if not word:
-                    continue
-
-                current_subtitle.append({"word": word, "start": start, "end": end})
-                current_chars += len(word) + 1
-
-                should_break = (
-                    current_chars >= self.config.max_chars_per_line or
-                    i == len(word_timestamps) - 1 or
-                    (current_subtitle and end - current_subtitle[0]["start"] >= self.config.max_duration_sec)
-                )
-
-                if should_break and current_subtitle:
-                    sub_start = current_subtitle[0]["start"]
-                    sub_end = current_subtitle[-1]["end"]
-                    sub_text = " ".join(w["word"] for w in current_subtitle)
-                    start_srt = self._format_timestamp(sub_start)
-                    end_srt = self._format_timestamp(sub_end)
-                    subtitles.extend([str(subtitle_index), f"{start_srt} --> {end_srt}", sub_text.strip(), ""])
-                    subtitle_index += 1
-                    current_subtitle = []
-                    current_chars = 0
-
-            srt_content = "\n".join(subtitles)
+        except Exception as e:
+            logging.error(f"Error in SRT generation: {str(e)}")
+            raise CustomException(e, sys)
+
+    def filename(self, language: str, video_name: str) -> str:
+        lang_name = self.config.indic_languages.get(language, language).lower() if language != "en" else "english"
+        return f"{self.config.srt_filename_prefix}{video_name}_{lang_name}{self.config.srt_extension}"
+
+    def save(self, srt_content: str, language: str, video_name: str, cues: List[CaptionCue] = None,
+             task_id: Optional[str] = None) -> SRTGenerationArtifact:
+        try:
+            if task_id:
+                # Per-task, content-addressed: same-named uploads no longer overwrite each other
+                stored = get_artifact_store().put(task_id, SRT_ARTIFACT_NAME, srt_content, SRT_MEDIA_TYPE)
+                logging.info(f"SRT generated and stored as {stored.file_path}")
+                return SRTGenerationArtifact(srt_content=srt_content, srt_file_path=stored.file_path, cues=cues,
+                                             sha256=stored.sha256)
 
             # Save to file with video name
-            lang_name = self.config.indic_languages.get(language, language).lower() if language != "en" else "english"
-            filename = f"{self.config.srt_filename_prefix}{video_name}_{lang_name}{self.config.srt_extension}"
-            srt_path = os.path.join(self.config.output_dir, filename)
+            srt_path = os.path.join(self.config.output_dir, self.filename(language, video_name))
             os.makedirs(self.config.output_dir, exist_ok=True)
             with open(srt_path, "w", encoding="utf-8") as f:
                 f.write(srt_content)
 
             logging.info(f"SRT generated and saved to {srt_path}")
-            return SRTGenerationArtifact(srt_content=srt_content, srt_file_path=srt_path)
+            return SRTGenerationArtifact(srt_content=srt_content, srt_file_path=srt_path, cues=cues)
 
         except Exception as e:
-            logging.error(f"Error in SRT generation: {str(e)}")
+            logging.error(f"Error saving SRT: {str(e)}")
             raise CustomException(e, sys)
 
-    def _format_timestamp(self, seconds: float) -> str:
+    def format_cue(self, cue: CaptionCue, fmt: str = "srt") -> str:
+        if fmt == "json":
+            return json.dumps({"index": cue.index, "start": cue.start, "end": cue.end, "text": cue.text}, ensure_ascii=False)
+        if fmt == "vtt":
+            return f"{self._format_timestamp(cue.start, '.')} --> {self._format_timestamp(cue.end, '.')}\n{cue.text}\n"
+        return f"{cue.index}\n{self._format_timestamp(cue.start)} --> {self._format_timestamp(cue.end)}\n{cue.text}\n"
+
+    def _format_timestamp(self, seconds: float, separator: str = ",") -> str:
         hours = int(seconds // 3600)
         minutes = int((seconds % 3600) // 60)
         secs = int(seconds % 60)
         milliseconds = int((seconds % 1) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
-
-
-
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
@@ -1,61 +1,193 @@
-import torch
-import torchaudio
-import whisper
 import sys
-from typing import List, Dict
-from src.entity.artifacts import TranscriptionArtifact
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Tuple
+from src.entity.artifacts import AudioExtractionArtifact, AudioChunk, VADChunkingArtifact, TranscriptionArtifact
 from src.entity.config_entity import TranscriberConfig, ConfigEntity
+from src.components.model_manager import get_model_manager
+from src.components.inference_batcher import get_inference_batcher
+from src.components.ctc_aligner import CTCAligner
+from src.components.model_tiering import get_tier_policy
+from src.components.chunk_cache import get_chunk_cache
+from src.utils import model_utils
+from src.utils.metrics import get_metrics
 from src.logger import logging
 from src.exceptions import CustomException
+from src.utils.lazy_import import lazy_import
 
-# Global models
-indic_model = None
-whisper_model = None
+torch = lazy_import("torch")
 
 class Transcriber:
     def __init__(self):
         self.config = TranscriberConfig(config=ConfigEntity()) 
+        self.models = get_model_manager()
+        self.batcher = get_inference_batcher()
+        self.metrics = get_metrics()
+        self.tiers = get_tier_policy()
+        self.chunk_cache = get_chunk_cache() if self.config.chunk_cache else None
         logging.info("Transcriber initialized")
 
-    def transcribe(self, audio_path: str, language: str) -> TranscriptionArtifact:
-        global indic_model, whisper_model
+    def transcribe(self, audio_artifact: AudioExtractionArtifact, language: str,
+                   chunking_artifact: Optional[VADChunkingArtifact] = None,
+                   on_words: Optional[Callable[[List[Dict[str, any]]], None]] = None,
+                   whisper_model: Optional[str] = None) -> TranscriptionArtifact:
         try:
-            if not indic_model or not whisper_model:
-                raise CustomException("Models not loaded", sys)
+            if chunking_artifact is not None:
+                chunks = chunking_artifact.chunks
+            else:
+                chunks = [AudioChunk(start_sample=0, end_sample=audio_artifact.num_samples,
+                                     sample_rate=audio_artifact.sample_rate)]
 
-            if language == "en":
-                result = whisper_model.transcribe(audio_path, language="en", word_timestamps=True, verbose=False)
-                transcription = result["text"]
-                word_timestamps = []
-                for segment in result.get("segments", []):
-                    word_timestamps.extend(segment.get("words", []))
+            reused: List[AudioChunk] = []
+            if not chunks:
+                logging.info("No speech found, skipping transcription")
+                transcription, word_timestamps = "", []
+                model_used = "Whisper" if language == "en" else "IndicConformer"
+            elif language == "en":
+                # whisper_model is the tier picked for this task; None means WHISPER_MODEL_NAME
+                whisper_name = whisper_model or self.config.whisper_model_name
+                transcription, word_timestamps, reused = self._transcribe_english_windows(
+                    self.models.get_whisper_model(whisper_name), whisper_name, audio_artifact, chunks, on_words)
                 model_used = "Whisper"
             else:
-                wav, sr = torchaudio.load(audio_path)
-                if wav.shape[0] > 1:
-                    wav = torch.mean(wav, dim=0, keepdim=True)
-                if sr != self.config.target_sample_rate:
-                    resampler = torchaudio.transforms.Resample(sr, self.config.target_sample_rate)
-                    wav = resampler(wav)
-                transcription = indic_model(wav, language, "rnnt")
-                audio_duration = wav.shape[1] / self.config.target_sample_rate
-                words = transcription.split() if transcription else []
-                word_timestamps: List[Dict[str, any]] = []
-                if words:
-                    time_per_word = audio_duration / len(words)
-                    current_time = 0.0
-                    for word in words:
-                        start = current_time
-                        end = current_time + time_per_word
-                        word_timestamps.append({"word": word, "start": start, "end": end})
-                        current_time = end
+                indic_model = self.models.get_indic_model()
+                transcription, word_timestamps, reused = self._transcribe_indic_chunks(indic_model, audio_artifact, chunks,
+                                                                                      language, on_words)
                 model_used = "IndicConformer"
 
-            logging.info(f"Transcription completed using {model_used}")
-            return TranscriptionArtifact(transcription=transcription, word_timestamps=word_timestamps, model_used=model_used)
+            reused_sec = sum(chunk.duration_sec for chunk in reused)
+            logging.info(f"Transcription completed using {model_used} "
+                         f"({len(reused)}/{len(chunks)} chunks, {reused_sec:.1f}s reused from the chunk cache)")
+            return TranscriptionArtifact(transcription=transcription, word_timestamps=word_timestamps, model_used=model_used,
+                                         reused_chunks=len(reused), reused_sec=round(reused_sec, 3))
 
         except Exception as e:
             logging.error(f"Error in transcription: {str(e)}")
             return TranscriptionArtifact(transcription=None, word_timestamps=None, model_used="", error=str(e))
 
+    def _cached(self, namespace: str, samples, chunk: AudioChunk):
+        # (fingerprint, cached (text, words) or None); no fingerprint when the cache is off
+        if self.chunk_cache is None:
+            return None, None
+        fingerprint = self.chunk_cache.fingerprint(samples, chunk.sample_rate)
+        return fingerprint, self.chunk_cache.lookup(namespace, fingerprint, chunk)
+
+    def _transcribe_english_windows(self, whisper_model, whisper_name: str, audio_artifact: AudioExtractionArtifact,
+                                    chunks: List[AudioChunk], on_words=None) -> Tuple[str, List[Dict[str, any]], List[AudioChunk]]:
+        # Group speech chunks into windows so words can be emitted as each window finishes; a window
+        # spans at most english_window_sec of audio so only that much is ever converted to float
+        windows, current = [], []
+        for chunk in chunks:
+            if current and chunk.end_sec - current[0].start_sec > self.config.english_window_sec:
+                windows.append(current)
+                current = []
+            current.append(chunk)
+        windows.append(current)
+
+        namespace = self.chunk_cache.namespace(whisper_name, "en", "whisper") if self.chunk_cache else None
+        texts, word_timestamps, reused = [], [], []
+        for window in windows:
+            offset = window[0].start_sec
+            audio = audio_artifact.window(window[0].start_sample, window[-1].end_sample)
+            lookups = [self._cached(namespace, audio[chunk.start_sample - window[0].start_sample:
+                                                     chunk.end_sample - window[0].start_sample], chunk)
+                       for chunk in window]
+            pending = [(chunk, fingerprint) for chunk, (fingerprint, hit) in zip(window, lookups) if hit is None]
+
+            text, words = "", []
+            if pending:
+                # Language is already known from detection, so Whisper skips its own language-ID pass.
+                # clip_timestamps restricts decoding to the speech chunks not found in the chunk cache;
+                # the previous window's text keeps context across window boundaries.
+                clip_timestamps = [t - offset for chunk, _ in pending for t in (chunk.start_sec, chunk.end_sec)]
+                start = time.perf_counter()
+                with self.metrics.model_call("whisper", "transcribe", "en"):
+                    result = whisper_model.transcribe(audio, language="en", word_timestamps=True,
+                                                      clip_timestamps=clip_timestamps, initial_prompt=texts[-1] if texts else None,
+                                                      verbose=False)
+                # Real-time factor of this model, which the tier policy uses to tell whether it keeps up
+                span = pending[-1][0].end_sec - pending[0][0].start_sec
+                self.tiers.observe_rtf(whisper_name, (time.perf_counter() - start) / max(span, 1e-3))
+                for segment in result.get("segments", []):
+                    # Back to absolute time
+                    words.extend({**word, "start": word["start"] + offset, "end": word["end"] + offset}
+                                 for word in segment.get("words", []))
+                text = result["text"].strip()
+                if self.chunk_cache:
+                    for chunk, fingerprint in pending:
+                        chunk_words = [word for word in words if chunk.start_sec <= (word["start"] + word["end"]) / 2 < chunk.end_sec]
+                        self.chunk_cache.put(namespace, fingerprint, chunk, "".join(w["word"] for w in chunk_words).strip(),
+                                             chunk_words)
+
+            hits = [(chunk, hit) for chunk, (_, hit) in zip(window, lookups) if hit is not None]
+            if hits:
+                # Cached chunks slot back in by time; the window text is rebuilt from its words in order
+                reused.extend(chunk for chunk, _ in hits)
+                words = sorted(words + [word for _, (_, cached_words) in hits for word in cached_words],
+                               key=lambda word: word["start"])
+                text = "".join(word["word"] if word["word"][:1].isspace() else f" {word['word']}" for word in words).strip()
+            texts.append(text)
+            word_timestamps.extend(words)
+            if on_words and words:
+                on_words(words)
+        return " ".join(text for text in texts if text), word_timestamps, reused
+
+    def _transcribe_indic_chunks(self, indic_model, audio_artifact: AudioExtractionArtifact, chunks: List[AudioChunk],
+                                 language: str, on_words=None) -> Tuple[str, List[Dict[str, any]], List[AudioChunk]]:
+        aligner = CTCAligner(indic_model) if self.config.ctc_alignment else None
+        namespace = self.chunk_cache.namespace(self.config.indic_model_name, language,
+                                               "ctc" if aligner else "even") if self.chunk_cache else None
+        workers = max(1, min(self.config.chunk_workers, len(chunks)))
+        results = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk-worker") as pool:
+            futures = [pool.submit(self._transcribe_indic_chunk, indic_model, aligner, audio_artifact, chunk, language, namespace)
+                       for chunk in chunks]
+            # Collect in time order so streamed words never go backwards
+            for future in futures:
+                text, words, hit = future.result()
+                results.append((text, words, hit))
+                if on_words and words:
+                    on_words(words)
+
+        # Stitch chunks back together in time order
+        texts = [text for text, _, _ in results if text]
+        word_timestamps: List[Dict[str, any]] = [word for _, words, _ in results for word in words]
+        reused = [chunk for chunk, (_, _, hit) in zip(chunks, results) if hit]
+        logging.info(f"Transcribed {len(chunks)} chunks with {workers} workers")
+        return " ".join(texts), word_timestamps, reused
+
+    def _transcribe_indic_chunk(self, indic_model, aligner: Optional[CTCAligner], audio_artifact: AudioExtractionArtifact,
+                                chunk: AudioChunk, language: str,
+                                namespace: Optional[str] = None) -> Tuple[str, List[Dict[str, any]], bool]:
+        samples = audio_artifact.window(chunk.start_sample, chunk.end_sample)
+        fingerprint, cached = self._cached(namespace, samples, chunk)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        wav = torch.from_numpy(samples).unsqueeze(0)
+        logprobs = None
+        if aligner:
+            # Transcript and CTC frame log-probs come from the same encoder pass
+            transcription, logprobs = self.batcher.infer(indic_model, wav, language, model_utils.ALIGNED_MODE)
+        else:
+            transcription = self.batcher.infer(indic_model, wav, language, "rnnt")
+        text = transcription.strip() if transcription else ""
+        words = text.split()
+
+        word_timestamps: List[Dict[str, any]] = []
+        if aligner and words:
+            word_timestamps = aligner.align(logprobs, text, language, chunk.start_sec, chunk.duration_sec) or []
+
+        if words and not word_timestamps:
+            # No alignment available: spread words evenly over the chunk, offset to absolute time
+            time_per_word = chunk.duration_sec / len(words)
+            current_time = chunk.start_sec
+            for word in words:
+                start = current_time
+                end = current_time + time_per_word
+                word_timestamps.append({"word": word, "start": start, "end": end})
+                current_time = end
 
+        if fingerprint is not None:
+            self.chunk_cache.put(namespace, fingerprint, chunk, text, word_timestamps)
+        return text, word_timestamps, False
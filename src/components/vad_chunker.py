@@ -0,0 +1,97 @@
+import sys
+import numpy as np
+from typing import List, Tuple
+from src.entity.artifacts import AudioExtractionArtifact, AudioChunk, VADChunkingArtifact
+from src.entity.config_entity import VADChunkerConfig, ConfigEntity
+from src.logger import logging
+from src.exceptions import CustomException
+
+class VADChunker:
+    def __init__(self):
+        self.config = VADChunkerConfig(config=ConfigEntity())
+        logging.info("VADChunker initialized")
+
+    def chunk(self, audio_artifact: AudioExtractionArtifact) -> VADChunkingArtifact:
+        try:
+            sr = audio_artifact.sample_rate
+            num_samples = audio_artifact.num_samples
+            frame_len = int(sr * self.config.vad_frame_ms / 1000)
+            n_frames = num_samples // frame_len
+            if n_frames == 0:
+                return VADChunkingArtifact(chunks=[], speech_sec=0.0)
+
+            # Frame energy in dBFS, converting one window of audio at a time
+            window_frames = max(1, int(self.config.audio_window_sec * 1000 / self.config.vad_frame_ms))
+            energy_db = np.empty(n_frames, dtype=np.float32)
+            for first in range(0, n_frames, window_frames):
+                last = min(n_frames, first + window_frames)
+                frames = audio_artifact.window(first * frame_len, last * frame_len).reshape(last - first, frame_len)
+                energy_db[first:last] = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+            # Adaptive threshold between the noise floor and the loud frames
+            noise_floor = np.percentile(energy_db, 10)
+            loud = np.percentile(energy_db, 95)
+            threshold = max(min(noise_floor + self.config.vad_energy_margin_db, loud - self.config.vad_energy_margin_db),
+                            self.config.vad_min_energy_db)
+            speech = self._smooth(energy_db > threshold)
+
+            # Pad speech regions, then cap their length
+            pad = int(self.config.vad_pad_ms / self.config.vad_frame_ms)
+            max_frames = int(self.config.max_chunk_sec * 1000 / self.config.vad_frame_ms)
+            regions = []
+            for start, end in zip(*self._runs(speech)):
+                start, end = max(0, start - pad), min(n_frames, end + pad)
+                if regions and start <= regions[-1][1]:
+                    regions[-1] = (regions[-1][0], end)
+                else:
+                    regions.append((start, end))
+
+            chunks: List[AudioChunk] = []
+            for start, end in regions:
+                for s, e in self._split(start, end, max_frames, energy_db):
+                    end_sample = num_samples if e == n_frames else e * frame_len
+                    chunks.append(AudioChunk(start_sample=s * frame_len, end_sample=end_sample, sample_rate=sr))
+
+            speech_sec = sum(c.duration_sec for c in chunks)
+            logging.info(f"VAD kept {speech_sec:.1f}s of {audio_artifact.duration_sec:.1f}s audio in {len(chunks)} chunks")
+            return VADChunkingArtifact(chunks=chunks, speech_sec=speech_sec)
+
+        except Exception as e:
+            logging.error(f"Error in VAD chunking: {str(e)}")
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Start/end (exclusive) frame indices of each run of True values
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    def _smooth(self, speech: np.ndarray) -> np.ndarray:
+        speech = speech.copy()
+        min_silence = int(self.config.vad_min_silence_ms / self.config.vad_frame_ms)
+        min_speech = int(self.config.vad_min_speech_ms / self.config.vad_frame_ms)
+
+        # Bridge short pauses inside speech
+        starts, ends = self._runs(speech)
+        for gap_start, gap_end in zip(ends[:-1], starts[1:]):
+            if gap_end - gap_start < min_silence:
+                speech[gap_start:gap_end] = True
+
+        # Drop isolated blips
+        starts, ends = self._runs(speech)
+        for start, end in zip(starts, ends):
+            if end - start < min_speech:
+                speech[start:end] = False
+        return speech
+
+    @staticmethod
+    def _split(start: int, end: int, max_frames: int, energy_db: np.ndarray) -> List[Tuple[int, int]]:
+        # Cut over-long regions at the quietest frame in the second half of each window
+        pieces = []
+        while end - start > max_frames:
+            lo = start + max_frames // 2
+            cut = lo + int(np.argmin(energy_db[lo:start + max_frames]))
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+        return pieces
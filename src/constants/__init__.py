@@ -7,26 +7,160 @@ SRT_FILENAME_PREFIX = "subtitles_"
 SRT_EXTENSION = ".srt"
 
 # Validation constants
-MAX_FILE_SIZE_MB = 100
+MAX_FILE_SIZE_MB = 4096  # hour-long recordings; decoded audio is memory-mapped, so this only bounds disk use
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes read per chunk while streaming uploads
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024  # multipart boundaries and part headers allowed on top of the file
+HASH_UPLOADS = True
 ALLOWED_VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".flv", ".m4v")
 
 # Model configuration
 INDIC_MODEL_NAME = "ai4bharat/indic-conformer-600m-multilingual"
 WHISPER_MODEL_NAME = "small"
 
+# Model manager parameters
+MODEL_DEVICE = "cpu"
+MODEL_MEMORY_BUDGET_MB = 6144
+MODEL_WARMUP = True
+WARMUP_LANGUAGE = "hi"
+PRELOAD_MODELS = ["indic", "whisper"]  # "<family>" or "<family>:<name>", loaded in the background at startup
+FAST_START = True  # memory-map cached Whisper weights and load Hugging Face models from the local cache first
+WEIGHT_CACHE_DIRNAME = "weights"  # under OUTPUT_DIR
+
+# Inference backend: "torch" (eager fp32) or "onnx" (ONNX Runtime, dynamic int8 quantization)
+INFERENCE_BACKEND = "torch"
+ONNX_CACHE_DIRNAME = "onnx"  # under OUTPUT_DIR; exported and quantized graphs
+ONNX_QUANTIZE = True
+ONNX_QUANTIZE_OP_TYPES = ["MatMul", "Gemm"]  # int8 convolutions are slower than fp32 on most CPUs
+ONNX_OPSET = 17
+ONNX_INTRA_OP_THREADS = 0  # 0 follows torch.get_num_threads() of the process running the session
+ONNX_ALLOW_SPINNING = False  # spinning threads steal cores from ffmpeg and other workers
+
+# Load-adaptive Whisper tiering: WHISPER_MODEL_NAME when idle, smaller models under pressure
+WHISPER_TIERING = True
+WHISPER_TIER_MODELS = ["base", "tiny"]  # fallback tiers, largest first; add "whisper:base" to PRELOAD_MODELS to load ahead
+WHISPER_TIER_QUEUE_DEPTH = [1, 3]  # queued tasks per worker at which each fallback tier kicks in
+WHISPER_TIER_RTF = [1.0, 2.0]  # recent real-time factor of WHISPER_MODEL_NAME at which each fallback tier kicks in
+WHISPER_TIER_RTF_WINDOW_SEC = 300
+WHISPER_TIER_RECOVERY_RATIO = 0.5  # load must drop below this fraction of a threshold to step back up
+WHISPER_TIER_HOLD_SEC = 30  # minimum time between stepping back up one tier
+
+# IndicConformer micro-batching parameters
+INFERENCE_BATCHING = True
+INFERENCE_MAX_BATCH_SIZE = 8
+INFERENCE_MAX_WAIT_MS = 10
+INFERENCE_MAX_PAD_RATIO = 1.5  # longest / shortest waveform allowed in one batch
+
 # Audio processing parameters
 TARGET_SAMPLE_RATE = 16000
 SEGMENT_LENGTH_SEC = 20
+SPECULATIVE_DETECTION = True  # detect the language on the leading segment while the rest is still decoding
+LEADING_SEGMENT_SEC = 30  # covers SEGMENT_LENGTH_SEC and Whisper's 30 s language-ID window
+EXTRACT_READ_SIZE = 256 * 1024  # bytes read from ffmpeg's stdout per call
+AUDIO_STORE_DIRNAME = "audio"  # under OUTPUT_DIR; extracted PCM of runs without a task workspace (batch)
+AUDIO_WINDOW_SEC = 60  # audio converted to float32 at a time by the VAD
+
+# VAD chunking parameters
+VAD_FRAME_MS = 30
+VAD_ENERGY_MARGIN_DB = 12
+VAD_MIN_ENERGY_DB = -50
+VAD_MIN_SPEECH_MS = 150
+VAD_MIN_SILENCE_MS = 500
+VAD_PAD_MS = 120
+MAX_CHUNK_SEC = 20
+CHUNK_WORKERS = 2
+
+# Word timing parameters
+CTC_ALIGNMENT = True  # align Indic words on the CTC head's frame log-probs
 
 # Language detection parameters
 STRONG_INDIAN_THRESHOLD = 60
 WEAK_INDIAN_THRESHOLD = 25
 ENGLISH_THRESHOLD = 0.6
+LANGUAGE_RESCORE_TOP_K = 3  # CTC candidates re-decoded with RNNT
+EARLY_STOP_SCORE = 120
+EARLY_STOP_MARGIN = 30
+LANGUAGE_PROBS_TOP_K = 5  # Whisper language-ID probabilities kept on the result
+
+# Task queue parameters
+EXECUTION_MODE = "thread"  # "thread" or "process" (pre-forked workers sharing model weights)
+NUM_WORKERS = 2
+TORCH_THREADS_PER_WORKER = 0  # 0 = split the available cores evenly (process mode)
+PIN_WORKER_CPUS = True
+PIPELINE_STAGES = ["audio_extraction", "language_detection", "vad_chunking", "transcription", "srt_generation"]
+
+# Scratch workspace parameters: per-task upload and PCM files, removed when the task ends
+SCRATCH_DIRNAME = "scratch"  # under OUTPUT_DIR; one directory per task
+SCRATCH_QUOTA_MB = 20480  # uploads + extracted audio across all tasks; new tasks wait for room
+SCRATCH_MIN_FREE_MB = 1024  # also wait rather than fill the disk past this
+SCRATCH_WAIT_SEC = 900  # a task that can't get space within this long fails
+SCRATCH_RETRY_AFTER_SEC = 30  # Retry-After for an upload refused for space while no task is running
+SCRATCH_POLL_SEC = 0.5
+SCRATCH_TMPFS_DIR = None  # e.g. "/dev/shm/caption_scratch"; small PCM files go here instead of disk
+SCRATCH_TMPFS_QUOTA_MB = 512
+SCRATCH_TMPFS_MAX_FILE_MB = 64  # ~35 minutes of 16 kHz mono PCM
+
+# Admission control parameters: uploads are costed by media duration and refused with 429 when the wait gets too long
+ADMISSION_CONTROL = True
+ADMISSION_MAX_WAIT_SEC = 600  # estimated queue wait at which new uploads are refused
+ADMISSION_MAX_QUEUED_TASKS = 100
+ADMISSION_MAX_TASKS_PER_CLIENT = 2  # queued + running; only applied when clients are identified as below
+ADMISSION_CLIENT_HEADER = None  # e.g. "x-api-key"
+ADMISSION_TRUSTED_PROXIES = []  # e.g. ["10.0.0.0/8"]; X-Forwarded-For from these names the client
+ADMISSION_DEFAULT_RTF = 0.5  # worker seconds per audio second until completed tasks have been measured
+ADMISSION_RTF_SMOOTHING = 0.2  # weight of each completed task in the running estimate
+ADMISSION_TASK_OVERHEAD_SEC = 2.0  # fixed cost per task on top of its audio
+ADMISSION_FALLBACK_DURATION_SEC = 600  # assumed when ffprobe can't tell
+ADMISSION_PROBE_TIMEOUT_SEC = 10
+ADMISSION_MAX_RETRY_AFTER_SEC = 3600
 
 # SRT generation parameters
 MAX_CHARS_PER_LINE = 50
 MAX_DURATION_SEC = 5.0
 
+# Caption streaming parameters
+CAPTION_STREAM_RETENTION_SEC = 600  # finished streams stay readable this long
+CAPTION_STREAM_POLL_SEC = 0.25
+ENGLISH_WINDOW_SEC = 60  # Whisper transcribes this much speech per call so cues arrive progressively
+
+# Result cache parameters
+RESULT_CACHE_DIRNAME = "cache"
+RESULT_CACHE_VERSION = 2
+RESULT_CACHE_MEMORY_ENTRIES = 256
+RESULT_CACHE_MAX_DISK_MB = 512
+RESULT_CACHE_TTL_SEC = 7 * 24 * 3600
+
+# Chunk cache parameters: per-speech-chunk transcriptions reused across re-edited uploads
+CHUNK_CACHE = True
+CHUNK_CACHE_FILENAME = "chunk_cache.db"  # under OUTPUT_DIR
+CHUNK_CACHE_MAX_ENTRIES = 200000
+CHUNK_CACHE_TTL_SEC = 30 * 24 * 3600
+CHUNK_CACHE_MAX_BER = 0.25  # fingerprint bit error rate still counted as the same audio (unrelated audio is ~0.5)
+CHUNK_CACHE_MAX_EDGE_SEC = 0.3  # how far chunk edges may move between uploads and still match
+
+# Artifact store parameters
+ARTIFACT_STORE_DIRNAME = "store"
+ARTIFACT_TTL_SEC = 30 * 24 * 3600
+ARTIFACT_MAX_DISK_MB = 2048
+ARTIFACT_COMPACT_INTERVAL_SEC = 3600
+ARTIFACT_GZIP_MIN_BYTES = 1024  # smaller files aren't worth a precompressed copy
+
+# Task store parameters
+TASK_STORE_BACKEND = "memory"  # "memory" (per process) or "sqlite" (shared between uvicorn workers)
+TASK_STORE_FILENAME = "tasks.db"
+TASK_STORE_MAX_ENTRIES = 10000
+TASK_STORE_TTL_SEC = 24 * 3600  # finished tasks are forgotten after this long
+TASK_TRANSCRIPTION_PREVIEW_CHARS = 2000  # in-memory store keeps only this much of the transcription
+
+# Batch runner parameters
+BATCH_EXTRACT_WORKERS = 2
+BATCH_PREFETCH = 2  # decoded files held in memory ahead of the one being transcribed
+BATCH_MANIFEST_FILENAME = "batch_manifest.jsonl"
+
+# Metrics parameters
+METRICS_ENABLED = True
+METRICS_DURATION_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+METRICS_RTF_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5]
+
 # Supported languages
 INDIC_LANGUAGES = {
     'as': 'Assamese',
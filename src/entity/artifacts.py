@@ -1,15 +1,88 @@
+import os
+import hashlib
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
-      
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import numpy as np
+
+@dataclass
+class UploadArtifact:
+    file_path: str
+    size_bytes: int
+    sha256: Optional[str] = None
+
 @dataclass
 class AudioExtractionArtifact:
-    audio_path: str
-    
+    # Mono int16 PCM at sample_rate: a numpy.memmap over pcm_path, or an in-memory array for a
+    # leading segment. Consumers convert one window at a time, so memory stays flat with duration.
+    pcm: Any
+    sample_rate: int
+    pcm_path: Optional[str] = None
+
+    @property
+    def num_samples(self) -> int:
+        return len(self.pcm)
+
+    @property
+    def duration_sec(self) -> float:
+        return self.num_samples / self.sample_rate
+
+    def window(self, start_sample: int = 0, end_sample: Optional[int] = None):
+        # Float32 copy of just this slice; only its pages of the file are read
+        samples = self.pcm[start_sample:end_sample].astype(np.float32)
+        samples *= 1.0 / 32768.0
+        return samples
+
+    def windows(self, window_samples: int) -> Iterator[Tuple[int, Any]]:
+        for start in range(0, self.num_samples, window_samples):
+            yield start, self.window(start, start + window_samples)
+
+    def content_hash(self, block_samples: int = 1 << 22) -> str:
+        # Exact hash of the decoded samples: the same regardless of container or video stream, but
+        # any re-encode of the audio itself changes it
+        hasher = hashlib.blake2b(digest_size=32)
+        for start in range(0, self.num_samples, block_samples):
+            hasher.update(memoryview(np.ascontiguousarray(self.pcm[start:start + block_samples])))
+        return hasher.hexdigest()
+
+    def release(self):
+        # The mapping stays valid for anyone still holding the artifact; the file is gone from disk
+        if self.pcm_path:
+            try:
+                os.unlink(self.pcm_path)
+            except OSError:
+                pass
+            self.pcm_path = None
+
+@dataclass
+class AudioChunk:
+    start_sample: int
+    end_sample: int
+    sample_rate: int
+
+    @property
+    def start_sec(self) -> float:
+        return self.start_sample / self.sample_rate
+
+    @property
+    def end_sec(self) -> float:
+        return self.end_sample / self.sample_rate
+
+    @property
+    def duration_sec(self) -> float:
+        return (self.end_sample - self.start_sample) / self.sample_rate
+
+@dataclass
+class VADChunkingArtifact:
+    chunks: List[AudioChunk]
+    speech_sec: float
+
 @dataclass
 class LanguageDetectionArtifact:
     detected_language: str
     confidence: float
     error: Optional[str] = None
+    # Whisper language-ID probabilities, when the English check ran
+    language_probs: Optional[Dict[str, float]] = None
 
 @dataclass
 class TranscriptionArtifact:
@@ -17,10 +90,31 @@ class TranscriptionArtifact:
     word_timestamps: Optional[List[Dict[str, Any]]]
     model_used: str
     error: Optional[str] = None
+    # Speech chunks whose transcription came from the chunk cache instead of the model
+    reused_chunks: int = 0
+    reused_sec: float = 0.0
+
+@dataclass
+class CaptionCue:
+    index: int
+    start: float
+    end: float
+    text: str
 
 @dataclass
 class SRTGenerationArtifact:
     srt_content: str
     srt_file_path: Optional[str] = None
+    cues: Optional[List[CaptionCue]] = None
+    sha256: Optional[str] = None
 
-
+@dataclass
+class StoredArtifact:
+    task_id: str
+    name: str
+    sha256: str
+    size_bytes: int
+    media_type: str
+    created_at: float
+    file_path: str
+    gzip_path: Optional[str] = None
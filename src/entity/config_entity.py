@@ -8,23 +8,152 @@ class ConfigEntity:
         self.srt_filename_prefix = SRT_FILENAME_PREFIX
         self.srt_extension = SRT_EXTENSION
         self.max_file_size_mb = MAX_FILE_SIZE_MB
+        self.upload_chunk_size = UPLOAD_CHUNK_SIZE
+        self.upload_form_overhead_bytes = UPLOAD_FORM_OVERHEAD_BYTES
+        self.hash_uploads = HASH_UPLOADS
         self.allowed_video_extensions = ALLOWED_VIDEO_EXTENSIONS
         self.indic_model_name = INDIC_MODEL_NAME
         self.whisper_model_name = WHISPER_MODEL_NAME
+        self.model_device = MODEL_DEVICE
+        self.model_memory_budget_mb = MODEL_MEMORY_BUDGET_MB
+        self.model_warmup = MODEL_WARMUP
+        self.warmup_language = WARMUP_LANGUAGE
+        self.preload_models = PRELOAD_MODELS
+        self.fast_start = FAST_START
+        self.weight_cache_dirname = WEIGHT_CACHE_DIRNAME
+        self.inference_backend = INFERENCE_BACKEND
+        self.onnx_cache_dirname = ONNX_CACHE_DIRNAME
+        self.onnx_quantize = ONNX_QUANTIZE
+        self.onnx_quantize_op_types = ONNX_QUANTIZE_OP_TYPES
+        self.onnx_opset = ONNX_OPSET
+        self.onnx_intra_op_threads = ONNX_INTRA_OP_THREADS
+        self.onnx_allow_spinning = ONNX_ALLOW_SPINNING
+        self.whisper_tiering = WHISPER_TIERING
+        self.whisper_tier_models = WHISPER_TIER_MODELS
+        self.whisper_tier_queue_depth = WHISPER_TIER_QUEUE_DEPTH
+        self.whisper_tier_rtf = WHISPER_TIER_RTF
+        self.whisper_tier_rtf_window_sec = WHISPER_TIER_RTF_WINDOW_SEC
+        self.whisper_tier_recovery_ratio = WHISPER_TIER_RECOVERY_RATIO
+        self.whisper_tier_hold_sec = WHISPER_TIER_HOLD_SEC
+        self.inference_batching = INFERENCE_BATCHING
+        self.inference_max_batch_size = INFERENCE_MAX_BATCH_SIZE
+        self.inference_max_wait_ms = INFERENCE_MAX_WAIT_MS
+        self.inference_max_pad_ratio = INFERENCE_MAX_PAD_RATIO
         self.target_sample_rate = TARGET_SAMPLE_RATE
         self.segment_length_sec = SEGMENT_LENGTH_SEC
+        self.speculative_detection = SPECULATIVE_DETECTION
+        self.leading_segment_sec = LEADING_SEGMENT_SEC
+        self.extract_read_size = EXTRACT_READ_SIZE
+        self.audio_store_dirname = AUDIO_STORE_DIRNAME
+        self.audio_window_sec = AUDIO_WINDOW_SEC
+        self.vad_frame_ms = VAD_FRAME_MS
+        self.vad_energy_margin_db = VAD_ENERGY_MARGIN_DB
+        self.vad_min_energy_db = VAD_MIN_ENERGY_DB
+        self.vad_min_speech_ms = VAD_MIN_SPEECH_MS
+        self.vad_min_silence_ms = VAD_MIN_SILENCE_MS
+        self.vad_pad_ms = VAD_PAD_MS
+        self.max_chunk_sec = MAX_CHUNK_SEC
+        self.chunk_workers = CHUNK_WORKERS
+        self.ctc_alignment = CTC_ALIGNMENT
         self.strong_indian_threshold = STRONG_INDIAN_THRESHOLD
         self.weak_indian_threshold = WEAK_INDIAN_THRESHOLD
         self.english_threshold = ENGLISH_THRESHOLD
+        self.rescore_top_k = LANGUAGE_RESCORE_TOP_K
+        self.early_stop_score = EARLY_STOP_SCORE
+        self.early_stop_margin = EARLY_STOP_MARGIN
+        self.language_probs_top_k = LANGUAGE_PROBS_TOP_K
         self.max_chars_per_line = MAX_CHARS_PER_LINE
         self.max_duration_sec = MAX_DURATION_SEC
+        self.caption_stream_retention_sec = CAPTION_STREAM_RETENTION_SEC
+        self.caption_stream_poll_sec = CAPTION_STREAM_POLL_SEC
+        self.english_window_sec = ENGLISH_WINDOW_SEC
+        self.result_cache_dirname = RESULT_CACHE_DIRNAME
+        self.result_cache_version = RESULT_CACHE_VERSION
+        self.result_cache_memory_entries = RESULT_CACHE_MEMORY_ENTRIES
+        self.result_cache_max_disk_mb = RESULT_CACHE_MAX_DISK_MB
+        self.result_cache_ttl_sec = RESULT_CACHE_TTL_SEC
+        self.chunk_cache = CHUNK_CACHE
+        self.chunk_cache_filename = CHUNK_CACHE_FILENAME
+        self.chunk_cache_max_entries = CHUNK_CACHE_MAX_ENTRIES
+        self.chunk_cache_ttl_sec = CHUNK_CACHE_TTL_SEC
+        self.chunk_cache_max_ber = CHUNK_CACHE_MAX_BER
+        self.chunk_cache_max_edge_sec = CHUNK_CACHE_MAX_EDGE_SEC
+        self.artifact_store_dirname = ARTIFACT_STORE_DIRNAME
+        self.artifact_ttl_sec = ARTIFACT_TTL_SEC
+        self.artifact_max_disk_mb = ARTIFACT_MAX_DISK_MB
+        self.artifact_compact_interval_sec = ARTIFACT_COMPACT_INTERVAL_SEC
+        self.artifact_gzip_min_bytes = ARTIFACT_GZIP_MIN_BYTES
+        self.task_store_backend = TASK_STORE_BACKEND
+        self.task_store_filename = TASK_STORE_FILENAME
+        self.task_store_max_entries = TASK_STORE_MAX_ENTRIES
+        self.task_store_ttl_sec = TASK_STORE_TTL_SEC
+        self.task_transcription_preview_chars = TASK_TRANSCRIPTION_PREVIEW_CHARS
+        self.batch_extract_workers = BATCH_EXTRACT_WORKERS
+        self.batch_prefetch = BATCH_PREFETCH
+        self.batch_manifest_filename = BATCH_MANIFEST_FILENAME
+        self.metrics_enabled = METRICS_ENABLED
+        self.metrics_duration_buckets = METRICS_DURATION_BUCKETS
+        self.metrics_rtf_buckets = METRICS_RTF_BUCKETS
         self.indic_languages = INDIC_LANGUAGES
         self.test_languages = TEST_LANGUAGES
+        self.execution_mode = EXECUTION_MODE
+        self.num_workers = NUM_WORKERS
+        self.torch_threads_per_worker = TORCH_THREADS_PER_WORKER
+        self.pin_worker_cpus = PIN_WORKER_CPUS
+        self.pipeline_stages = PIPELINE_STAGES
+        self.scratch_dirname = SCRATCH_DIRNAME
+        self.scratch_quota_mb = SCRATCH_QUOTA_MB
+        self.scratch_min_free_mb = SCRATCH_MIN_FREE_MB
+        self.scratch_wait_sec = SCRATCH_WAIT_SEC
+        self.scratch_retry_after_sec = SCRATCH_RETRY_AFTER_SEC
+        self.scratch_poll_sec = SCRATCH_POLL_SEC
+        self.scratch_tmpfs_dir = SCRATCH_TMPFS_DIR
+        self.scratch_tmpfs_quota_mb = SCRATCH_TMPFS_QUOTA_MB
+        self.scratch_tmpfs_max_file_mb = SCRATCH_TMPFS_MAX_FILE_MB
+        self.admission_control = ADMISSION_CONTROL
+        self.admission_max_wait_sec = ADMISSION_MAX_WAIT_SEC
+        self.admission_max_queued_tasks = ADMISSION_MAX_QUEUED_TASKS
+        self.admission_max_tasks_per_client = ADMISSION_MAX_TASKS_PER_CLIENT
+        self.admission_client_header = ADMISSION_CLIENT_HEADER
+        self.admission_trusted_proxies = ADMISSION_TRUSTED_PROXIES
+        self.admission_default_rtf = ADMISSION_DEFAULT_RTF
+        self.admission_rtf_smoothing = ADMISSION_RTF_SMOOTHING
+        self.admission_task_overhead_sec = ADMISSION_TASK_OVERHEAD_SEC
+        self.admission_fallback_duration_sec = ADMISSION_FALLBACK_DURATION_SEC
+        self.admission_probe_timeout_sec = ADMISSION_PROBE_TIMEOUT_SEC
+        self.admission_max_retry_after_sec = ADMISSION_MAX_RETRY_AFTER_SEC
+
+class TaskQueueConfig:
+    def __init__(self, config: ConfigEntity):
+        self.execution_mode = config.execution_mode
+        self.num_workers = config.num_workers
+        self.pipeline_stages = config.pipeline_stages
+
+class ProcessPoolConfig:
+    def __init__(self, config: ConfigEntity):
+        self.num_workers = config.num_workers
+        self.torch_threads_per_worker = config.torch_threads_per_worker
+        self.pin_worker_cpus = config.pin_worker_cpus
 
 class AudioExtractorConfig:
     def __init__(self, config: ConfigEntity):
         self.target_sample_rate = config.target_sample_rate
         self.temp_audio_filename = config.temp_audio_filename
+        self.leading_segment_sec = config.leading_segment_sec
+        self.extract_read_size = config.extract_read_size
+        self.audio_dir = os.path.join(config.output_dir, config.audio_store_dirname)
+        self.probe_timeout_sec = config.admission_probe_timeout_sec
+
+class VADChunkerConfig:
+    def __init__(self, config: ConfigEntity):
+        self.vad_frame_ms = config.vad_frame_ms
+        self.vad_energy_margin_db = config.vad_energy_margin_db
+        self.vad_min_energy_db = config.vad_min_energy_db
+        self.vad_min_speech_ms = config.vad_min_speech_ms
+        self.vad_min_silence_ms = config.vad_min_silence_ms
+        self.vad_pad_ms = config.vad_pad_ms
+        self.max_chunk_sec = config.max_chunk_sec
+        self.audio_window_sec = config.audio_window_sec
 
 class LanguageDetectorConfig:
     def __init__(self, config: ConfigEntity):
@@ -35,6 +164,10 @@ class LanguageDetectorConfig:
         self.strong_indian_threshold = config.strong_indian_threshold
         self.weak_indian_threshold = config.weak_indian_threshold
         self.english_threshold = config.english_threshold
+        self.rescore_top_k = config.rescore_top_k
+        self.early_stop_score = config.early_stop_score
+        self.early_stop_margin = config.early_stop_margin
+        self.language_probs_top_k = config.language_probs_top_k
         self.indic_model_name = config.indic_model_name
         self.whisper_model_name = config.whisper_model_name
 
@@ -43,6 +176,10 @@ class TranscriberConfig:
         self.indic_model_name = config.indic_model_name
         self.whisper_model_name = config.whisper_model_name
         self.target_sample_rate = config.target_sample_rate
+        self.chunk_workers = config.chunk_workers
+        self.ctc_alignment = config.ctc_alignment
+        self.english_window_sec = config.english_window_sec
+        self.chunk_cache = config.chunk_cache
 
 class SRTGeneratorConfig:
     def __init__(self, config: ConfigEntity):
@@ -53,4 +190,140 @@ class SRTGeneratorConfig:
         self.max_duration_sec = config.max_duration_sec
         self.indic_languages = config.indic_languages
 
+class ResultCacheConfig:
+    def __init__(self, config: ConfigEntity):
+        self.output_dir = config.output_dir
+        self.result_cache_dirname = config.result_cache_dirname
+        self.result_cache_version = config.result_cache_version
+        self.result_cache_memory_entries = config.result_cache_memory_entries
+        self.result_cache_max_disk_mb = config.result_cache_max_disk_mb
+        self.result_cache_ttl_sec = config.result_cache_ttl_sec
+        self.indic_model_name = config.indic_model_name
+        self.whisper_model_name = config.whisper_model_name
+        self.max_chars_per_line = config.max_chars_per_line
+        self.max_duration_sec = config.max_duration_sec
+        self.inference_backend = config.inference_backend
+        self.vad_params = {
+            "frame_ms": config.vad_frame_ms,
+            "energy_margin_db": config.vad_energy_margin_db,
+            "min_energy_db": config.vad_min_energy_db,
+            "min_speech_ms": config.vad_min_speech_ms,
+            "min_silence_ms": config.vad_min_silence_ms,
+            "pad_ms": config.vad_pad_ms
+        }
+        self.max_chunk_sec = config.max_chunk_sec
+        self.english_window_sec = config.english_window_sec
+        self.ctc_alignment = config.ctc_alignment
+
+class ModelManagerConfig:
+    def __init__(self, config: ConfigEntity):
+        self.indic_model_name = config.indic_model_name
+        self.whisper_model_name = config.whisper_model_name
+        self.model_device = config.model_device
+        self.model_memory_budget_mb = config.model_memory_budget_mb
+        self.model_warmup = config.model_warmup
+        self.warmup_language = config.warmup_language
+        self.preload_models = config.preload_models
+        self.target_sample_rate = config.target_sample_rate
+        self.fast_start = config.fast_start
+        self.weight_cache_dir = os.path.join(config.output_dir, config.weight_cache_dirname)
+        self.inference_backend = config.inference_backend
+
+class InferenceBatcherConfig:
+    def __init__(self, config: ConfigEntity):
+        self.enabled = config.inference_batching
+        self.max_batch_size = config.inference_max_batch_size
+        self.max_wait_ms = config.inference_max_wait_ms
+        self.max_pad_ratio = config.inference_max_pad_ratio
+
+class CaptionStreamConfig:
+    def __init__(self, config: ConfigEntity):
+        self.caption_stream_retention_sec = config.caption_stream_retention_sec
+        self.caption_stream_poll_sec = config.caption_stream_poll_sec
+
+class MetricsConfig:
+    def __init__(self, config: ConfigEntity):
+        self.enabled = config.metrics_enabled
+        self.duration_buckets = config.metrics_duration_buckets
+        self.rtf_buckets = config.metrics_rtf_buckets
+
+class BatchRunnerConfig:
+    def __init__(self, config: ConfigEntity):
+        self.output_dir = config.output_dir
+        self.allowed_video_extensions = config.allowed_video_extensions
+        self.extract_workers = config.batch_extract_workers
+        self.prefetch = config.batch_prefetch
+        self.manifest_filename = config.batch_manifest_filename
+
+class TaskStoreConfig:
+    def __init__(self, config: ConfigEntity):
+        self.backend = config.task_store_backend
+        self.sqlite_path = os.path.join(config.output_dir, config.task_store_filename)
+        self.max_entries = config.task_store_max_entries
+        self.ttl_sec = config.task_store_ttl_sec
+        self.transcription_preview_chars = config.task_transcription_preview_chars
+
+class ArtifactStoreConfig:
+    def __init__(self, config: ConfigEntity):
+        self.root_dir = os.path.join(config.output_dir, config.artifact_store_dirname)
+        self.ttl_sec = config.artifact_ttl_sec
+        self.max_disk_mb = config.artifact_max_disk_mb
+        self.compact_interval_sec = config.artifact_compact_interval_sec
+        self.gzip_min_bytes = config.artifact_gzip_min_bytes
 
+class OnnxBackendConfig:
+    def __init__(self, config: ConfigEntity):
+        self.cache_dir = os.path.join(config.output_dir, config.onnx_cache_dirname)
+        self.quantize = config.onnx_quantize
+        self.quantize_op_types = config.onnx_quantize_op_types
+        self.opset = config.onnx_opset
+        self.intra_op_threads = config.onnx_intra_op_threads
+        self.allow_spinning = config.onnx_allow_spinning
+
+class WhisperTierConfig:
+    def __init__(self, config: ConfigEntity):
+        self.enabled = config.whisper_tiering
+        self.whisper_model_name = config.whisper_model_name
+        self.tier_models = config.whisper_tier_models
+        self.queue_depth_thresholds = config.whisper_tier_queue_depth
+        self.rtf_thresholds = config.whisper_tier_rtf
+        self.rtf_window_sec = config.whisper_tier_rtf_window_sec
+        self.recovery_ratio = config.whisper_tier_recovery_ratio
+        self.hold_sec = config.whisper_tier_hold_sec
+        self.num_workers = config.num_workers
+
+class ChunkCacheConfig:
+    def __init__(self, config: ConfigEntity):
+        self.sqlite_path = os.path.join(config.output_dir, config.chunk_cache_filename)
+        self.max_entries = config.chunk_cache_max_entries
+        self.ttl_sec = config.chunk_cache_ttl_sec
+        self.max_ber = config.chunk_cache_max_ber
+        self.max_edge_sec = config.chunk_cache_max_edge_sec
+
+class AdmissionConfig:
+    def __init__(self, config: ConfigEntity):
+        self.enabled = config.admission_control
+        self.num_workers = config.num_workers
+        self.max_wait_sec = config.admission_max_wait_sec
+        self.max_queued_tasks = config.admission_max_queued_tasks
+        self.max_tasks_per_client = config.admission_max_tasks_per_client
+        self.client_header = config.admission_client_header
+        self.trusted_proxies = config.admission_trusted_proxies
+        self.default_rtf = config.admission_default_rtf
+        self.rtf_smoothing = config.admission_rtf_smoothing
+        self.task_overhead_sec = config.admission_task_overhead_sec
+        self.fallback_duration_sec = config.admission_fallback_duration_sec
+        self.max_retry_after_sec = config.admission_max_retry_after_sec
+        self.scratch_retry_after_sec = config.scratch_retry_after_sec
+
+class ScratchSpaceConfig:
+    def __init__(self, config: ConfigEntity):
+        self.root_dir = os.path.join(config.output_dir, config.scratch_dirname)
+        self.audio_dir = os.path.join(config.output_dir, config.audio_store_dirname)
+        self.quota_mb = config.scratch_quota_mb
+        self.min_free_mb = config.scratch_min_free_mb
+        self.wait_sec = config.scratch_wait_sec
+        self.poll_sec = config.scratch_poll_sec
+        self.tmpfs_dir = config.scratch_tmpfs_dir
+        self.tmpfs_quota_mb = config.scratch_tmpfs_quota_mb
+        self.tmpfs_max_file_mb = config.scratch_tmpfs_max_file_mb
@@ -0,0 +1,192 @@
+import math
+import ipaddress
+import time
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+from src.entity.config_entity import AdmissionConfig, ConfigEntity
+from src.utils.metrics import get_metrics
+from src.logger import logging
+
+class AdmissionRejected(Exception):
+    # Turned into 429 with Retry-After by the API
+    def __init__(self, reason: str, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.detail = detail
+
+@dataclass
+class _Ticket:
+    client: str
+    audio_sec: float
+    cost_sec: float
+    admitted_at: float
+    started_at: Optional[float] = None
+
+class AdmissionController:
+    """Weighted queue of admitted tasks, each costed in worker-seconds from its media duration. New uploads
+    are refused while the estimated wait is over ADMISSION_MAX_WAIT_SEC or the client has too many tasks.
+    The per-client limit needs a client identity: ADMISSION_CLIENT_HEADER, or X-Forwarded-For from
+    ADMISSION_TRUSTED_PROXIES. Behind a proxy the peer address is the proxy's, shared by every client."""
+
+    def __init__(self):
+        self.config = AdmissionConfig(config=ConfigEntity())
+        self._proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in self.config.trusted_proxies]
+        self._limit_clients = self.config.max_tasks_per_client > 0 and bool(self.config.client_header or self._proxies)
+        self._lock = threading.Lock()
+        self._tickets: Dict[str, _Ticket] = {}
+        self._per_client: Dict[str, int] = {}
+        self._rtf = self.config.default_rtf
+        self._measured = 0
+        self._admitted = 0
+        self._rejected: Dict[str, int] = {}
+        self.metrics = get_metrics()
+        logging.info(f"AdmissionController initialized (enabled: {self.config.enabled}, max wait: {self.config.max_wait_sec}s, "
+                     f"per-client limit: {self.config.max_tasks_per_client if self._limit_clients else 'off'})")
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in proxy for proxy in self._proxies)
+
+    def client_key(self, headers, peer: Optional[str]) -> str:
+        if self.config.client_header and headers.get(self.config.client_header):
+            return headers.get(self.config.client_header)
+        if peer and self._trusted(peer):
+            # The nearest address not added by one of our own proxies; the rest is client-supplied
+            forwarded = [address.strip() for address in headers.get("x-forwarded-for", "").split(",") if address.strip()]
+            for address in reversed(forwarded):
+                if not self._trusted(address):
+                    return address
+        return peer or "unknown"
+
+    def estimate_cost(self, audio_sec: Optional[float]) -> float:
+        audio_sec = audio_sec if audio_sec is not None else self.config.fallback_duration_sec
+        return audio_sec * self._rtf + self.config.task_overhead_sec
+
+    def _remaining(self, ticket: _Ticket, now: float) -> float:
+        if ticket.started_at is None:
+            return ticket.cost_sec
+        return max(1.0, ticket.cost_sec - (now - ticket.started_at))
+
+    def _wait_sec(self, now: float) -> float:
+        # Until a worker is free for a new task, assuming the backlog spreads evenly over the workers
+        if len(self._tickets) < self.config.num_workers:
+            return 0.0
+        return sum(self._remaining(ticket, now) for ticket in self._tickets.values()) / self.config.num_workers
+
+    def _retry_after(self, seconds: float) -> int:
+        return int(min(self.config.max_retry_after_sec, max(1, math.ceil(seconds))))
+
+    def _reject(self, reason: str, retry_after: float, detail: str):
+        retry_after = self._retry_after(retry_after)
+        self._rejected[reason] = self._rejected.get(reason, 0) + 1
+        self.metrics.inc("caption_admission_total", result="rejected", reason=reason)
+        logging.warning(f"Upload refused ({reason}): {detail}; retry after {retry_after}s")
+        raise AdmissionRejected(reason, retry_after, detail)
+
+    def _check(self, client: str, now: float):
+        # Caller holds the lock
+        active = self._per_client.get(client, 0)
+        if self._limit_clients and active >= self.config.max_tasks_per_client:
+            # Until the client's soonest task is expected to finish
+            wait = self._wait_sec(now)
+            soonest = min(self._remaining(ticket, now) + (0.0 if ticket.started_at else wait)
+                          for ticket in self._tickets.values() if ticket.client == client)
+            self._reject("client_limit", soonest,
+                         f"{active} tasks already queued or running for this client (limit {self.config.max_tasks_per_client})")
+        queued = sum(1 for ticket in self._tickets.values() if ticket.started_at is None)
+        if queued >= self.config.max_queued_tasks:
+            running = [self._remaining(ticket, now) for ticket in self._tickets.values() if ticket.started_at]
+            self._reject("queue_full", min(running) if running else self.config.max_retry_after_sec,
+                         f"{queued} tasks queued (limit {self.config.max_queued_tasks})")
+        wait = self._wait_sec(now)
+        if wait > self.config.max_wait_sec:
+            # The wait drops by a second per second while every worker is busy
+            self._reject("wait", wait - self.config.max_wait_sec,
+                         f"estimated wait {wait:.0f}s is over {self.config.max_wait_sec}s")
+
+    def check(self, client: str):
+        """Cheap pre-check before the upload is written to disk and probed; admit() decides."""
+        if not self.config.enabled:
+            return
+        with self._lock:
+            self._check(client, time.monotonic())
+
+    def refuse_for_space(self, nbytes: int):
+        """Refuses an upload the scratch quota has no room for; space comes back as running tasks end."""
+        with self._lock:
+            now = time.monotonic()
+            running = [self._remaining(ticket, now) for ticket in self._tickets.values() if ticket.started_at]
+            self._reject("scratch_full", min(running) if running else self.config.scratch_retry_after_sec,
+                         f"no scratch space for {nbytes / 2**20:.0f} MB")
+
+    def admit(self, task_id: str, client: str, audio_sec: Optional[float]) -> dict:
+        if not self.config.enabled:
+            return {"cost_sec": None, "estimated_wait_sec": None}
+        with self._lock:
+            now = time.monotonic()
+            self._check(client, now)
+            cost = self.estimate_cost(audio_sec)
+            wait = self._wait_sec(now)
+            self._tickets[task_id] = _Ticket(client, audio_sec or 0.0, cost, now)
+            self._per_client[client] = self._per_client.get(client, 0) + 1
+            self._admitted += 1
+        self.metrics.inc("caption_admission_total", result="admitted", reason="ok")
+        return {"cost_sec": round(cost, 1), "estimated_wait_sec": round(wait, 1)}
+
+    def start(self, task_id: str):
+        with self._lock:
+            ticket = self._tickets.get(task_id)
+            if ticket is not None:
+                ticket.started_at = time.monotonic()
+
+    def finish(self, task_id: str, task: Optional[dict] = None):
+        """Releases the task's slot; a completed, uncached task also refines the cost per audio second."""
+        with self._lock:
+            ticket = self._tickets.pop(task_id, None)
+            if ticket is None:
+                return
+            remaining = self._per_client.get(ticket.client, 1) - 1
+            if remaining > 0:
+                self._per_client[ticket.client] = remaining
+            else:
+                self._per_client.pop(ticket.client, None)
+            timings = (task or {}).get("timings") or {}
+            if task and task.get("status") == "completed" and not task.get("cache_hit") \
+                    and timings.get("audio_sec") and timings.get("total_sec"):
+                rtf = max(0.0, timings["total_sec"] - self.config.task_overhead_sec) / timings["audio_sec"]
+                self._rtf += self.config.rtf_smoothing * (rtf - self._rtf)
+                self._measured += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            queued = [ticket for ticket in self._tickets.values() if ticket.started_at is None]
+            return {
+                "enabled": self.config.enabled,
+                "queued": len(queued),
+                "running": len(self._tickets) - len(queued),
+                "queued_audio_sec": round(sum(ticket.audio_sec for ticket in queued), 1),
+                "backlog_cost_sec": round(sum(self._remaining(ticket, now) for ticket in self._tickets.values()), 1),
+                "estimated_wait_sec": round(self._wait_sec(now), 1),
+                "max_wait_sec": self.config.max_wait_sec,
+                "cost_per_audio_sec": round(self._rtf, 4),
+                "measured_tasks": self._measured,
+                "clients": len(self._per_client),
+                "admitted": self._admitted,
+                "rejected": dict(self._rejected)
+            }
+
+_admission_controller = None
+_admission_controller_lock = threading.Lock()
+
+def get_admission_controller() -> AdmissionController:
+    global _admission_controller
+    with _admission_controller_lock:
+        if _admission_controller is None:
+            _admission_controller = AdmissionController()
+        return _admission_controller
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List, Optional
+from src.entity.config_entity import BatchRunnerConfig, ConfigEntity
+from src.entity.artifacts import AudioExtractionArtifact
+from src.components.audio_extractor import AudioExtractor
+from src.components.language_detector import LanguageDetector
+from src.components.vad_chunker import VADChunker
+from src.components.transcriber import Transcriber
+from src.components.srt_generator import SRTGenerator
+from src.components.result_cache import get_result_cache
+from src.logger import logging
+from src.exceptions import CustomException
+
+class BatchRunner:
+    def __init__(self, manifest_path: Optional[str] = None):
+        self.config = BatchRunnerConfig(config=ConfigEntity())
+        os.makedirs(self.config.output_dir, exist_ok=True)
+        self.manifest_path = manifest_path or os.path.join(self.config.output_dir, self.config.manifest_filename)
+        self.extractor = AudioExtractor()
+        self.detector = LanguageDetector()
+        self.chunker = VADChunker()
+        self.transcriber = Transcriber()
+        self.generator = SRTGenerator()
+        self.result_cache = get_result_cache()
+        logging.info("BatchRunner initialized")
+
+    def discover(self, source: str) -> List[str]:
+        # A directory is scanned recursively; any other file is a list of paths, one per line
+        if os.path.isdir(source):
+            paths = []
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                paths.extend(os.path.join(root, name) for name in sorted(files)
+                             if name.lower().endswith(self.config.allowed_video_extensions))
+            return [os.path.abspath(path) for path in paths]
+        if os.path.isfile(source):
+            base = os.path.dirname(os.path.abspath(source))
+            with open(source, encoding="utf-8") as f:
+                lines = [line.strip() for line in f]
+            return [os.path.abspath(os.path.join(base, line)) for line in lines if line and not line.startswith("#")]
+        raise CustomException(f"Batch source not found: {source}", sys)
+
+    def load_manifest(self) -> Dict[str, dict]:
+        # Append-only JSON lines; the last record for a path wins, a torn final line is ignored
+        records = {}
+        if not os.path.exists(self.manifest_path):
+            return records
+        with open(self.manifest_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                records[record["path"]] = record
+        return records
+
+    def _append(self, record: dict):
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _fingerprint(path: str) -> dict:
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def _is_done(self, path: str, record: Optional[dict]) -> bool:
+        if not record or record.get("status") != "completed":
+            return False
+        try:
+            fingerprint = self._fingerprint(path)
+        except OSError:
+            return False
+        # A replaced source file or a deleted SRT means the file is processed again
+        return (record.get("size"), record.get("mtime")) == (fingerprint["size"], fingerprint["mtime"]) \
+            and os.path.exists(record.get("srt_file_path") or "")
+
+    def _extract(self, path: str):
+        start = time.perf_counter()
+        audio_artifact = self.extractor.extract(path)
+        return audio_artifact, time.perf_counter() - start
+
+    def _video_name(self, path: str, source: str) -> str:
+        # Relative path keeps SRT names unique when different folders share file names
+        root = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+        relative = os.path.relpath(path, root)
+        if relative.startswith(".."):
+            relative = os.path.basename(path)
+        return os.path.splitext(relative)[0].replace(os.sep, "__")
+
+    def _caption(self, path: str, video_name: str, audio_artifact: AudioExtractionArtifact) -> dict:
+        stages = {}
+        decoded_audio_key = self.result_cache.make_key(audio_artifact.content_hash(), "decoded_audio")
+        cached = self.result_cache.get(decoded_audio_key)
+        if cached:
+            srt_artifact = self.generator.save(cached["srt_content"], cached["language"], video_name)
+            return {"status": "completed", "cache_hit": "decoded_audio", "language": cached["language"],
+                    "model_used": cached["model_used"], "srt_file_path": srt_artifact.srt_file_path, "stages": stages}
+
+        start = time.perf_counter()
+        lang_artifact = self.detector.detect(audio_artifact)
+        stages["language_detection"] = round(time.perf_counter() - start, 3)
+        if lang_artifact.error:
+            raise CustomException(lang_artifact.error, sys)
+        language = lang_artifact.detected_language
+
+        start = time.perf_counter()
+        chunking_artifact = self.chunker.chunk(audio_artifact)
+        stages["vad_chunking"] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        trans_artifact = self.transcriber.transcribe(audio_artifact, language, chunking_artifact)
+        stages["transcription"] = round(time.perf_counter() - start, 3)
+        if trans_artifact.error:
+            raise CustomException(trans_artifact.error, sys)
+
+        start = time.perf_counter()
+        srt_artifact = self.generator.generate(trans_artifact.word_timestamps, None, language, video_name)
+        stages["srt_generation"] = round(time.perf_counter() - start, 3)
+
+        self.result_cache.put(decoded_audio_key, {
+            "language": language,
+            "language_probs": lang_artifact.language_probs,
+            "transcription": trans_artifact.transcription,
+            "model_used": trans_artifact.model_used,
+            "srt_content": srt_artifact.srt_content,
+            "cues": [asdict(cue) for cue in srt_artifact.cues or []]
+        })
+        return {"status": "completed", "cache_hit": None, "language": language, "model_used": trans_artifact.model_used,
+                "reused_sec": trans_artifact.reused_sec, "srt_file_path": srt_artifact.srt_file_path, "stages": stages}
+
+    def run(self, source: str, retry_failed: bool = False, limit: Optional[int] = None) -> dict:
+        paths = self.discover(source)
+        manifest = self.load_manifest()
+        pending = []
+        skipped = 0
+        for path in paths:
+            record = manifest.get(path)
+            if self._is_done(path, record) or (record and record.get("status") == "failed" and not retry_failed):
+                skipped += 1
+            else:
+                pending.append(path)
+        if limit is not None:
+            pending = pending[:limit]
+        logging.info(f"Batch run: {len(paths)} files found, {skipped} already done, {len(pending)} to process")
+
+        summary = {"found": len(paths), "skipped": skipped, "completed": 0, "failed": 0, "audio_sec": 0.0}
+        wall_start = time.perf_counter()
+        remaining = iter(pending)
+        inflight = deque()
+
+        # ffmpeg decodes the next files on worker threads while the models work on the current one
+        with ThreadPoolExecutor(max_workers=self.config.extract_workers, thread_name_prefix="batch-extract") as pool:
+            def refill():
+                while len(inflight) < self.config.prefetch + 1:
+                    path = next(remaining, None)
+                    if path is None:
+                        return
+                    inflight.append((path, pool.submit(self._extract, path)))
+
+            refill()
+            while inflight:
+                path, future = inflight.popleft()
+                refill()
+                start = time.perf_counter()
+                record = {"path": path}
+                audio_artifact = None
+                try:
+                    record.update(self._fingerprint(path))
+                    audio_artifact, extract_sec = future.result()
+                    record["audio_sec"] = round(audio_artifact.duration_sec, 3)
+                    record.update(self._caption(path, self._video_name(path, source), audio_artifact))
+                    record["stages"] = {"audio_extraction": round(extract_sec, 3), **record["stages"]}
+                    summary["completed"] += 1
+                    summary["audio_sec"] += record["audio_sec"]
+                except Exception as e:
+                    record.update({"status": "failed", "error": str(e)})
+                    summary["failed"] += 1
+                    logging.error(f"Batch file failed {path}: {str(e)}")
+                finally:
+                    if audio_artifact is not None:
+                        audio_artifact.release()
+                record["elapsed_sec"] = round(time.perf_counter() - start, 3)
+                record["finished_at"] = time.time()
+                self._append(record)
+                self._report(summary, wall_start, len(pending), path, record)
+
+        summary.update(self._throughput(summary, wall_start))
+        logging.info(f"Batch run finished: {summary}")
+        return summary
+
+    @staticmethod
+    def _throughput(summary: dict, wall_start: float) -> dict:
+        wall_sec = time.perf_counter() - wall_start
+        return {
+            "wall_sec": round(wall_sec, 1),
+            "audio_hours": round(summary["audio_sec"] / 3600, 3),
+            "audio_hours_per_hour": round(summary["audio_sec"] / wall_sec, 2) if wall_sec > 0 else 0.0
+        }
+
+    def _report(self, summary: dict, wall_start: float, total: int, path: str, record: dict):
+        done = summary["completed"] + summary["failed"]
+        throughput = self._throughput(summary, wall_start)
+        print(f"[{done}/{total}] {record['status']:9} {os.path.basename(path)} "
+              f"({record.get('audio_sec', 0):.0f}s audio, {record['elapsed_sec']:.1f}s) "
+              f"- {throughput['audio_hours_per_hour']:.2f} audio-h/h", flush=True)
@@ -0,0 +1,66 @@
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from src.entity.artifacts import CaptionCue
+from src.entity.config_entity import CaptionStreamConfig, ConfigEntity
+from src.logger import logging
+
+@dataclass
+class _CaptionStream:
+    cues: List[CaptionCue] = field(default_factory=list)
+    closed: bool = False
+    error: Optional[str] = None
+    closed_at: Optional[float] = None
+
+class CaptionStreamHub:
+    def __init__(self):
+        self.config = CaptionStreamConfig(config=ConfigEntity())
+        self._streams: Dict[str, _CaptionStream] = {}
+        self._lock = threading.Lock()
+        logging.info("CaptionStreamHub initialized")
+
+    def open(self, task_id: str):
+        with self._lock:
+            self._sweep()
+            self._streams.setdefault(task_id, _CaptionStream())
+
+    def publish(self, task_id: str, cues: List[CaptionCue]):
+        if not cues:
+            return
+        with self._lock:
+            stream = self._streams.setdefault(task_id, _CaptionStream())
+            stream.cues.extend(cues)
+
+    def close(self, task_id: str, error: Optional[str] = None):
+        with self._lock:
+            stream = self._streams.setdefault(task_id, _CaptionStream())
+            stream.closed = True
+            stream.error = error
+            stream.closed_at = time.time()
+
+    def read(self, task_id: str, start: int) -> Optional[Tuple[List[CaptionCue], bool, Optional[str]]]:
+        # Cues from position `start` on, plus whether the stream is finished
+        with self._lock:
+            stream = self._streams.get(task_id)
+            if stream is None:
+                return None
+            return stream.cues[start:], stream.closed, stream.error
+
+    def _sweep(self):
+        # Finished streams are kept briefly for late subscribers, then dropped
+        now = time.time()
+        expired = [task_id for task_id, stream in self._streams.items()
+                   if stream.closed and now - stream.closed_at > self.config.caption_stream_retention_sec]
+        for task_id in expired:
+            del self._streams[task_id]
+
+_caption_hub = None
+_caption_hub_lock = threading.Lock()
+
+def get_caption_hub() -> CaptionStreamHub:
+    global _caption_hub
+    with _caption_hub_lock:
+        if _caption_hub is None:
+            _caption_hub = CaptionStreamHub()
+        return _caption_hub
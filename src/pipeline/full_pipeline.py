@@ -1,119 +1,389 @@
 import os
 import sys
+import time
+import asyncio
 import uuid
-import tempfile
-from fastapi import UploadFile
+from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import HTTPException
 from src.entity.config_entity import ConfigEntity
+from src.entity.artifacts import CaptionCue, LanguageDetectionArtifact
 from src.components.audio_extractor import AudioExtractor
 from src.components.language_detector import LanguageDetector
+from src.components.vad_chunker import VADChunker
 from src.components.transcriber import Transcriber
 from src.components.srt_generator import SRTGenerator
-from src.utils.io_utils import validate_uploaded_file
+from src.components.result_cache import get_result_cache
+from src.components.model_tiering import get_tier_policy
+from src.components.scratch_space import get_scratch_space
+from src.pipeline.caption_stream import get_caption_hub
+from src.pipeline.admission import AdmissionRejected, get_admission_controller
+from src.pipeline.task_store import TaskStore
+from src.utils.io_utils import StreamedUpload, save_uploaded_file
+from src.utils.metrics import get_metrics, peak_rss_bytes
 from src.logger import logging
 from src.exceptions import CustomException
 
-async def upload_service(video: UploadFile, task_data: dict):
+async def upload_service(video: StreamedUpload, task_store: TaskStore, task_queue, whisper_model: Optional[str] = None,
+                         client: str = "unknown"):
+    task_id = None
+    workspace = None
+    admitted = False
+    submitted = False
+    admission = get_admission_controller()
     try:
         base_config = ConfigEntity()
         task_id = uuid.uuid4().hex
-        video_name = os.path.splitext(video.filename)[0]  # Get video name without extension
 
-        # Validate and read file
-        file_content = await validate_uploaded_file(video, base_config)
+        # Refuse early when this client or the queue is already over its limits
+        admission.check(client)
 
-        # Save temporarily
-        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(video.filename)[1], delete=False) as temp_file:
-            temp_file.write(file_content)
-            video_path = temp_file.name
+        # Read the form up to the file itself; its bytes go straight to the workspace below
+        await video.start()
+        video_name, ext = os.path.splitext(video.filename)  # Get video name without extension
+
+        # Every file of the task lives in its workspace. The request isn't held open waiting for scratch
+        # quota: without room for the upload it is refused before the body is read (only workers wait)
+        workspace = get_scratch_space().workspace(task_id)
+        if not await asyncio.to_thread(workspace.reserve, video.content_length or 0, False):
+            admission.refuse_for_space(video.content_length or 0)
+
+        # Validate and stream the upload straight to disk
+        upload_artifact = await save_uploaded_file(video, base_config, compute_hash=base_config.hash_uploads,
+                                                   file_path=workspace.path(f"upload{ext.lower()}"))
+        video_path = upload_artifact.file_path
+
+        # Cost the task by its duration (headers only, no decode) and admit it to the queue
+        media_sec = await asyncio.to_thread(AudioExtractor().probe_duration, video_path)
+        admission_info = admission.admit(task_id, client, media_sec)
+        admitted = True
 
         # Initialize task
-        task_data[task_id] = {
-            "status": "processing",
+        task_store.create(task_id, {
+            "status": "queued",
+            "stage": None,
+            "progress": 0.0,
+            "stages": {stage: "pending" for stage in base_config.pipeline_stages},
             "transcription": None,
             "language": None,
+            "language_probs": None,
             "model_used": None,
+            "whisper_model_override": whisper_model,
+            "model_tier": None,
+            "chunk_reuse": None,
             "srt_file_path": None,
+            "srt_sha256": None,
             "error": None,
-            "video_path": video_path
-        }
-
-        logging.info(f"Task {task_id} processing started for video: {video_name}")
+            "cache_hit": None,
+            "video_name": video_name,
+            "video_path": video_path,
+            "workspace": workspace.name,
+            "file_size": upload_artifact.size_bytes,
+            "file_sha256": upload_artifact.sha256,
+            "admission": {"media_sec": round(media_sec, 3) if media_sec else None, **admission_info},
+            "timings": {"queued_at": time.time()}
+        })
 
-        # Process synchronously
-        process_task(task_id, task_data, video_name)
+        # Open the caption stream first so clients can subscribe before processing starts
+        get_caption_hub().open(task_id)
 
-        result = task_data[task_id]
-        if result["status"] == "failed":
-            raise CustomException(result["error"], sys)
+        # Hand off to the worker pool so the event loop stays free
+        task_queue.submit(task_id, task_store, video_name)
+        submitted = True
+        logging.info(f"Task {task_id} queued for video: {video_name}")
 
-        logging.info(f"Task {task_id} completed")
         return {
             "task_id": task_id,
-            "status": result["status"],
-            "message": "Processing completed",
-            "srt_file_path": result["srt_file_path"]
+            "status": "queued",
+            "message": "Processing started",
+            "estimated_wait_sec": admission_info["estimated_wait_sec"]
         }
 
+    except (AdmissionRejected, HTTPException):
+        if workspace:
+            workspace.cleanup()
+        raise
     except Exception as e:
-        if task_id in task_data:
-            task_data[task_id]["status"] = "failed"
-            task_data[task_id]["error"] = str(e)
+        if admitted and not submitted:
+            admission.finish(task_id)
+        if workspace and not submitted:
+            workspace.cleanup()
+        if task_id and task_store.update(task_id, {"status": "failed", "error": str(e)}):
+            get_caption_hub().close(task_id, str(e))
         raise CustomException(e, sys)
 
-def process_task(task_id: str, task_data: dict, video_name: str):
+class StageTracker:
+    # Works on a copy of the task and writes it back to the store on every report
+    def __init__(self, task_store: TaskStore, task_id: str, on_progress: Optional[Callable[[dict], None]] = None,
+                 caption_sink=None):
+        self.task_store = task_store
+        self.task_id = task_id
+        self.task = task_store.get(task_id)
+        self.on_progress = on_progress
+        self.caption_sink = caption_sink
+        self.metrics = get_metrics()
+        self._task_start = time.perf_counter()
+        self._stage_start: Dict[str, float] = {}
+        self._ended = False
+
+    def _timings(self) -> dict:
+        timings = self.task.setdefault("timings", {})
+        timings.setdefault("stages", {})
+        return timings
+
+    def report(self):
+        if self.task is None:
+            return
+        self.task_store.update(self.task_id, self.task)
+        if self.on_progress:
+            self.on_progress(self.task)
+
+    def begin(self):
+        self._task_start = time.perf_counter()
+        timings = self._timings()
+        queued_at = timings.get("queued_at")
+        if queued_at:
+            timings["queue_wait_sec"] = round(max(0.0, time.time() - queued_at), 3)
+            self.metrics.observe("caption_queue_wait_seconds", timings["queue_wait_sec"])
+        self.task["status"] = "processing"
+        self.report()
+
+    def start(self, stage: str, current: bool = True):
+        # current=False starts a stage alongside the one already shown as the task's stage
+        if current:
+            self.task["stage"] = stage
+        self.task["stages"][stage] = "running"
+        self._stage_start[stage] = time.perf_counter()
+        self.report()
+
+    def _record_stage(self, stage: str, ended_at: Optional[float] = None):
+        start = self._stage_start.pop(stage, None)
+        if start is None:
+            return
+        elapsed = (ended_at or time.perf_counter()) - start
+        self._timings()["stages"][stage] = round(elapsed, 3)
+        self.metrics.observe("caption_stage_duration_seconds", elapsed, stage=stage)
+
+    def finish(self, stage: str, ended_at: Optional[float] = None):
+        # ended_at is a perf_counter() reading, for a stage that overlapped another and ended earlier
+        self.task["stages"][stage] = "completed"
+        self._record_stage(stage, ended_at)
+        done = sum(1 for state in self.task["stages"].values() if state == "completed")
+        self.task["progress"] = round(done / len(self.task["stages"]), 2)
+        self.report()
+
+    def end(self, status: str, audio_sec: Optional[float] = None, language: Optional[str] = None,
+            cache_hit: Optional[str] = None):
+        if self._ended or self.task is None:
+            return
+        self._ended = True
+        elapsed = time.perf_counter() - self._task_start
+        timings = self._timings()
+        timings["total_sec"] = round(elapsed, 3)
+        timings["peak_rss_mb"] = round(peak_rss_bytes() / 2**20, 1)
+        self.metrics.observe("caption_task_duration_seconds", elapsed)
+        self.metrics.inc("caption_tasks_total", status=status, cache_hit=cache_hit or "none")
+        self.metrics.set_max("caption_peak_rss_bytes", peak_rss_bytes())
+        if audio_sec:
+            timings["audio_sec"] = round(audio_sec, 3)
+            self.metrics.inc("caption_audio_seconds_total", audio_sec, language=language or "unknown")
+            # Cache hits would skew the real-time factor towards zero
+            if status == "completed" and not cache_hit:
+                timings["real_time_factor"] = round(elapsed / audio_sec, 4)
+                self.metrics.observe("caption_real_time_factor", elapsed / audio_sec)
+
+    def fail(self, error: str):
+        if self.task is None:
+            return
+        # More than one stage can be running when they overlap
+        for stage, state in self.task["stages"].items():
+            if state == "running":
+                self.task["stages"][stage] = "failed"
+                self._record_stage(stage)
+        self.task["status"] = "failed"
+        self.task["error"] = error
+        self.end("failed")
+        self.report()
+        if self.caption_sink:
+            self.caption_sink.close(self.task_id, error)
+
+def _complete_from_cache(task: dict, task_id: str, cached: dict, level: str, video_name: str, caption_sink):
+    srt_artifact = SRTGenerator().save(cached["srt_content"], cached["language"], video_name, task_id=task_id)
+    caption_sink.publish(task_id, [CaptionCue(**cue) for cue in cached.get("cues", [])])
+    caption_sink.close(task_id)
+    for stage, state in task["stages"].items():
+        # A speculative language detection may still be running; its result isn't needed
+        if state in ("pending", "running"):
+            task["stages"][stage] = "skipped"
+    task.update({
+        "status": "completed",
+        "stage": None,
+        "progress": 1.0,
+        "cache_hit": level,
+        "transcription": cached["transcription"],
+        "language": cached["language"],
+        "language_probs": cached.get("language_probs"),
+        "model_used": cached["model_used"],
+        "srt_file_path": srt_artifact.srt_file_path,
+        "srt_sha256": srt_artifact.sha256
+    })
+    logging.info(f"Task {task_id} served from {level} result cache")
+
+def process_task(task_id: str, task_store: TaskStore, video_name: str, on_progress: Optional[Callable[[dict], None]] = None,
+                 caption_sink=None):
+    # caption_sink receives cues as they are finished (publish/close); defaults to the in-process hub
+    caption_sink = caption_sink or get_caption_hub()
+    tracker = StageTracker(task_store, task_id, on_progress, caption_sink)
+    task = tracker.task
+    audio_artifact = None
+    workspace = None
     try:
-        if task_id not in task_data:
+        if task is None:
             raise CustomException(f"Task not found: {task_id}", sys)
 
-        video_path = task_data[task_id]["video_path"]
+        tracker.begin()
+        video_path = task["video_path"]
+        # The task owns its input and scratch files from here on, and removes them however it ends
+        scratch_space = get_scratch_space()
+        workspace = scratch_space.open(task["workspace"]) if task.get("workspace") else scratch_space.workspace(task_id)
+        workspace.track(video_path)
+
+        # Identical upload seen before: skip the whole pipeline
+        result_cache = get_result_cache()
+        upload_hash = task.get("file_sha256")
+        upload_key = result_cache.make_key(upload_hash, "upload") if upload_hash else None
+        cached = result_cache.get(upload_key)
+        if cached:
+            _complete_from_cache(task, task_id, cached, "upload", video_name, caption_sink)
+            tracker.end("completed", cache_hit="upload")
+            tracker.report()
+            return
+
+        # Whisper model for this task: the request's override, else what the current load allows
+        tier = get_tier_policy().select(task.get("whisper_model_override"))
+        task["model_tier"] = tier
+        whisper_model = tier["whisper_model"]
+
+        # Extract audio; language detection starts on the leading segment while the rest decodes
+        tracker.start("audio_extraction")
+        detector = LanguageDetector()
+        detection = None
+        on_leading = None
+        if ConfigEntity().speculative_detection:
+            detection_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="language-detection")
+
+            def on_leading(leading_artifact):
+                nonlocal detection
+                tracker.start("language_detection", current=False)
+                detection = detection_pool.submit(_timed_detect, detector, leading_artifact, whisper_model)
 
-        # Extract audio
         extractor = AudioExtractor()
-        audio_artifact = extractor.extract(video_path)
-        audio_path = audio_artifact.audio_path
+        try:
+            audio_artifact = extractor.extract(video_path, on_leading=on_leading, workspace=workspace,
+                                               duration_sec=(task.get("admission") or {}).get("media_sec"))
+        finally:
+            if on_leading:
+                # Never waits: an unneeded detection (cache hit, failure) finishes in the background
+                detection_pool.shutdown(wait=False)
+        if workspace.wait_sec:
+            task["timings"]["scratch_wait_sec"] = round(workspace.wait_sec, 3)
+        tracker.finish("audio_extraction")
+
+        # Bit-identical decoded audio seen before (a remux or container change). A lossy re-encode
+        # decodes to different samples and misses here; the chunk cache picks those up per chunk.
+        decoded_audio_key = result_cache.make_key(audio_artifact.content_hash(), "decoded_audio")
+        cached = result_cache.get(decoded_audio_key)
+        if cached:
+            result_cache.put(upload_key, cached)
+            _complete_from_cache(task, task_id, cached, "decoded_audio", video_name, caption_sink)
+            tracker.end("completed", audio_sec=audio_artifact.duration_sec, language=cached["language"], cache_hit="decoded_audio")
+            tracker.report()
+            return
 
         # Detect language
-        detector = LanguageDetector()
-        lang_artifact = detector.detect(audio_path)
+        if detection is not None:
+            task["stage"] = "language_detection"
+            lang_artifact, detected_at = detection.result()
+        else:
+            tracker.start("language_detection")
+            lang_artifact, detected_at = _timed_detect(detector, audio_artifact, whisper_model)
         if lang_artifact.error:
-            task_data[task_id]["status"] = "failed"
-            task_data[task_id]["error"] = lang_artifact.error
+            tracker.fail(lang_artifact.error)
             return
         language = lang_artifact.detected_language
+        task["language"] = language
+        task["language_probs"] = lang_artifact.language_probs
+        tracker.finish("language_detection", ended_at=detected_at)
+
+        # Split into speech chunks
+        tracker.start("vad_chunking")
+        chunker = VADChunker()
+        chunking_artifact = chunker.chunk(audio_artifact)
+        tracker.finish("vad_chunking")
 
-        # Transcribe
+        # Transcribe, streaming finished cues as chunks complete
+        tracker.start("transcription")
         transcriber = Transcriber()
-        trans_artifact = transcriber.transcribe(audio_path, language)
+        generator = SRTGenerator()
+        cue_builder = generator.cue_builder()
+        trans_artifact = transcriber.transcribe(
+            audio_artifact, language, chunking_artifact,
+            on_words=lambda words: caption_sink.publish(task_id, cue_builder.add_words(words)),
+            whisper_model=whisper_model
+        )
         if trans_artifact.error:
-            task_data[task_id]["status"] = "failed"
-            task_data[task_id]["error"] = trans_artifact.error
+            tracker.fail(trans_artifact.error)
             return
+        caption_sink.publish(task_id, cue_builder.flush())
+        tracker.finish("transcription")
 
         # Generate SRT
-        generator = SRTGenerator()
+        tracker.start("srt_generation")
         srt_artifact = generator.generate(trans_artifact.word_timestamps, task_id, language, video_name)
+        tracker.finish("srt_generation")
 
         # Update task data
-        task_data[task_id].update({
+        task.update({
             "status": "completed",
+            "stage": None,
             "transcription": trans_artifact.transcription,
             "language": language,
             "model_used": trans_artifact.model_used,
-            "srt_file_path": srt_artifact.srt_file_path
+            "chunk_reuse": {"chunks": trans_artifact.reused_chunks, "of_chunks": len(chunking_artifact.chunks),
+                            "audio_sec": trans_artifact.reused_sec},
+            "srt_file_path": srt_artifact.srt_file_path,
+            "srt_sha256": srt_artifact.sha256
         })
+        tracker.end("completed", audio_sec=audio_artifact.duration_sec, language=language)
+        tracker.report()
+        caption_sink.close(task_id)
+        logging.info(f"Task {task_id} completed")
 
-        # Cleanup
-        try:
-            os.unlink(video_path)
-            os.unlink(audio_path)
-        except:
-            pass
+        # Remember the result for repeated uploads; results from a smaller tier are not reused
+        if whisper_model == get_tier_policy().tiers[0]:
+            cached = {
+                "language": language,
+                "language_probs": lang_artifact.language_probs,
+                "transcription": trans_artifact.transcription,
+                "model_used": trans_artifact.model_used,
+                "srt_content": srt_artifact.srt_content,
+                "cues": [asdict(cue) for cue in srt_artifact.cues or []]
+            }
+            result_cache.put(upload_key, cached)
+            result_cache.put(decoded_audio_key, cached)
 
     except Exception as e:
-        task_data[task_id]["status"] = "failed"
-        task_data[task_id]["error"] = str(e)
+        tracker.fail(str(e))
         logging.error(f"Task {task_id} failed: {str(e)}")
-        raise  # Re-raise to propagate to upload_service
-
-
+        raise  # Re-raise to propagate to the worker
+    finally:
+        # Upload and extracted PCM live on disk only for the duration of the task
+        if audio_artifact is not None:
+            audio_artifact.release()
+        if workspace is not None:
+            workspace.cleanup()
 
+def _timed_detect(detector: LanguageDetector, audio_artifact,
+                  whisper_model: Optional[str] = None) -> Tuple[LanguageDetectionArtifact, float]:
+    return detector.detect(audio_artifact, whisper_model), time.perf_counter()
@@ -0,0 +1,286 @@
+import gc
+import os
+import sys
+import queue
+import signal
+import threading
+import multiprocessing as mp
+from typing import Dict, List, Optional
+from src.entity.config_entity import ProcessPoolConfig, ConfigEntity
+from src.components.model_manager import get_model_manager
+from src.components.model_tiering import get_tier_policy
+from src.components.scratch_space import get_scratch_space
+from src.pipeline.caption_stream import get_caption_hub
+from src.pipeline.admission import get_admission_controller
+from src.pipeline.task_store import TaskStore, InMemoryTaskStore
+from src.utils.metrics import get_metrics
+from src.logger import logging
+from src.exceptions import CustomException
+
+def _cpu_slices(num_workers: int) -> List[Optional[List[int]]]:
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return [None] * num_workers
+    per_worker = max(1, len(cpus) // num_workers)
+    return [cpus[i * per_worker:(i + 1) * per_worker] or None for i in range(num_workers)]
+
+class _QueueCaptionSink:
+    # Forwards cues to the parent, which owns the caption hub the API streams from
+    def __init__(self, event_queue, worker_index: int):
+        self.event_queue = event_queue
+        self.worker_index = worker_index
+
+    def publish(self, task_id: str, cues):
+        if cues:
+            self.event_queue.put(("cues", self.worker_index, task_id, list(cues)))
+
+    def close(self, task_id: str, error: Optional[str] = None):
+        self.event_queue.put(("cues_closed", self.worker_index, task_id, error))
+
+def _worker_main(worker_index: int, task_queue, event_queue, queued, torch_threads: int, cpus: Optional[List[int]]):
+    import torch
+    from src.pipeline.full_pipeline import process_task
+
+    # Each worker gets its own slice of cores instead of all workers fighting over every core
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(torch_threads)
+    logging.info(f"Process worker {worker_index} (pid {os.getpid()}) ready with {torch_threads} torch threads on CPUs {cpus}")
+
+    caption_sink = _QueueCaptionSink(event_queue, worker_index)
+    get_metrics().forward_to(lambda op: event_queue.put(("metrics", worker_index, None, op)))
+    # Backlog shared by all workers, so each one's tier choice sees the whole queue
+    get_tier_policy().set_queue_depth_source(lambda: queued.value)
+    while True:
+        item = task_queue.get()
+        if item is None:
+            break
+        task_id, task, video_name = item
+        with queued.get_lock():
+            queued.value -= 1
+        event_queue.put(("started", worker_index, task_id, None))
+        # Worker-local copy; the parent applies the snapshots to the real store
+        local_store = InMemoryTaskStore(compact=False)
+        local_store.create(task_id, task)
+        try:
+            process_task(task_id, local_store, video_name,
+                         on_progress=lambda snapshot: event_queue.put(("progress", worker_index, task_id, dict(snapshot))),
+                         caption_sink=caption_sink)
+        except Exception as e:
+            logging.error(f"Process worker {worker_index} failed task {task_id}: {str(e)}")
+        event_queue.put(("done", worker_index, task_id, local_store.get(task_id)))
+
+def _run_forked_worker(worker_index: int, task_queue, event_queue, queued, torch_threads: int, cpus: Optional[List[int]]):
+    # In a process forked by _spawner_main; never returns
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 0
+    try:
+        _worker_main(worker_index, task_queue, event_queue, queued, torch_threads, cpus)
+    except BaseException as e:
+        logging.error(f"Process worker {worker_index} crashed: {str(e)}")
+        code = 1
+    finally:
+        # Flush the last events to the parent before leaving without the interpreter's exit handlers
+        try:
+            event_queue.close()
+            event_queue.join_thread()
+        finally:
+            os._exit(code)
+
+def _reap(children: Dict[int, int], conn, block: bool):
+    while children:
+        try:
+            pid, status = os.waitpid(-1, 0 if block else os.WNOHANG)
+        except ChildProcessError:
+            children.clear()
+            return
+        if pid == 0:
+            return
+        index = children.pop(pid, None)
+        if index is not None:
+            conn.send(("exited", index, os.waitstatus_to_exitcode(status)))
+
+def _spawner_main(conn, task_queue, event_queue, queued, torch_threads: int, cpu_slices: List[Optional[List[int]]]):
+    """Forks the workers, the first ones and their replacements. It is forked from the parent before the
+    parent starts any other thread, and never starts one itself, so a worker can't inherit a lock that
+    another thread held at the moment of the fork (logging, metrics, the model manager, sqlite)."""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    children: Dict[int, int] = {}  # pid -> worker index
+    try:
+        while True:
+            if conn.poll(0.5):
+                message = conn.recv()
+                if message[0] == "stop":
+                    if not message[1]:
+                        for pid in children:
+                            os.kill(pid, signal.SIGTERM)
+                    _reap(children, conn, block=True)
+                    return
+                index = message[1]
+                pid = os.fork()
+                if pid == 0:
+                    conn.close()
+                    _run_forked_worker(index, task_queue, event_queue, queued, torch_threads, cpu_slices[index])
+                children[pid] = index
+                conn.send(("spawned", index, pid))
+            _reap(children, conn, block=False)
+    except (EOFError, OSError):
+        # The parent is gone
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+class ProcessTaskPool:
+    def __init__(self):
+        self.config = ProcessPoolConfig(config=ConfigEntity())
+        if "fork" not in mp.get_all_start_methods():
+            raise CustomException("Process execution mode needs the 'fork' start method", sys)
+        self._ctx = mp.get_context("fork")
+        self._task_queue = self._ctx.Queue()
+        self._event_queue = self._ctx.Queue()
+        self._queued = self._ctx.Value("i", 0)
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, TaskStore] = {}
+        self._running: Dict[int, Optional[str]] = {}
+        self._pending = 0
+        self._closed = False
+
+        cpu_count = os.cpu_count() or 1
+        self._torch_threads = self.config.torch_threads_per_worker or max(1, cpu_count // self.config.num_workers)
+        self._cpu_slices = _cpu_slices(self.config.num_workers) if self.config.pin_worker_cpus else [None] * self.config.num_workers
+
+        # Load models before forking so workers share the parent's weights copy-on-write;
+        # freezing the GC keeps collections in the children from dirtying those shared pages
+        get_model_manager().preload()
+        gc.collect()
+        gc.freeze()
+        # Workers are forked by a spawner forked now, while this process has no other threads yet
+        self._spawner_conn, spawner_conn = self._ctx.Pipe()
+        self._spawner = self._ctx.Process(
+            target=_spawner_main,
+            args=(spawner_conn, self._task_queue, self._event_queue, self._queued, self._torch_threads, self._cpu_slices),
+            name="caption-process-spawner",
+            daemon=True
+        )
+        self._spawner.start()
+        spawner_conn.close()
+        self._spawner_lost = False
+        self._workers: Dict[int, Optional[int]] = {}  # worker index -> pid
+        for index in range(self.config.num_workers):
+            self._spawn(index)
+
+        self._listener = threading.Thread(target=self._listen, name="process-pool-events", daemon=True)
+        self._listener.start()
+        logging.info(f"ProcessTaskPool initialized with {self.config.num_workers} workers")
+
+    def _spawn(self, index: int):
+        self._workers[index] = None
+        self._running[index] = None
+        self._spawner_conn.send(("spawn", index))
+
+    def submit(self, task_id: str, task_store: TaskStore, video_name: str):
+        with self._lock:
+            self._tasks[task_id] = task_store
+            self._pending += 1
+        with self._queued.get_lock():
+            self._queued.value += 1
+        self._task_queue.put((task_id, task_store.get(task_id), video_name))
+
+    def _listen(self):
+        while not self._closed:
+            try:
+                event = self._event_queue.get(timeout=1.0)
+            except queue.Empty:
+                event = None
+            except (EOFError, OSError):
+                break
+            if event is not None:
+                self._handle_event(*event)
+            self._check_workers()
+
+    def _handle_event(self, kind: str, worker_index: int, task_id: str, snapshot):
+        if kind == "cues":
+            get_caption_hub().publish(task_id, snapshot)
+            return
+        if kind == "cues_closed":
+            get_caption_hub().close(task_id, snapshot)
+            return
+        if kind == "metrics":
+            get_metrics().apply(snapshot)
+            return
+        with self._lock:
+            task_store = self._tasks.get(task_id)
+            if kind == "started":
+                self._pending -= 1
+                self._running[worker_index] = task_id
+            elif kind == "done":
+                self._running[worker_index] = None
+                self._tasks.pop(task_id, None)
+        if task_store is not None and snapshot is not None:
+            task_store.update(task_id, snapshot)
+        if kind == "started":
+            get_admission_controller().start(task_id)
+        elif kind == "done":
+            get_admission_controller().finish(task_id, snapshot)
+
+    def _check_workers(self):
+        # The spawner reports worker pids and exits; a crashed worker (e.g. OOM-killed) fails its task and is replaced
+        while not self._closed:
+            try:
+                if not self._spawner_conn.poll():
+                    break
+                kind, index, value = self._spawner_conn.recv()
+            except (EOFError, OSError):
+                break
+            if kind == "spawned":
+                self._workers[index] = value
+            elif kind == "exited":
+                self._worker_exited(index, value)
+        if not self._closed and not self._spawner_lost and not self._spawner.is_alive():
+            # Workers still running keep serving, but none can be replaced any more
+            self._spawner_lost = True
+            logging.error(f"Worker spawner exited with code {self._spawner.exitcode}; crashed workers will not be restarted")
+
+    def _worker_exited(self, index: int, exitcode: int):
+        with self._lock:
+            task_id = self._running.get(index)
+            task_store = self._tasks.pop(task_id, None) if task_id else None
+        if task_store is not None:
+            error = f"Worker process exited with code {exitcode}"
+            task = task_store.get(task_id) or {}
+            task_store.update(task_id, {"status": "failed", "error": error})
+            get_caption_hub().close(task_id, error)
+            get_admission_controller().finish(task_id)
+            # The worker never got to remove the task's upload and PCM
+            if task.get("workspace"):
+                get_scratch_space().open(task["workspace"]).cleanup()
+        logging.error(f"Process worker {index} exited with code {exitcode}, restarting")
+        self._spawn(index)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": "process",
+                "workers": self.config.num_workers,
+                "queued": self._pending,
+                "running": sum(1 for task_id in self._running.values() if task_id),
+                "torch_threads_per_worker": self._torch_threads
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._closed = True
+        for _ in self._workers:
+            self._task_queue.put(None)
+        # With wait, the spawner waits for the workers to finish their task; otherwise it terminates them
+        try:
+            self._spawner_conn.send(("stop", wait))
+        except OSError:
+            pass
+        if wait:
+            self._spawner.join()
+        logging.info("ProcessTaskPool shut down")
@@ -0,0 +1,69 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.entity.config_entity import TaskQueueConfig, ConfigEntity
+from src.pipeline.process_pool import ProcessTaskPool
+from src.pipeline.task_store import TaskStore
+from src.components.model_tiering import get_tier_policy
+from src.pipeline.admission import get_admission_controller
+from src.logger import logging
+from src.exceptions import CustomException
+
+class TaskQueue:
+    def __init__(self):
+        self.config = TaskQueueConfig(config=ConfigEntity())
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.executor = None
+        self.process_pool = None
+        if self.config.execution_mode == "process":
+            self.process_pool = ProcessTaskPool()
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.config.num_workers, thread_name_prefix="caption-worker")
+            get_tier_policy().set_queue_depth_source(lambda: self._pending)
+        logging.info(f"TaskQueue initialized in {self.config.execution_mode} mode")
+
+    def submit(self, task_id: str, task_store: TaskStore, video_name: str):
+        if self.process_pool:
+            return self.process_pool.submit(task_id, task_store, video_name)
+        try:
+            with self._lock:
+                self._pending += 1
+            return self.executor.submit(self._run, task_id, task_store, video_name)
+        except Exception as e:
+            with self._lock:
+                self._pending -= 1
+            logging.error(f"Failed to queue task {task_id}: {str(e)}")
+            raise CustomException(e, sys)
+
+    def _run(self, task_id: str, task_store: TaskStore, video_name: str):
+        # Imported here to avoid a circular import with full_pipeline
+        from src.pipeline.full_pipeline import process_task
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        admission = get_admission_controller()
+        admission.start(task_id)
+        try:
+            process_task(task_id, task_store, video_name)
+        except Exception as e:
+            # process_task already marked the task as failed
+            logging.error(f"Worker finished task {task_id} with error: {str(e)}")
+        finally:
+            with self._lock:
+                self._running -= 1
+            admission.finish(task_id, task_store.get(task_id))
+
+    def stats(self) -> dict:
+        if self.process_pool:
+            return self.process_pool.stats()
+        with self._lock:
+            return {"mode": "thread", "workers": self.config.num_workers, "queued": self._pending, "running": self._running}
+
+    def shutdown(self, wait: bool = True):
+        if self.process_pool:
+            self.process_pool.shutdown(wait=wait)
+        else:
+            self.executor.shutdown(wait=wait, cancel_futures=not wait)
+        logging.info("TaskQueue shut down")
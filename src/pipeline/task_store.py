@@ -0,0 +1,227 @@
+import os
+import sys
+import copy
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from src.entity.config_entity import TaskStoreConfig, ConfigEntity
+from src.logger import logging
+from src.exceptions import CustomException
+
+FINISHED_STATUSES = ("completed", "failed")
+
+class TaskStore(ABC):
+    """Task state shared by the API, upload_service and process_task; get() always returns a copy."""
+
+    @abstractmethod
+    def create(self, task_id: str, task: dict):
+        ...
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def update(self, task_id: str, fields: dict) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, task_id: str):
+        ...
+
+    @abstractmethod
+    def find(self, status: str, limit: int = 100) -> List[str]:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+class InMemoryTaskStore(TaskStore):
+    def __init__(self, max_entries: Optional[int] = None, ttl_sec: Optional[float] = None, compact: bool = True):
+        self.config = TaskStoreConfig(config=ConfigEntity())
+        self.max_entries = max_entries or self.config.max_entries
+        self.ttl_sec = ttl_sec or self.config.ttl_sec
+        self.compact = compact
+        self._tasks: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()  # oldest update first
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+    def _compact(self, task: dict) -> dict:
+        # The full transcription lives in the SRT file; only a preview is kept per task
+        limit = self.config.transcription_preview_chars
+        text = task.get("transcription")
+        if self.compact and text and len(text) > limit:
+            task["transcription"] = text[:limit]
+            task["transcription_truncated"] = True
+        return task
+
+    def create(self, task_id: str, task: dict):
+        with self._lock:
+            self._tasks[task_id] = (time.time(), self._compact(copy.deepcopy(task)))
+            self._tasks.move_to_end(task_id)
+            self._evict()
+
+    def get(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            return copy.deepcopy(entry[1]) if entry else None
+
+    def update(self, task_id: str, fields: dict) -> bool:
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is None:
+                return False
+            task = entry[1]
+            task.update(copy.deepcopy(fields))
+            self._tasks[task_id] = (time.time(), self._compact(task))
+            self._tasks.move_to_end(task_id)
+            if task.get("status") in FINISHED_STATUSES:
+                self._evict()
+            return True
+
+    def delete(self, task_id: str):
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
+    def find(self, status: str, limit: int = 100) -> List[str]:
+        with self._lock:
+            return [task_id for task_id, (_, task) in self._tasks.items() if task.get("status") == status][:limit]
+
+    def _evict(self):
+        # Finished tasks go first once expired or over the cap; queued/running tasks are never dropped
+        now = time.time()
+        for task_id, (updated_at, task) in list(self._tasks.items()):
+            over_cap = len(self._tasks) > self.max_entries
+            if not over_cap and now - updated_at <= self.ttl_sec:
+                break
+            if task.get("status") in FINISHED_STATUSES:
+                del self._tasks[task_id]
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for _, task in self._tasks.values():
+                by_status[task.get("status")] = by_status.get(task.get("status"), 0) + 1
+            return {"backend": "memory", "tasks": len(self._tasks), "by_status": by_status,
+                    "max_entries": self.max_entries, "evictions": self._evictions}
+
+class SQLiteTaskStore(TaskStore):
+    PURGE_INTERVAL_SEC = 60
+
+    def __init__(self, path: Optional[str] = None):
+        self.config = TaskStoreConfig(config=ConfigEntity())
+        self.path = path or self.config.sqlite_path
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._last_purge = 0.0
+        try:
+            conn = self._conn()
+            conn.execute("""CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                data TEXT NOT NULL
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, updated_at)")
+        except sqlite3.Error as e:
+            raise CustomException(e, sys)
+        logging.info(f"SQLiteTaskStore initialized at {self.path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and per process; a connection must never cross a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def create(self, task_id: str, task: dict):
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO tasks (task_id, status, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?)",
+            (task_id, task.get("status", "queued"), now, now, json.dumps(task))
+        )
+        if now - self._last_purge > self.PURGE_INTERVAL_SEC:
+            self._last_purge = now
+            self._purge(now)
+
+    def get(self, task_id: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, task_id: str, fields: dict) -> bool:
+        conn = self._conn()
+        # Read-merge-write under a write lock so concurrent updates from other processes aren't lost
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return False
+            task = json.loads(row[0])
+            task.update(fields)
+            conn.execute("UPDATE tasks SET status = ?, updated_at = ?, data = ? WHERE task_id = ?",
+                         (task.get("status", "queued"), time.time(), json.dumps(task), task_id))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, task_id: str):
+        self._conn().execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def find(self, status: str, limit: int = 100) -> List[str]:
+        rows = self._conn().execute("SELECT task_id FROM tasks WHERE status = ? ORDER BY updated_at LIMIT ?",
+                                    (status, limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def _purge(self, now: float):
+        conn = self._conn()
+        placeholders = ",".join("?" * len(FINISHED_STATUSES))
+        expired = conn.execute(f"DELETE FROM tasks WHERE status IN ({placeholders}) AND updated_at < ?",
+                               (*FINISHED_STATUSES, now - self.config.ttl_sec)).rowcount
+        total = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        over_cap = conn.execute(
+            f"DELETE FROM tasks WHERE task_id IN (SELECT task_id FROM tasks WHERE status IN ({placeholders}) "
+            f"ORDER BY updated_at LIMIT ?)",
+            (*FINISHED_STATUSES, max(0, total - self.config.max_entries))
+        ).rowcount
+        if expired or over_cap:
+            logging.info(f"Task store purged {expired} expired and {over_cap} excess tasks")
+
+    def stats(self) -> dict:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        by_status = {status: count for status, count in rows}
+        return {"backend": "sqlite", "tasks": sum(by_status.values()), "by_status": by_status,
+                "max_entries": self.config.max_entries, "path": self.path}
+
+_task_store = None
+_task_store_lock = threading.Lock()
+
+def get_task_store() -> TaskStore:
+    global _task_store
+    with _task_store_lock:
+        if _task_store is None:
+            backend = TaskStoreConfig(config=ConfigEntity()).backend
+            if backend == "sqlite":
+                _task_store = SQLiteTaskStore()
+            elif backend == "memory":
+                _task_store = InMemoryTaskStore()
+            else:
+                raise CustomException(f"Unknown task store backend: {backend}", sys)
+            logging.info(f"Task store backend: {backend}")
+        return _task_store
@@ -1,20 +1,222 @@
 import os
 import sys
+import hashlib
+import tempfile
+import aiofiles
+from typing import Optional
+from fastapi import HTTPException
+from multipart.multipart import MultipartParser, MultipartParseError, parse_options_header
+from starlette.responses import FileResponse, JSONResponse
+from src.entity.artifacts import UploadArtifact
 from src.entity.config_entity import ConfigEntity
 from src.exceptions import CustomException
 from src.logger import logging
 
-async def validate_uploaded_file(upload_file, config: ConfigEntity):
+class UploadSizeLimit:
+    """ASGI middleware that refuses oversized uploads with 413: at once when Content-Length is over the
+    limit, otherwise as soon as the streamed body crosses it."""
+
+    def __init__(self, app, paths, max_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        try:
+            declared = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            declared = 0
+        if declared > self.max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": "File too large"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Surfaces in the endpoint's read of the body and is answered as is
+                    raise HTTPException(status_code=413, detail="File too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+class StreamedUpload:
+    """The file field of a multipart/form-data request, read straight off the request body. Starlette's
+    form parsing would first spool the whole file to a temporary file of its own; with this the upload
+    is written once, where the caller puts it. Reads like an UploadFile (filename, size, read())."""
+
+    def __init__(self, request, field: str = "file"):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+        self.field = field
+        self.filename: Optional[str] = None
+        self.size: Optional[int] = None  # Not known until the file has been read
+        self.content_length = int(request.headers.get("content-length") or 0) or None
+        self._stream = request.stream().__aiter__()
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+        self._data = bytearray()
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._in_file = False
+        self._file_done = False
+        self._body_done = False
+
+    def _on_part_begin(self):
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if self.filename is None and options.get(b"name") == self.field.encode() and b"filename" in options:
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._data += data[start:end]
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self._file_done = True
+
+    async def _pull(self):
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._body_done = True
+            return
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as e:
+            raise HTTPException(status_code=400, detail=f"Malformed multipart body: {str(e)}")
+
+    async def start(self):
+        # Reads up to the start of the file, so its name is known before anything is written
+        while self.filename is None and not self._body_done:
+            await self._pull()
+        if self.filename is None:
+            raise HTTPException(status_code=422, detail=f"No file in form field '{self.field}'")
+
+    async def read(self, size: int = -1) -> bytes:
+        while not self._file_done and (size < 0 or len(self._data) < size):
+            if self._body_done:
+                raise HTTPException(status_code=400, detail="Upload ended in the middle of the file")
+            await self._pull()
+        size = len(self._data) if size < 0 else size
+        chunk = bytes(self._data[:size])
+        del self._data[:size]
+        return chunk
+
+async def save_uploaded_file(upload_file, config: ConfigEntity, compute_hash: bool = False,
+                             file_path: Optional[str] = None) -> UploadArtifact:
+    """Streams an upload (a StreamedUpload, or an UploadFile) to file_path in bounded chunks, hashing on
+    the way; a temporary file when no path is given."""
     try:
         ext = os.path.splitext(upload_file.filename)[1].lower()
         if ext not in config.allowed_video_extensions:
             raise CustomException(f"Unsupported file type: {ext}", sys)
-        content = await upload_file.read()
-        if len(content) > config.max_file_size_mb * 1024 * 1024:
+
+        max_bytes = config.max_file_size_mb * 1024 * 1024
+        # Reject early when the client declared the size
+        if getattr(upload_file, "size", None) and upload_file.size > max_bytes:
             raise CustomException("File too large", sys)
-        return content
+
+        if file_path is None:
+            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
+                file_path = temp_file.name
+
+        hasher = hashlib.sha256() if compute_hash else None
+        size = 0
+        async with aiofiles.open(file_path, "wb") as out:
+            while True:
+                chunk = await upload_file.read(config.upload_chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise CustomException("File too large", sys)
+                if hasher:
+                    hasher.update(chunk)
+                await out.write(chunk)
+
+        if size == 0:
+            raise CustomException("Empty file", sys)
+
+        logging.info(f"Upload streamed to {file_path} ({size} bytes)")
+        return UploadArtifact(file_path=file_path, size_bytes=size, sha256=hasher.hexdigest() if hasher else None)
+
     except Exception as e:
-        logging.error(f"Error validating file: {str(e)}")
+        if file_path and os.path.exists(file_path):
+            os.unlink(file_path)
+        if isinstance(e, HTTPException):
+            # Refused while the body streams in (oversized, malformed): answered as is
+            raise
+        logging.error(f"Error saving uploaded file: {str(e)}")
         raise CustomException(e, sys)
 
+class SendfileResponse(FileResponse):
+    # Lets the ASGI server send the file itself (zero-copy sendfile) when it advertises support for it
+    async def __call__(self, scope, receive, send):
+        extensions = scope.get("extensions") or {}
+        zerocopy = "http.response.zerocopysend" in extensions
+        pathsend = "http.response.pathsend" in extensions
+        if self.send_header_only or not (zerocopy or pathsend):
+            return await super().__call__(scope, receive, send)
+
+        stat_result = self.stat_result or os.stat(self.path)
+        if self.stat_result is None:
+            self.set_stat_headers(stat_result)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if pathsend:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopysend", "file": f, "count": stat_result.st_size})
+        if self.background is not None:
+            await self.background()
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            try:
+                return float(q[2:]) > 0 if q.startswith("q=") else True
+            except ValueError:
+                return False
+    return False
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
@@ -0,0 +1,28 @@
+import sys
+import importlib
+from types import ModuleType
+from typing import Optional
+
+class LazyModule:
+    """Stands in for a heavy module and imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str):
+        # Only reached for attributes the proxy itself lacks; import_module holds the import lock
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy_import(name: str):
+    # Already imported elsewhere: no reason to go through the proxy
+    return sys.modules.get(name) or LazyModule(name)
+
+def is_imported(name: str) -> bool:
+    return name in sys.modules
@@ -0,0 +1,139 @@
+import time
+import resource
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from src.entity.config_entity import MetricsConfig, ConfigEntity
+
+# name -> (type, help, bucket set); everything exposed on /metrics is declared here
+METRICS = {
+    "caption_tasks_total": ("counter", "Finished pipeline tasks by status and cache level", None),
+    "caption_queue_wait_seconds": ("histogram", "Time a task waited in the queue before a worker picked it up", "duration"),
+    "caption_task_duration_seconds": ("histogram", "Wall time of a whole pipeline task", "duration"),
+    "caption_stage_duration_seconds": ("histogram", "Wall time of each pipeline stage", "duration"),
+    "caption_audio_seconds_total": ("counter", "Seconds of audio processed by detected language", None),
+    "caption_real_time_factor": ("histogram", "Processing time divided by audio duration", "rtf"),
+    "caption_model_calls_total": ("counter", "Model invocations by model, operation and language", None),
+    "caption_model_call_duration_seconds": ("histogram", "Wall time of model invocations", "duration"),
+    "caption_whisper_tier_total": ("counter", "Whisper model selected per task and why (default, load, override)", None),
+    "caption_chunk_cache_total": ("counter", "Speech chunk transcription cache lookups by result", None),
+    "caption_admission_total": ("counter", "Uploads admitted to or refused from the queue, by reason", None),
+    "caption_peak_rss_bytes": ("gauge", "Peak resident memory of any pipeline process", None),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def peak_rss_bytes() -> int:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Metrics:
+    def __init__(self):
+        self.config = MetricsConfig(config=ConfigEntity())
+        self._buckets = {"duration": self.config.duration_buckets, "rtf": self.config.rtf_buckets}
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[LabelKey, float]] = {name: {} for name in METRICS}
+        self._histograms: Dict[str, Dict[LabelKey, List]] = {name: {} for name in METRICS}
+        self._sink: Optional[Callable[[tuple], None]] = None
+
+    def forward_to(self, sink: Optional[Callable[[tuple], None]]):
+        # Worker processes hand their observations to the parent, which serves /metrics
+        self._sink = sink
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        self._record(("inc", name, self._key(labels), value))
+
+    def set_max(self, name: str, value: float, **labels):
+        self._record(("max", name, self._key(labels), value))
+
+    def observe(self, name: str, value: float, **labels):
+        self._record(("observe", name, self._key(labels), value))
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def model_call(self, model: str, operation: str, language: Optional[str] = None, count: int = 1):
+        self.inc("caption_model_calls_total", count, model=model, operation=operation, language=language or "none")
+        with self.timer("caption_model_call_duration_seconds", model=model, operation=operation):
+            yield
+
+    @staticmethod
+    def _key(labels: dict) -> LabelKey:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def _record(self, op: tuple):
+        if not self.config.enabled:
+            return
+        if self._sink is not None:
+            self._sink(op)
+        else:
+            self.apply(op)
+
+    def apply(self, op: tuple):
+        kind, name, labels, value = op
+        with self._lock:
+            if kind == "inc":
+                values = self._values[name]
+                values[labels] = values.get(labels, 0.0) + value
+            elif kind == "max":
+                values = self._values[name]
+                values[labels] = max(values.get(labels, 0.0), value)
+            elif kind == "observe":
+                buckets = self._buckets[METRICS[name][2]]
+                state = self._histograms[name].setdefault(labels, [[0] * len(buckets), 0.0, 0])
+                for i, bound in enumerate(buckets):
+                    if value <= bound:
+                        state[0][i] += 1
+                state[1] += value
+                state[2] += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        self.set_max("caption_peak_rss_bytes", peak_rss_bytes())
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, bucket_set) in METRICS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind != "histogram":
+                    for labels, value in sorted(self._values[name].items()):
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                buckets = self._buckets[bucket_set]
+                for labels, (counts, total, count) in sorted(self._histograms[name].items()):
+                    for bound, bucket_count in zip(buckets, counts):
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {bucket_count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(round(total, 6))}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics() -> Metrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
@@ -0,0 +1,112 @@
+import numpy as np
+from typing import Any, List, Tuple
+from src.utils.lazy_import import lazy_import
+
+torch = lazy_import("torch")
+
+# Helpers around the IndicConformer remote code (ai4bharat/indic-conformer-600m-multilingual).
+# Its forward() is encode() followed by _ctc_decode()/_rnnt_decode(); the CTC head
+# (models["ctc_decoder"]) scores the joint vocabulary of every language and
+# language_masks/vocab select one language's slice. Everything here degrades to plain
+# model(wav, lang, mode) calls when those internals are not available.
+
+# Pseudo decoding mode: RNNT transcript plus the CTC head's frame log-probs from the same encoder pass
+ALIGNED_MODE = "rnnt+ctc"
+
+def supports_shared_encoding(model) -> bool:
+    return all(hasattr(model, attr) for attr in ("encode", "_ctc_decode", "_rnnt_decode"))
+
+def supports_ctc_head(model) -> bool:
+    models = getattr(model, "models", None)
+    return (
+        supports_shared_encoding(model)
+        and isinstance(models, dict) and "ctc_decoder" in models
+        and hasattr(model, "language_masks") and hasattr(model, "vocab")
+    )
+
+def encode(model, wav):
+    return model.encode(wav)
+
+def decode(model, encoded, lang: str, mode: str):
+    encoder_outputs, encoded_lengths = encoded
+    if mode == ALIGNED_MODE:
+        text = model._rnnt_decode(encoder_outputs, encoded_lengths, lang)
+        return text, ctc_language_logprobs(model, ctc_head_logits(model, encoded), lang)
+    if mode == "ctc":
+        return model._ctc_decode(encoder_outputs, encoded_lengths, lang)
+    return model._rnnt_decode(encoder_outputs, encoded_lengths, lang)
+
+def run(model, wav, lang: str, mode: str):
+    if mode != ALIGNED_MODE:
+        return model(wav, lang, mode)
+    if supports_ctc_head(model):
+        return decode(model, encode(model, wav), lang, mode)
+    return model(wav, lang, "rnnt"), None
+
+def blank_id(model, lang: str) -> int:
+    config = getattr(model, "config", None)
+    return getattr(config, "BLANK_ID", len(model.vocab[lang]))
+
+def language_indices(model, lang: str) -> "torch.Tensor":
+    mask = torch.as_tensor(model.language_masks[lang])
+    if mask.dtype == torch.bool:
+        return mask.nonzero(as_tuple=True)[0]
+    return mask.long()
+
+def ctc_head_logits(model, encoded) -> "torch.Tensor":
+    """Run the shared CTC head once; returns (batch, frames, joint_vocab) logits."""
+    encoder_outputs, _ = encoded
+    head = model.models["ctc_decoder"]
+    if hasattr(head, "run"):  # onnxruntime.InferenceSession
+        out = head.run(["logprobs"], {"encoder_output": np.asarray(encoder_outputs)})[0]
+        return torch.from_numpy(out)
+    with torch.inference_mode():
+        return head(torch.as_tensor(encoder_outputs))
+
+def ctc_language_logprobs(model, logits: "torch.Tensor", lang: str) -> "torch.Tensor":
+    """Slice one language out of the joint CTC logits; returns (frames, lang_vocab) log-probs."""
+    return logits[0][:, language_indices(model, lang)].log_softmax(dim=-1)
+
+def ctc_greedy_text(model, logprobs: "torch.Tensor", lang: str) -> str:
+    return ctc_indices_to_text(model, torch.argmax(logprobs, dim=-1), lang)
+
+def ctc_indices_to_text(model, indices: "torch.Tensor", lang: str) -> str:
+    collapsed = torch.unique_consecutive(indices).tolist()
+    blank = blank_id(model, lang)
+    vocab = model.vocab[lang]
+    return "".join(vocab[i] for i in collapsed if i != blank and i < len(vocab)).replace("▁", " ").strip()
+
+def supports_batched_encoding(model, mode: str = "rnnt") -> bool:
+    models = getattr(model, "models", None)
+    return (
+        supports_shared_encoding(model)
+        and isinstance(models, dict) and "preprocessor" in models and "encoder" in models
+        and (mode != ALIGNED_MODE or supports_ctc_head(model))
+    )
+
+def encode_batch(model, wavs: List["torch.Tensor"]) -> List[Tuple[Any, Any]]:
+    """Pad (1, samples) waveforms into one batch, run preprocessor and encoder once,
+    and return per-item (encoder_outputs, encoded_lengths) trimmed to each item's length."""
+    lengths = torch.tensor([wav.shape[-1] for wav in wavs], dtype=torch.long)
+    batch = torch.zeros(len(wavs), int(lengths.max()), dtype=wavs[0].dtype)
+    for i, wav in enumerate(wavs):
+        batch[i, :wav.shape[-1]] = wav.reshape(-1)
+
+    device = getattr(model, "d", "cpu")
+    with torch.inference_mode():
+        features, feature_lengths = model.models["preprocessor"](input_signal=batch.to(device), length=lengths.to(device))
+    encoder = model.models["encoder"]
+    if hasattr(encoder, "run"):  # onnxruntime.InferenceSession
+        outputs, encoded_lengths = encoder.run(
+            ["outputs", "encoded_lengths"],
+            {"audio_signal": features.cpu().numpy(), "length": feature_lengths.cpu().numpy()}
+        )
+    else:
+        with torch.inference_mode():
+            outputs, encoded_lengths = encoder(features, feature_lengths)
+
+    # Encoder outputs are (batch, features, frames)
+    return [
+        (outputs[i:i + 1, :, :int(encoded_lengths[i])], encoded_lengths[i:i + 1])
+        for i in range(len(wavs))
+    ]
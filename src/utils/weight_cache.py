@@ -0,0 +1,113 @@
+import os
+import re
+import json
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from src.utils.lazy_import import lazy_import
+from src.logger import logging
+
+torch = lazy_import("torch")
+whisper = lazy_import("whisper")
+
+# Whisper checkpoints are pickled .pt files that torch.load copies into fresh memory on every boot.
+# The converted safetensors file is memory-mapped instead: pages come from the page cache, load in
+# milliseconds and are shared between processes that map the same file.
+
+def whisper_cache_path(cache_dir: str, name: str) -> str:
+    # name may also be a checkpoint path
+    return os.path.join(cache_dir, f"whisper-{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}.safetensors")
+
+def save_whisper(model, path: str):
+    from safetensors.torch import save_file
+    tensors, sparse = {}, []
+    # Non-persistent buffers (attention mask, alignment heads) are saved too, so loading never rebuilds them
+    for name, tensor in list(model.named_parameters()) + list(model.named_buffers()):
+        if tensor.is_sparse:
+            sparse.append(name)
+            tensor = tensor.to_dense()
+        tensors[name] = tensor.detach().cpu().contiguous()
+    metadata = {"dims": json.dumps(model.dims.__dict__), "sparse": json.dumps(sparse)}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    save_file(tensors, tmp_path, metadata=metadata)
+    os.replace(tmp_path, path)
+    logging.info(f"Cached Whisper weights at {path}")
+
+_skip = threading.local()
+_skip_hooks_lock = threading.Lock()
+_skip_hooks_installed = False
+
+def _install_skip_hooks():
+    # Wraps the initialisers once, for good, instead of swapping them in and out around each load: the
+    # wrappers only skip in a thread inside _skip_init(), so a model another thread builds meanwhile
+    # (IndicConformer, another Whisper tier) is initialised as usual
+    global _skip_hooks_installed
+    with _skip_hooks_lock:
+        if _skip_hooks_installed:
+            return
+
+        def gated(original):
+            def reset_parameters(self):
+                if not getattr(_skip, "active", False):
+                    original(self)
+            return reset_parameters
+
+        for layer in (torch.nn.Linear, torch.nn.Conv1d, torch.nn.Embedding):
+            layer.reset_parameters = gated(layer.reset_parameters)
+        sinusoids = whisper.model.sinusoids
+
+        def gated_sinusoids(length, channels, max_timescale=10000):
+            if getattr(_skip, "active", False):
+                return torch.empty(length, channels)
+            return sinusoids(length, channels, max_timescale)
+
+        whisper.model.sinusoids = gated_sinusoids
+        _skip_hooks_installed = True
+
+@contextmanager
+def _skip_init():
+    # Same idea as transformers' no_init_weights, scoped to the layer types Whisper uses and to this thread
+    _install_skip_hooks()
+    _skip.active = True
+    try:
+        yield
+    finally:
+        _skip.active = False
+
+def load_whisper(path: str, device: Optional[str] = None):
+    from safetensors import safe_open
+    from safetensors.torch import load_file
+    with safe_open(path, framework="pt") as f:
+        metadata = f.metadata()
+    tensors = load_file(path)  # mmap-backed; nothing is read until a page is touched
+    sparse = set(json.loads(metadata["sparse"]))
+
+    # Mirrors Whisper.__init__ without the random initialisation: torch.empty pages are never touched
+    # before being swapped for the mapped tensors. The meta device would also avoid the allocation, but
+    # its init ops import torch._dynamo, which costs seconds on a cold start. The sparse alignment-heads
+    # buffer is set from the file below.
+    dims = whisper.model.ModelDimensions(**json.loads(metadata["dims"]))
+    model = whisper.model.Whisper.__new__(whisper.model.Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+    with _skip_init():
+        model.encoder = whisper.model.AudioEncoder(dims.n_mels, dims.n_audio_ctx, dims.n_audio_state,
+                                                   dims.n_audio_head, dims.n_audio_layer)
+        model.decoder = whisper.model.TextDecoder(dims.n_vocab, dims.n_text_ctx, dims.n_text_state,
+                                                  dims.n_text_head, dims.n_text_layer)
+    model.register_buffer("alignment_heads", None, persistent=False)
+
+    # Point every parameter and buffer at the mapped tensors
+    for name, tensor in tensors.items():
+        module_name, _, leaf = name.rpartition(".")
+        module = model.get_submodule(module_name)
+        if leaf in module._parameters:
+            module._parameters[leaf] = torch.nn.Parameter(tensor, requires_grad=False)
+        else:
+            module._buffers[leaf] = tensor.to_sparse() if name in sparse else tensor
+    expected = {name for name, _ in model.named_parameters()} | {name for name, _ in model.named_buffers()}
+    missing = sorted(expected - tensors.keys()) + (["alignment_heads"] if model.alignment_heads is None else [])
+    if missing:
+        raise ValueError(f"Weight cache {path} is missing tensors: {missing[:5]}")
+    return model.to(device) if device and device != "cpu" else model